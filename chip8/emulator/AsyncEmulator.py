@@ -0,0 +1,181 @@
+try:
+    import asyncio
+except ImportError:
+    asyncio = None
+
+from chip8.emulator import Emulator
+from chip8.emulator.Chip8 import Chip8
+from chip8.emulator.Chip8Utils import Chip8Utils
+
+
+class AsyncEmulator(Emulator):
+    """
+    Runs a machine inside an asyncio event loop instead of a thread of its own
+
+    Each frame is one callback of the loop executing the cycles up to the next tick of the timers (the machine
+    runs on the virtual clock), the callbacks being paced at frame_rate. Any number of emulators can share a loop.
+
+    The control methods are those of Emulator and can be called from any thread. The commands are applied by the
+    loop between two frames; while stopped or paused no callback is scheduled.
+
+    frames() returns an asynchronous iterator of the frames, to be used with "async for". A consumer slower than
+    the emulator only gets the latest frame.
+
+    Requires asyncio (Python 3).
+    """
+
+    FRAME_RATE = Chip8.TIMER_FREQUENCY
+
+    def __init__(self, *args, **kwargs):
+        """
+        Takes the arguments of Emulator, and:
+
+        :param loop: Event loop running the machine (default: asyncio.get_event_loop())
+        :param frame_rate: Frames per second, None running the frames back to back
+        :param instructions_per_frame: Instructions per frame of the virtual clock
+        """
+        if asyncio is None:
+            raise ImportError('AsyncEmulator requires asyncio')
+        if kwargs.get('pacer') is not None:
+            raise ValueError('AsyncEmulator is paced by frame_rate, a Pacer would block its event loop')
+        self.loop = kwargs.pop('loop', None) or asyncio.get_event_loop()
+        self.frame_rate = kwargs.pop('frame_rate', self.FRAME_RATE)
+        self.instructions_per_frame = kwargs.pop('instructions_per_frame', None)
+        kwargs['auto_start'] = False
+        self.frame_counter = 0
+        self._iterators = []
+        # handle of the callback of the next frame, and the time it is scheduled at
+        self._handle = None
+        self._deadline = None
+        super(AsyncEmulator, self).__init__(*args, **kwargs)
+
+    def frames(self):
+        """
+        :return: FrameIterator of the (frame number, screen) of the frames executed from now on
+        """
+        iterator = FrameIterator(self)
+        self._iterators.append(iterator)
+        return iterator
+
+    def _create_chip8(self):
+        return Chip8Utils.create_from_rom(path=self.rom_path, input_kb=self.kb_input, engine=self.engine,
+                                          clock=Chip8.CLOCK_VIRTUAL,
+                                          instructions_per_frame=self.instructions_per_frame, seed=self.seed)
+
+    def _post(self, command, *args):
+        super(AsyncEmulator, self)._post(command, *args)
+        self.loop.call_soon_threadsafe(self._wake)
+
+    def _wake(self):
+        if not self._pending.is_set():
+            return
+        try:
+            self._process_commands()
+        except Exception as e:
+            self._crash(e)
+            return
+        self._schedule()
+
+    def _schedule(self):
+        if self.status == self.RUNNING:
+            if self._handle is None and self.chip8:
+                self._deadline = self.loop.time()
+                self._handle = self.loop.call_soon(self._frame)
+        elif self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self.status == self.TERMINATED:
+            self._close_iterators()
+
+    def _frame(self):
+        self._handle = None
+        chip8 = self.chip8
+        try:
+            # the first cycle of a frame ticks the timers
+            self._cycle()
+            while chip8.get_cycle_counter() < chip8.next_timer:
+                self._cycle()
+        except Exception as e:
+            self._crash(e)
+            return
+        self.frame_counter += 1
+        frame = (self.frame_counter, chip8.get_screen())
+        for iterator in self._iterators:
+            iterator._push(frame)
+        if self.status == self.RUNNING:
+            self._schedule_next()
+
+    def _schedule_next(self):
+        loop = self.loop
+        if self.frame_rate is None:
+            self._handle = loop.call_soon(self._frame)
+            return
+        frame_duration = 1.0 / self.frame_rate
+        self._deadline += frame_duration
+        now = loop.time()
+        if self._deadline < now - frame_duration:
+            # more than a frame late: drop the late frames instead of running them back to back
+            self._deadline = now
+        self._handle = loop.call_at(self._deadline, self._frame)
+
+    def _crash(self, e):
+        self._crashed(e)
+        self._schedule()
+        self._close_iterators(e)
+
+    def _close_iterators(self, error=None):
+        iterators = self._iterators
+        self._iterators = []
+        for iterator in iterators:
+            iterator._close(error)
+
+
+class FrameIterator(object):
+    """
+    Asynchronous iterator of the frames of an AsyncEmulator, keeping only the latest frame not consumed yet
+
+    Ends when the emulator is terminated, raises the exception of the emulator when it crashes.
+    """
+
+    def __init__(self, emulator):
+        self.emulator = emulator
+        self._waiter = None
+        self._frame = None
+        self._error = None
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        future = self.emulator.loop.create_future()
+        if self._frame is not None:
+            future.set_result(self._frame)
+            self._frame = None
+        elif self._error is not None:
+            future.set_exception(self._error)
+        else:
+            self._waiter = future
+        return future
+
+    def close(self):
+        """
+        Stops receiving the frames of the emulator
+        """
+        if self in self.emulator._iterators:
+            self.emulator._iterators.remove(self)
+        self._close()
+
+    def _push(self, frame):
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(frame)
+            self._waiter = None
+        else:
+            self._frame = frame
+
+    def _close(self, error=None):
+        self._error = error or StopAsyncIteration()
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_exception(self._error)
+            self._waiter = None
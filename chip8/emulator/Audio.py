@@ -17,5 +17,6 @@ class Audio(object):
         # winsound.PlaySound(None, 0)
         if self.is_playing:
             print('Audio.stop')
+        self.is_playing = False
 
 player = Audio()
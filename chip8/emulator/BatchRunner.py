@@ -0,0 +1,106 @@
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import timeit
+
+from chip8.emulator.Chip8 import Chip8
+from chip8.emulator.Chip8Utils import Chip8Utils
+
+
+def run_rom(job):
+    """
+    Runs one ROM headless on the virtual clock (module level so worker processes can unpickle it)
+
+    :param job: (path, engine, cycles, frames), the budget being cycles and/or frames
+    :return: Result record (dict)
+    """
+    path, engine, cycles, frames = job
+    record = {
+        'rom': path,
+        'engine': engine,
+        'cycles': 0,
+        'reason': None,
+        'screen': None,
+        'error': None,
+    }
+    start = timeit.default_timer()
+    chip8 = None
+    try:
+        chip8 = Chip8Utils.create_from_rom(path, engine=engine, clock=Chip8.CLOCK_VIRTUAL)
+        if frames is not None:
+            record['reason'] = chip8.run_frames(frames, max_cycles=cycles)[1]
+        else:
+            record['reason'] = chip8.run(cycles)[1]
+    except Exception as e:
+        record['error'] = {'type': e.__class__.__name__, 'message': str(e)}
+    if chip8 is not None:
+        record['cycles'] = chip8.get_cycle_counter()
+        record['screen'] = hashlib.sha1(chip8.get_screen(copy=False)).hexdigest()
+    record['time'] = timeit.default_timer() - start
+    return record
+
+
+class BatchRunner(object):
+    """
+    Runs many ROMs headless across a pool of worker processes
+
+    Each ROM gets a budget of cycles and/or frames. A record is produced per ROM as soon as it completes (in
+    completion order): final screen hash, cycle counter, stop reason, error raised (such as the
+    NotImplementedError of an unsupported instruction) and wall time.
+    """
+
+    def __init__(self, roms, engine=None, cycles=None, frames=None, processes=None):
+        """
+        :param roms: Paths of the ROM files
+        :param engine: Name of the engine in Chip8Utils.ENGINES (default: interpreter)
+        :param cycles: Maximum number of instructions per ROM
+        :param frames: Maximum number of frames per ROM
+        :param processes: Number of worker processes (default: number of CPUs)
+        """
+        if cycles is None and frames is None:
+            raise ValueError('A cycle or frame budget is required')
+        Chip8Utils.get_engine(engine)
+        self.roms = roms
+        self.engine = engine or Chip8Utils.INTERPRETER
+        self.cycles = cycles
+        self.frames = frames
+        self.processes = processes
+
+    @staticmethod
+    def find_roms(pattern):
+        """
+        :param pattern: Directory (all of its *.ch8 files) or glob pattern
+        :return: Sorted paths of the ROM files
+        """
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, '*.ch8')
+        return sorted(path for path in glob.glob(pattern) if os.path.isfile(path))
+
+    def run(self):
+        """
+        :return: Generator of the result records, in completion order
+        """
+        jobs = [(path, self.engine, self.cycles, self.frames) for path in self.roms]
+        pool = multiprocessing.Pool(self.processes)
+        try:
+            for record in pool.imap_unordered(run_rom, jobs):
+                yield record
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def run_to_file(self, file_object):
+        """
+        Writes the result records to a file as JSON lines, flushed as they complete
+
+        :return: Number of records written
+        """
+        count = 0
+        for record in self.run():
+            file_object.write(json.dumps(record, sort_keys=True) + '\n')
+            file_object.flush()
+            count += 1
+        return count
@@ -0,0 +1,245 @@
+import gc
+import glob
+import math
+import os
+import platform
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from chip8.emulator.Chip8 import Chip8
+from chip8.emulator.Chip8Utils import Chip8Utils
+
+
+class Benchmark(object):
+    """
+    Runs ROMs headless on the virtual clock and measures the engines
+
+    For each ROM and engine: instructions per second, percentiles of the time spent on each frame, peak memory
+    and machine construction time. A ROM crashing (most of them end up executing 0000) is restarted on a new
+    machine until the requested number of frames is executed.
+
+    Per-opcode microbenchmarks time Chip8.execute for one instruction of each opcode family.
+    """
+
+    VERSION = 1
+
+    PERCENTILES = (50, 90, 99)
+
+    # Instructions of each opcode family, run on a fresh machine with I pointing at 0x300
+    # 2NNN is timed with a 00EE so the stack does not overflow
+    OPCODES = [
+        ('00E0', [0x00E0]),
+        ('1NNN', [0x1200]),
+        ('2NNN+00EE', [0x2300, 0x00EE]),
+        ('3XNN', [0x3112]),
+        ('4XNN', [0x4112]),
+        ('5XY0', [0x5120]),
+        ('6XNN', [0x6112]),
+        ('7XNN', [0x7112]),
+        ('8XY0', [0x8120]),
+        ('8XY1', [0x8121]),
+        ('8XY2', [0x8122]),
+        ('8XY3', [0x8123]),
+        ('8XY4', [0x8124]),
+        ('8XY5', [0x8125]),
+        ('8XY6', [0x8126]),
+        ('8XY7', [0x8127]),
+        ('8XYE', [0x812E]),
+        ('9XY0', [0x9120]),
+        ('ANNN', [0xA300]),
+        ('BNNN', [0xB200]),
+        ('CXNN', [0xC1FF]),
+        ('DXYN', [0xD125]),
+        ('EX9E', [0xE19E]),
+        ('EXA1', [0xE1A1]),
+        ('FX07', [0xF107]),
+        ('FX0A', [0xF10A]),
+        ('FX15', [0xF115]),
+        ('FX18', [0xF118]),
+        ('FX1E', [0xF01E]),
+        ('FX29', [0xF129]),
+        ('FX33', [0xF133]),
+    ]
+
+    timer = staticmethod(timeit.default_timer)
+
+    def __init__(self, roms, engines=None, frames=600, instructions_per_frame=None, constructions=20,
+                 opcode_iterations=20000):
+        """
+        :param roms: Paths of the ROM files
+        :param engines: Names of the engines to measure (default: all of Chip8Utils.ENGINES)
+        :param frames: Number of frames to run each ROM for
+        :param instructions_per_frame: Instructions per frame of the virtual clock
+        :param constructions: Number of machines created to time the construction
+        :param opcode_iterations: Number of executions of each opcode microbenchmark
+        """
+        self.roms = sorted(roms)
+        self.engines = sorted(engines or Chip8Utils.ENGINES)
+        self.frames = frames
+        self.instructions_per_frame = instructions_per_frame or Chip8.INSTRUCTIONS_PER_FRAME
+        self.constructions = constructions
+        self.opcode_iterations = opcode_iterations
+
+    @staticmethod
+    def find_roms(directory):
+        return glob.glob(os.path.join(directory, '*.ch8'))
+
+    def run(self):
+        """
+        :return: dict of the results, to be saved as JSON
+        """
+        results = {
+            'version': self.VERSION,
+            'python': platform.python_version(),
+            'frames': self.frames,
+            'instructions_per_frame': self.instructions_per_frame,
+            'roms': {},
+            'opcodes': {},
+        }
+        for rom in self.roms:
+            results['roms'][os.path.basename(rom)] = dict(
+                (engine, self.run_rom(rom, engine)) for engine in self.engines
+            )
+        for engine in self.engines:
+            results['opcodes'][engine] = self.run_opcodes(engine)
+        return results
+
+    def _create(self, rom, engine):
+        return Chip8Utils.create_from_rom(rom, engine=engine, clock=Chip8.CLOCK_VIRTUAL,
+                                          instructions_per_frame=self.instructions_per_frame)
+
+    def _run_frames(self, rom, engine, frame_times=None):
+        """
+        Runs a ROM for self.frames frames, on new machines after crashes
+
+        :param frame_times: list receiving the duration of each frame
+        :return: (number of instructions executed, number of crashes)
+        """
+        timer = self.timer
+        chip8 = self._create(rom, engine)
+        instructions = 0
+        crashes = 0
+        for _ in range(0, self.frames):
+            start = timer()
+            try:
+                chip8.run_frames(1)
+            except Exception:
+                crashes += 1
+                instructions += chip8.get_cycle_counter()
+                chip8 = self._create(rom, engine)
+            if frame_times is not None:
+                frame_times.append(timer() - start)
+        return instructions + chip8.get_cycle_counter(), crashes
+
+    def run_rom(self, rom, engine):
+        timer = self.timer
+        start = timer()
+        for _ in range(0, self.constructions):
+            self._create(rom, engine)
+        construction = (timer() - start) / self.constructions
+
+        frame_times = []
+        gc.collect()
+        instructions, crashes = self._run_frames(rom, engine, frame_times)
+        elapsed = sum(frame_times)
+
+        result = {
+            'instructions': instructions,
+            'crashes': crashes,
+            'time': elapsed,
+            'ips': instructions / elapsed if elapsed else 0.0,
+            'construction_time': construction,
+            'peak_memory': self._peak_memory(rom, engine),
+        }
+        for percentile in self.PERCENTILES:
+            result['frame_p%d' % percentile] = self.percentile(frame_times, percentile)
+        return result
+
+    def _peak_memory(self, rom, engine):
+        """
+        :return: Peak of memory allocated while running a ROM in bytes, the peak resident set size of the whole
+            process without tracemalloc (Python 2)
+        """
+        if tracemalloc is None:
+            if resource is None:
+                return None
+            # kilobytes on Linux
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        tracemalloc.start()
+        try:
+            self._run_frames(rom, engine)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def run_opcodes(self, engine):
+        """
+        :return: dict of the mean execution time of each opcode family in seconds
+        """
+        chip8_class = Chip8Utils.get_engine(engine)
+        timer = self.timer
+        iterations = self.opcode_iterations
+        results = {}
+        for name, instructions in self.OPCODES:
+            chip8 = chip8_class()
+            chip8.i_register = 0x300
+            execute = chip8.execute
+            start = timer()
+            for _ in range(0, iterations):
+                for instruction in instructions:
+                    execute(instruction)
+            results[name] = (timer() - start) / iterations
+        return results
+
+    @staticmethod
+    def percentile(values, percentile):
+        """
+        Nearest-rank percentile
+        """
+        if not values:
+            return 0.0
+        values = sorted(values)
+        rank = int(math.ceil(percentile / 100.0 * len(values)))
+        return values[max(1, min(len(values), rank)) - 1]
+
+    @staticmethod
+    def compare(baseline, current, threshold=0.1):
+        """
+        Lists the measures of current worse than baseline by more than a ratio
+
+        :param threshold: Tolerated ratio, 0.1 flags a measure 10% worse
+        :return: list of (name, baseline value, current value) of the regressions
+        """
+        regressions = []
+
+        def check(name, old, new, higher_is_better=False):
+            if old is None or new is None or not old:
+                return
+            ratio = (old - new) / float(old) if higher_is_better else (new - old) / float(old)
+            if ratio > threshold:
+                regressions.append((name, old, new))
+
+        for rom, engines in sorted(current.get('roms', {}).items()):
+            for engine, result in sorted(engines.items()):
+                old = baseline.get('roms', {}).get(rom, {}).get(engine)
+                if old is None:
+                    continue
+                prefix = '%s/%s/' % (rom, engine)
+                check(prefix + 'ips', old.get('ips'), result.get('ips'), higher_is_better=True)
+                for key in sorted(result):
+                    if key.startswith('frame_p') or key in ('construction_time', 'peak_memory'):
+                        check(prefix + key, old.get(key), result.get(key))
+        for engine, opcodes in sorted(current.get('opcodes', {}).items()):
+            old_opcodes = baseline.get('opcodes', {}).get(engine, {})
+            for name, value in sorted(opcodes.items()):
+                check('opcodes/%s/%s' % (engine, name), old_opcodes.get(name), value)
+        return regressions
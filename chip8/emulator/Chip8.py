@@ -2,11 +2,14 @@ from __future__ import print_function
 
 import array
 import random
+import struct
 import sys
 import time
 
 from chip8.emulator.Audio import player as audio_player
+from chip8.emulator.Framebuffer import Framebuffer, read_only_view
 from chip8.emulator.Input import Input
+from chip8.emulator.Tracer import Tracer
 
 
 # : main
@@ -50,7 +53,58 @@ from chip8.emulator.Input import Input
 
 
 class Chip8(object):
+    __slots__ = (
+        '_cycle_counter', 'pc', 'memory', '_memory_view', 'input', 'framebuffer',
+        'registers', 'i_register', 'sp', 'stack', 'delay_timer', 'sound_timer',
+        'clock', 'instructions_per_frame', 'next_timer',
+        'tracer', 'profiler', '_written_pages', 'seed', '_random_state', '_prototype',
+    )
+
     MEMORY_SIZE = 0x1000
+    TIMER_FREQUENCY = 60
+
+    # Clocks driving the timers: wall-clock time, or the number of executed instructions
+    CLOCK_WALL = 'wall'
+    CLOCK_VIRTUAL = 'virtual'
+    INSTRUCTIONS_PER_FRAME = 10
+
+    # xorshift32 state replacing a seed of 0, which xorshift would never leave
+    RANDOM_ZERO_SEED = 0x6d2b79f5
+    # seeds are 32-bit, the size of the xorshift32 state
+    SEED_MASK = 0xffffffff
+
+    # Snapshot: this header, then the memory, then the screen (one byte per pixel)
+    # magic, version, clock, instructions per frame, pc, i, sp, delay timer, sound timer, cycle counter,
+    # next timer, 16 registers, 16 stack entries, state of the random generator (0 when not seeded), 1 if seeded
+    # else 0, seed
+    SNAPSHOT_MAGIC = b'C8SS'
+    SNAPSHOT_VERSION = 3
+    SNAPSHOT_HEADER = struct.Struct('<4sBBHHIbBBqd16B16iIBI')
+
+    # Registers written by the instructions, as traced, per opcode family (instruction >> 12): True for all of the
+    # family, False for none, or (mask, sub-opcodes) for the instructions whose instruction & mask is listed
+    TRACED_VX = (
+        False, False, False, False, False, False, True, True,
+        (0x000f, frozenset([0x0, 0x1, 0x2, 0x3, 0x4, 0x5, 0x6, 0x7, 0xe])),
+        False, False, False, True, False, False,
+        (0x00ff, frozenset([0x07, 0x0a, 0x65])),
+    )
+    # instructions setting VF as a flag (carry, borrow, shifted bit, collision)
+    TRACED_VF = (
+        False, False, False, False, False, False, False, False,
+        (0x000f, frozenset([0x4, 0x5, 0x6, 0x7, 0xe])),
+        False, False, False, False, True, False, False,
+    )
+
+    # Granularity of the tracking of memory writes
+    PAGE_SIZE = 0x100
+
+    # Reasons for run(), run_until() and run_frames() to return
+    STOP_CYCLES = 'cycles'
+    STOP_PC = 'pc'
+    STOP_PREDICATE = 'predicate'
+    STOP_FRAMES = 'frames'
+
     FONTS = [
         0xF0, 0x90, 0x90, 0x90, 0xF0,
         0x20, 0x60, 0x20, 0x20, 0x70,
@@ -69,8 +123,10 @@ class Chip8(object):
         0xF0, 0x80, 0xF0, 0x80, 0xF0,
         0xF0, 0x80, 0xF0, 0x80, 0x80,
     ]
+    FONT_DATA = bytes(bytearray(FONTS))
 
-    def __init__(self, memory=None, input_kb=None):
+    def __init__(self, memory=None, input_kb=None, clock=None, instructions_per_frame=None, framebuffer=None,
+                 seed=None):
         if not memory:
             memory = bytearray(self.MEMORY_SIZE)
         if not isinstance(memory, bytearray):
@@ -79,30 +135,21 @@ class Chip8(object):
         if not input_kb:
             input_kb = Input()
 
+        if not framebuffer:
+            framebuffer = Framebuffer()
+
         self._cycle_counter = 0
         self.pc = 0x0200
         self.memory = self._load_fonts(memory)
+        # memory restored by reset(): fonts and ROM
+        self._prototype = bytes(self.memory)
+        # memory is never reallocated (only written in place), so this view stays valid
+        self._memory_view = read_only_view(self.memory)
         self.input = input_kb
-        self.video = bytearray(64 * 32)
-
-        self.registers = [
-            0x0,
-            0x0,
-            0x0,
-            0x0,
-            0x0,
-            0x0,
-            0x0,
-            0x0,
-            0x0,
-            0x0,
-            0x0,
-            0x0,
-            0x0,
-            0x0,
-            0x0,
-            0x0,
-        ]
+        self.framebuffer = framebuffer
+
+        # V0 to VF
+        self.registers = bytearray(16)
         self.i_register = 0x0
 
         self.sp = 0
@@ -111,26 +158,239 @@ class Chip8(object):
         self.delay_timer = 0
         self.sound_timer = 0
 
+        self.clock = self.CLOCK_WALL
+        self.instructions_per_frame = self.INSTRUCTIONS_PER_FRAME
         self.next_timer = 0
+        self.set_clock(clock or self.CLOCK_WALL, instructions_per_frame)
+
+        self.tracer = None
+        self.profiler = None
+
+        # bit n is set when page n of memory was written since the last consume_written_pages()
+        self._written_pages = 0
+
+        self.seed = None
+        self._random_state = None
+        self.set_seed(seed)
+
+    def set_clock(self, clock, instructions_per_frame=None):
+        """
+        Selects the clock driving the delay and sound timers
+
+        With the wall clock, timers tick at TIMER_FREQUENCY Hz of real time. With the virtual clock, timers tick
+        every instructions_per_frame executed instructions, which is deterministic and free of time.time() calls.
+
+        :param clock: CLOCK_WALL or CLOCK_VIRTUAL
+        :param instructions_per_frame: Instructions executed between two ticks of the virtual clock
+        """
+        if clock not in (self.CLOCK_WALL, self.CLOCK_VIRTUAL):
+            raise ValueError('Clock "%s" does not exist' % clock)
+        if instructions_per_frame is not None:
+            if instructions_per_frame < 1:
+                raise ValueError('Instructions per frame must be positive (given: %s)' % instructions_per_frame)
+            self.instructions_per_frame = instructions_per_frame
+        if clock != self.clock:
+            self.clock = clock
+            # next_timer is a time in ms for the wall clock, a cycle count for the virtual clock
+            self.next_timer = 0 if clock == self.CLOCK_WALL else self._cycle_counter
+
+    def set_tracer(self, tracer):
+        """
+        Sets the Tracer recording each executed instruction
+
+        :param tracer: Tracer, None to stop tracing
+        """
+        self.tracer = tracer
+
+    def set_profiler(self, profiler):
+        """
+        Sets the Profiler counting and timing each executed instruction
+
+        :param profiler: Profiler, None to stop profiling
+        """
+        self.profiler = profiler
+
+    def is_instrumented(self):
+        """
+        :return: True if a tracer or a profiler observes each executed instruction
+        """
+        return self.tracer is not None or self.profiler is not None
 
     def cycle(self):
+        self._update_timers()
         self._cycle_counter += 1
         instruction = self.get_current_instruction()
         self.pc += 0x2
-        current_time = time.time() * 1000.0
-        if current_time > self.next_timer:
-            self._count_down_timers()
-            self.next_timer = current_time + (1000.0 / 60.0)
-        self.execute(instruction)
+        if self.tracer is None and self.profiler is None:
+            self.execute(instruction)
+        else:
+            self._execute_instrumented(self._cycle_counter, self.pc - 0x2, instruction)
         return self._cycle_counter
 
+    def _execute_instrumented(self, cycle, pc, instruction):
+        profiler = self.profiler
+        start = profiler.timer() if profiler is not None else 0
+        try:
+            self.execute(instruction)
+        finally:
+            if profiler is not None:
+                profiler.record(pc, instruction, profiler.timer() - start)
+            if self.tracer is not None:
+                registers = self.registers
+                x = Tracer.NO_REGISTER
+                value = 0
+                if self._traces(self.TRACED_VX, instruction):
+                    x = (instruction & 0x0f00) >> 8
+                    value = registers[x]
+                flag = registers[0xf] if self._traces(self.TRACED_VF, instruction) else Tracer.NO_FLAG
+                self.tracer.record(cycle, pc, instruction, self.i_register, x, value, flag)
+
+    @staticmethod
+    def _traces(table, instruction):
+        """
+        :param table: TRACED_VX or TRACED_VF
+        :return: True if the table lists the instruction
+        """
+        entry = table[instruction >> 12]
+        if isinstance(entry, tuple):
+            mask, sub_opcodes = entry
+            return (instruction & mask) in sub_opcodes
+        return entry
+
+    def run(self, cycles):
+        """
+        Executes instructions without returning to the caller between them
+
+        :param cycles: Number of instructions to execute
+        :return: (number of instructions executed, stop reason)
+        """
+        return self._run(cycles, None, None, None)
+
+    def run_until(self, pc=None, predicate=None, max_cycles=None):
+        """
+        Executes instructions until the PC reaches an address or a predicate is met
+
+        :param pc: Address to stop at, before executing the instruction it points to
+        :param predicate: Callable given this machine after each instruction, stops when it returns True
+            (the cycle counter is only updated when returning)
+        :param max_cycles: Maximum number of instructions to execute (default: unlimited)
+        :return: (number of instructions executed, stop reason)
+        """
+        return self._run(max_cycles, pc, predicate, None)
+
+    def run_frames(self, frames, max_cycles=None):
+        """
+        Executes instructions for a number of frames, a frame starting with each tick of the timers
+
+        :param frames: Number of frames to execute
+        :param max_cycles: Maximum number of instructions to execute (default: unlimited)
+        :return: (number of instructions executed, stop reason)
+        """
+        return self._run(max_cycles, None, None, frames)
+
+    def _run(self, max_cycles, stop_pc, predicate, max_frames):
+        memory = self.memory
+        execute = self.execute
+        count_down_timers = self._count_down_timers
+        execute_instrumented = self._execute_instrumented if self.is_instrumented() else None
+        now = time.time
+        virtual = self.clock == self.CLOCK_VIRTUAL
+        cycle_counter = self._cycle_counter
+        frame_duration = self.instructions_per_frame if virtual else 1000.0 / self.TIMER_FREQUENCY
+        next_timer = self.next_timer
+        executed = 0
+        frames = 0
+        reason = self.STOP_CYCLES
+        try:
+            while max_cycles is None or executed < max_cycles:
+                pc = self.pc
+                if pc == stop_pc:
+                    reason = self.STOP_PC
+                    break
+                if virtual:
+                    if cycle_counter + executed >= next_timer:
+                        if frames == max_frames:
+                            reason = self.STOP_FRAMES
+                            break
+                        count_down_timers()
+                        next_timer += frame_duration
+                        frames += 1
+                else:
+                    current_time = now() * 1000.0
+                    if current_time > next_timer:
+                        if frames == max_frames:
+                            reason = self.STOP_FRAMES
+                            break
+                        count_down_timers()
+                        next_timer = current_time + frame_duration
+                        frames += 1
+                executed += 1
+                self.pc = pc + 0x2
+                if execute_instrumented is None:
+                    execute((memory[pc] << 8) | memory[pc + 1])
+                else:
+                    execute_instrumented(cycle_counter + executed, pc, (memory[pc] << 8) | memory[pc + 1])
+                if predicate is not None and predicate(self):
+                    reason = self.STOP_PREDICATE
+                    break
+        finally:
+            self.next_timer = next_timer
+            self._cycle_counter += executed
+        return executed, reason
+
     def get_cycle_counter(self):
         return self._cycle_counter
 
+    def _update_timers(self):
+        if self.clock == self.CLOCK_VIRTUAL:
+            if self._cycle_counter >= self.next_timer:
+                self._count_down_timers()
+                self.next_timer += self.instructions_per_frame
+        else:
+            current_time = time.time() * 1000.0
+            if current_time > self.next_timer:
+                self._count_down_timers()
+                self.next_timer = current_time + (1000.0 / self.TIMER_FREQUENCY)
+
+    def set_seed(self, seed):
+        """
+        Seeds the random generator of CXNN, making the runs reproducible
+
+        A seeded machine draws from its own xorshift32 generator, whose state is part of its snapshots. Without a
+        seed CXNN draws from the random module.
+
+        :param seed: Integer, reduced to 32 bits (see normalize_seed()), None for the random module
+        """
+        self.seed = self.normalize_seed(seed)
+        self._random_state = None if seed is None else self.seed or self.RANDOM_ZERO_SEED
+
+    @classmethod
+    def normalize_seed(cls, seed):
+        """
+        :return: The 32 bits of a seed drawing the same numbers, None for None
+        """
+        return None if seed is None else seed & cls.SEED_MASK
+
+    def random_byte(self):
+        """
+        :return: Next random number of CXNN, from 0x00 to 0xFF
+        """
+        x = self._random_state
+        if x is None:
+            return random.randint(0x0, 0xff)
+        # xorshift32
+        x ^= (x << 13) & 0xffffffff
+        x ^= x >> 17
+        x ^= (x << 5) & 0xffffffff
+        self._random_state = x
+        return x >> 24
+
     def _count_down_timers(self):
+        self.input.next_frame()
         if self.delay_timer > 0:
             self.delay_timer -= 1
         if self.sound_timer > 0:
+            self.sound_timer -= 1
             audio_player.play()
         else:
             audio_player.stop()
@@ -139,9 +399,11 @@ class Chip8(object):
         return ((self.memory[self.pc] << 8) & 0xff00) | (self.memory[self.pc + 1] & 0xff)
 
     def execute(self, instruction):
+        # X and Y are 4 bits wide and values are masked, so registers are accessed without _get_v checks
+        registers = self.registers
         # 00E0 Clears the screen.
         if instruction == 0x00e0:
-            self.video = bytearray(64 * 32)
+            self.framebuffer.clear()
         # 00EE Returns from a subroutine.
         elif instruction == 0x00ee:
             self.sp -= 1
@@ -159,14 +421,14 @@ class Chip8(object):
         # 3XNN Skips the next instruction if VX equals NN.
         elif instruction >> 12 == 0x3:
             x = (instruction & 0x0f00) >> 8
-            nn = instruction & 0x0fff
-            if self._get_v(x) == nn:
+            nn = instruction & 0x00ff
+            if registers[x] == nn:
                 self.pc += 2
         # 4XNN Skips the next instruction if VX doesn't equal NN.
         elif instruction >> 12 == 0x4:
             x = (instruction & 0x0f00) >> 8
-            nn = instruction & 0x0fff
-            if self._get_v(x) != nn:
+            nn = instruction & 0x00ff
+            if registers[x] != nn:
                 self.pc += 2
         # 5XYN
         elif instruction >> 12 == 0x5:
@@ -175,7 +437,7 @@ class Chip8(object):
             n = instruction & 0x000f
             # 5XY0 Skips the next instruction if VX equals VY.
             if n == 0x0:
-                if self._get_v(x) == self._get_v(y):
+                if registers[x] == registers[y]:
                     self.pc += 2
             else:
                 self._unsupported_instruction(instruction)
@@ -183,12 +445,12 @@ class Chip8(object):
         elif instruction >> 12 == 0x6:
             x = (instruction & 0x0f00) >> 8
             nn = instruction & 0x00ff
-            self._set_v(x, nn)
+            registers[x] = nn
         # 7XNN Adds NN to VX.
         elif instruction >> 12 == 0x7:
             x = (instruction & 0x0f00) >> 8
             nn = instruction & 0x00ff
-            self._set_v(x, self._get_v(x) + nn)
+            registers[x] = (registers[x] + nn) & 0xff
         # 8XYN
         elif instruction >> 12 == 0x8:
             x = (instruction & 0x0f00) >> 8
@@ -196,38 +458,41 @@ class Chip8(object):
             n = instruction & 0x000f
             # 8XY0 Sets VX to the value of VY.
             if n == 0x0:
-                self._set_v(x, self._get_v(y))
+                registers[x] = registers[y]
             # 8XY1 Sets VX to VX or VY.
             elif n == 0x1:
-                self._set_v(x, self._get_v(x) | self._get_v(y))
+                registers[x] |= registers[y]
             # 8XY2 Sets VX to VX and VY.
             elif n == 0x2:
-                self._set_v(x, self._get_v(x) & self._get_v(y))
+                registers[x] &= registers[y]
             # 8XY3 Sets VX to VX xor VY.
             elif n == 0x3:
-                self._set_v(x, self._get_v(x) ^ self._get_v(y))
+                registers[x] ^= registers[y]
             # 8XY4 Adds VY to VX. VF is set to 1 when there's a carry, and to 0 when there isn't.
             elif n == 0x4:
-                overflow = self._set_v(x, self._get_v(x) + self._get_v(y))
-                self._set_v(0xf, 1 if overflow else 0)
+                val = registers[x] + registers[y]
+                registers[x] = val & 0xff
+                registers[0xf] = 1 if val > 0xff else 0
             # 8XY5 VY is subtracted from VX. VF is set to 0 when there's a borrow, and 1 when there isn't.
             elif n == 0x5:
-                underflow = self._set_v(x, self._get_v(x) - self._get_v(y))
-                self._set_v(0xf, 0 if underflow else 1)
+                val = registers[x] - registers[y]
+                registers[x] = val & 0xff
+                registers[0xf] = 0 if val < 0 else 1
             # 8XY6 Shifts VX right by one. VF is set to the value of the least significant bit of VX before the shift.
             elif n == 0x6:
-                vx = self._get_v(x)
-                self._set_v(0xf, vx & 0x1)
-                self._set_v(x, vx >> 1)
+                vx = registers[x]
+                registers[0xf] = vx & 0x1
+                registers[x] = vx >> 1
             # 8XY7 Sets VX to VY minus VX. VF is set to 0 when there's a borrow, and 1 when there isn't.
             elif n == 0x7:
-                underflow = self._set_v(x, self._get_v(y) - self._get_v(x))
-                self._set_v(0xf, 0 if underflow else 1)
+                val = registers[y] - registers[x]
+                registers[x] = val & 0xff
+                registers[0xf] = 0 if val < 0 else 1
             # 8XYE Shifts VX left by one. VF is set to the value of the most significant bit of VX before the shift.
             elif n == 0xe:
-                vx = self._get_v(x)
-                self._set_v(0xf, (vx >> 7) & 0x1)
-                self._set_v(x, vx << 1)
+                vx = registers[x]
+                registers[0xf] = (vx >> 7) & 0x1
+                registers[x] = (vx << 1) & 0xff
             else:
                 self._unsupported_instruction(instruction)
         # 9XYN
@@ -237,7 +502,7 @@ class Chip8(object):
             n = instruction & 0x000f
             # 9XY0 Skips the next instruction if VX doesn't equal VY.
             if n == 0x0:
-                if self._get_v(x) != self._get_v(y):
+                if registers[x] != registers[y]:
                     self.pc += 2
             else:
                 self._unsupported_instruction(instruction)
@@ -248,12 +513,12 @@ class Chip8(object):
         # BNNN Jumps to the address NNN plus V0.
         elif instruction >> 12 == 0xb:
             nnn = instruction & 0x0fff
-            self.pc = nnn + self.get_v0()
+            self.pc = nnn + registers[0x0]
         # CXNN Sets VX to the result of a bitwise and operation on a random number and NN.
         elif instruction >> 12 == 0xc:
             x = (instruction & 0x0f00) >> 8
             nn = instruction & 0x00ff
-            self._set_v(x, random.randint(0x0, 0xff) & nn)
+            registers[x] = self.random_byte() & nn
         # DXYN Draws a sprite at coordinate (VX, VY) that has a width of 8 pixels and a height of N pixels.
         #  Each row of 8 pixels is read as bit-coded starting from memory location I;
         #  I value doesn't change after the execution of this instruction.
@@ -263,25 +528,20 @@ class Chip8(object):
             x = (instruction & 0x0f00) >> 8
             y = (instruction & 0x00f0) >> 4
             n = instruction & 0x000f
-            sx = self._get_v(x)
-            sy = self._get_v(y)
-            self._set_v(0xf, 0x0)
-            for i in range(0, n):
-                old_sprite = self._get_sprite(sx, sy + i)
-                self._write_sprite(sx, sy + i, self.memory[self.i_register + i])
-                if (self.memory[self.i_register + i] & old_sprite) != 0:
-                    self._set_v(0xf, 0x1)
+            sx = registers[x]
+            sy = registers[y]
+            registers[0xf] = self.framebuffer.draw(sx, sy, self.memory, self.i_register, n)
         # EXNN
         elif instruction >> 12 == 0xe:
             x = (instruction & 0x0f00) >> 8
             nn = instruction & 0xff
             # EX9E Skips the next instruction if the key stored in VX is pressed.
             if nn == 0x9e:
-                if self.input.read() == self._get_v(x):
+                if self.input.read() == registers[x]:
                     self.pc += 0x02
             # EXA1 Skips the next instruction if the key stored in VX isn't pressed.
             elif nn == 0xa1:
-                if self.input.read() != self._get_v(x):
+                if self.input.read() != registers[x]:
                     self.pc += 0x02
             else:
                 self._unsupported_instruction(instruction)
@@ -291,27 +551,27 @@ class Chip8(object):
             nn = instruction & 0x00ff
             # FX07 Sets VX to the value of the delay timer.
             if nn == 0x07:
-                self._set_v(x, self.delay_timer)
+                registers[x] = self.delay_timer
             # FX0A A key press is awaited, and then stored in VX.
             elif nn == 0x0a:
                 i = self.input.read()
                 if i is None:
                     self.pc -= 2  # wait
                 else:
-                    self._set_v(x, i)
+                    registers[x] = i
             # FX15 Sets the delay timer to VX.
             elif nn == 0x15:
-                self.delay_timer = self._get_v(x)
+                self.delay_timer = registers[x]
             # FX18 Sets the sound timer to VX.
             elif nn == 0x18:
-                self.sound_timer = self._get_v(x)
+                self.sound_timer = registers[x]
             # FX1E Adds VX to I.
             elif nn == 0x1e:
-                self.i_register += self._get_v(x)
+                self.i_register += registers[x]
             # FX29 Sets I to the location of the sprite for the character in VX.
             #  Characters 0-F (in hexadecimal) are represented by a 4x5 font.
             elif nn == 0x29:
-                self.i_register = self._get_v(x) * 5
+                self.i_register = registers[x] * 5
             # FX33 Stores the binary-coded decimal representation of VX,
             #  with the most significant of three digits at the address in I,
             #  the middle digit at I plus 1, and the least significant digit at I plus 2.
@@ -319,10 +579,11 @@ class Chip8(object):
             #  place the hundreds digit in memory at location in I,
             #  the tens digit at location I+1, and the ones digit at location I+2.)
             elif nn == 0x33:
-                vx = self._get_v(x)
+                vx = registers[x]
                 self.memory[self.i_register] = int(vx / 100)
                 self.memory[self.i_register + 1] = int((vx % 100) / 10)
                 self.memory[self.i_register + 2] = int(vx % 10)
+                self._memory_written(self.i_register, 3)
             # FX55 Stores V0 to VX (including VX) in memory starting at address I.
             elif nn == 0x55:
                 self._unsupported_instruction(instruction)  # TODO
@@ -334,18 +595,6 @@ class Chip8(object):
         else:
             self._unsupported_instruction(instruction)
 
-    def _set_v(self, r, val):
-        """
-        Sets the value of a register
-
-        :param r: Register index (0x0 to 0xf)
-        :param val: Value of the register (0x00 to 0xff)
-        :return: True if underflow (val < 0x00) or overflow (val > 0xff)
-        """
-        self._ensure_register(r)
-        self.registers[r] = val & 0xff
-        return (val < 0x00) or (val | 0xff > 0xff)
-
     def _get_v(self, r):
         self._ensure_register(r)
         return self.registers[r]
@@ -405,33 +654,167 @@ class Chip8(object):
         return self.pc
 
     def _get_sprite(self, x, y):
-        index = (x % 64) + (y % 32) * 64
-        sprite_bits = self.video[index:index + 8]
-        # pack as byte
-        return reduce(lambda n, i: n | (i[1] << (7 - i[0])), zip(range(0, 8), sprite_bits), 0)
-
-    def _write_sprite(self, x, y, sprite):
-        index = (x % 64) + (y % 32) * 64
-        self.video[0 + index] ^= (sprite & 0b10000000) >> 7
-        self.video[1 + index] ^= (sprite & 0b01000000) >> 6
-        self.video[2 + index] ^= (sprite & 0b00100000) >> 5
-        self.video[3 + index] ^= (sprite & 0b00010000) >> 4
-        self.video[4 + index] ^= (sprite & 0b00001000) >> 3
-        self.video[5 + index] ^= (sprite & 0b00000100) >> 2
-        self.video[6 + index] ^= (sprite & 0b00000010) >> 1
-        self.video[7 + index] ^= (sprite & 0b00000001)
-
-    def get_screen(self):
-        return self.video[:]
-
-    def get_memory(self):
-        return self.memory[:]
+        return self.framebuffer.get_sprite(x, y)
+
+    def get_screen(self, copy=True):
+        """
+        :param copy: False for a read-only view instead of a copy (see Framebuffer.get_screen)
+        :return: One byte (0 or 1) per pixel, line by line
+        """
+        return self.framebuffer.get_screen(copy)
+
+    def consume_dirty(self):
+        """
+        Returns and forgets the lines and columns of the screen changed (by DXYN and 00E0) since the previous call
+
+        :return: (lines, columns) lists of indexes, None if the screen did not change
+        """
+        return self.framebuffer.consume_dirty()
+
+    def set_screen_listener(self, listener):
+        """
+        Sets the callable called with the framebuffer each time an instruction changes the screen
+
+        :param listener: Callable, None to remove the listener
+        """
+        self.framebuffer.on_change = listener
+
+    def get_memory(self, copy=True):
+        """
+        :param copy: False for a read-only view of the memory, following its changes, instead of a copy
+        :return: bytearray, or memoryview when not a copy
+        """
+        if copy:
+            return self.memory[:]
+        return self._memory_view
+
+    def snapshot(self):
+        """
+        Captures the whole state of the machine (but its input and listeners) in one buffer
+
+        :return: bytearray, to be given to restore()
+        """
+        header = self.SNAPSHOT_HEADER
+        memory_end = header.size + len(self.memory)
+        snap = bytearray(memory_end + Framebuffer.WIDTH * Framebuffer.HEIGHT)
+        snap[0:header.size] = self.get_state()
+        snap[header.size:memory_end] = self.memory
+        snap[memory_end:] = self.framebuffer.dump()
+        return snap
+
+    def get_state(self):
+        """
+        Packs the registers, I, PC, SP, stack, timers, clock, random generator and seed in one blob (the header
+        of snapshot())
+
+        :return: bytes, to be given to set_state()
+        """
+        return self.SNAPSHOT_HEADER.pack(self.SNAPSHOT_MAGIC, self.SNAPSHOT_VERSION,
+                                         1 if self.clock == self.CLOCK_VIRTUAL else 0, self.instructions_per_frame,
+                                         self.pc, self.i_register, self.sp, self.delay_timer, self.sound_timer,
+                                         self._cycle_counter, self.next_timer,
+                                         *(list(self.registers) + list(self.stack) +
+                                           [self._random_state or 0, self.seed is not None, self.seed or 0]))
+
+    def restore(self, snap):
+        """
+        Restores a state captured by snapshot(), the whole screen being marked as changed
+
+        :param snap: Snapshot (bytearray or bytes)
+        """
+        header = self.SNAPSHOT_HEADER
+        memory_end = header.size + len(self.memory)
+        if len(snap) != memory_end + Framebuffer.WIDTH * Framebuffer.HEIGHT:
+            raise ValueError('Snapshot size %d does not match this machine' % len(snap))
+        self.set_state(snap)
+        view = memoryview(snap)
+        self.memory[:] = view[header.size:memory_end]
+        self._memory_written(0, len(self.memory))
+        self.framebuffer.load(view[memory_end:])
+
+    def set_state(self, state):
+        """
+        Restores the registers, I, PC, SP, stack, timers, clock, random generator and seed packed by get_state(),
+        so reset() seeds the generator as the machine the state was captured from
+
+        :param state: State blob, or a whole snapshot
+        """
+        values = self.SNAPSHOT_HEADER.unpack_from(state, 0)
+        magic, version = values[0:2]
+        if magic != self.SNAPSHOT_MAGIC:
+            raise ValueError('Not a Chip8 snapshot')
+        if version != self.SNAPSHOT_VERSION:
+            raise ValueError('Unsupported snapshot version %d' % version)
+        (virtual, self.instructions_per_frame, self.pc, self.i_register, self.sp, self.delay_timer,
+         self.sound_timer, self._cycle_counter, self.next_timer) = values[2:11]
+        self.clock = self.CLOCK_VIRTUAL if virtual else self.CLOCK_WALL
+        self.registers[:] = bytearray(values[11:27])
+        self.stack[:] = array.array('i', values[27:43])
+        self._random_state = values[43] or None
+        self.seed = values[45] if values[44] else None
+
+    def reset(self):
+        """
+        Restarts the machine from its prototype: memory as when created (fonts and ROM, see set_prototype()), blank
+        screen, zeroed registers, stack, timers and cycle counter, random generator seeded again
+
+        Only the pages of memory which differ from the prototype are copied (and reported as written), so an engine
+        keeps what it cached about the others. The clock, input, tracer, profiler and listeners are kept.
+        """
+        memory = self.memory
+        prototype = self._prototype
+        if memory != prototype:
+            page_size = self.PAGE_SIZE
+            for address in range(0, len(memory), page_size):
+                end = address + page_size
+                if memory[address:end] != prototype[address:end]:
+                    memory[address:end] = prototype[address:end]
+                    self._memory_written(address, page_size)
+        self.framebuffer.clear()
+        self.registers[:] = bytearray(16)
+        self.stack[:] = array.array('i', (0 for _ in range(0, 16)))
+        self.i_register = 0x0
+        self.pc = 0x0200
+        self.sp = 0
+        self.delay_timer = 0
+        self.sound_timer = 0
+        self._cycle_counter = 0
+        # next_timer is a time in ms for the wall clock, a cycle count for the virtual clock
+        self.next_timer = 0
+        self.set_seed(self.seed)
+
+    def set_prototype(self, memory=None):
+        """
+        Changes the memory restored by reset()
+
+        :param memory: Memory image (bytes or bytearray of MEMORY_SIZE bytes), the current memory when None
+        """
+        if memory is None:
+            memory = self.memory
+        if len(memory) != len(self.memory):
+            raise ValueError('Prototype size %d does not match this machine' % len(memory))
+        self._prototype = bytes(memory)
+
+    def save_snapshot(self, path):
+        """
+        Writes a snapshot() to a file
+        """
+        with open(path, 'wb') as snapshot_file:
+            snapshot_file.write(self.snapshot())
+
+    def load_snapshot(self, path):
+        """
+        Restores a snapshot written by save_snapshot()
+        """
+        with open(path, 'rb') as snapshot_file:
+            self.restore(bytearray(snapshot_file.read()))
 
     def _dump_screen(self, label='', file=sys.stderr):
         self._print('dumping screen %s' % label, file=file)
-        for y in range(0, 31):
-            index = y * 64
-            row = self.video[index:index + 64]
+        screen = self.get_screen()
+        for y in range(0, Framebuffer.HEIGHT):
+            index = y * Framebuffer.WIDTH
+            row = screen[index:index + Framebuffer.WIDTH]
             self._print(' '.join(['@' if b else '.' for b in row]), file=file)
 
     def debug_dump(self, file=sys.stderr, **kwargs):
@@ -461,9 +844,30 @@ class Chip8(object):
                  )
         dump('============================')
 
+    def consume_written_pages(self):
+        """
+        Returns and forgets the pages of memory written (by FX33 or restore()) since the previous call
+
+        Writes into self.memory from outside of the machine are not tracked.
+
+        :return: Mask of the pages, bit n being set for the PAGE_SIZE bytes starting at n * PAGE_SIZE
+        """
+        pages = self._written_pages
+        self._written_pages = 0
+        return pages
+
+    def _memory_written(self, address, length):
+        """
+        Called after an instruction stored bytes in memory
+
+        :param address: Address of the first byte written
+        :param length: Number of bytes written
+        """
+        for page in range(address // self.PAGE_SIZE, (address + length - 1) // self.PAGE_SIZE + 1):
+            self._written_pages |= 1 << page
+
     def _load_fonts(self, memory):
-        for i, c in enumerate(self.FONTS):
-            memory[i] = c
+        memory[0:len(self.FONT_DATA)] = self.FONT_DATA
         return memory
 
     @staticmethod
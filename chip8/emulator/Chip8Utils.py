@@ -1,24 +1,182 @@
-import mmap
+import hashlib
+import io
 import os
+import zipfile
+from collections import OrderedDict
 
 from chip8.emulator.Chip8 import Chip8
+from chip8.emulator.DispatchChip8 import DispatchChip8
+from chip8.emulator.TranslatingChip8 import TranslatingChip8
+
+
+class RomCache(object):
+    """
+    Least recently used memory images of ROMs, keyed by the SHA-1 of their content
+
+    Loading a ROM again only costs hashing it and copying its image into the memory of the new machine.
+    """
+
+    def __init__(self, size=64):
+        """
+        :param size: Maximum number of images kept
+        """
+        if size < 1:
+            raise ValueError('Cache size must be positive (given: %s)' % size)
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._images = OrderedDict()
+
+    def get_image(self, rom):
+        """
+        :param rom: Content of the ROM
+        :return: bytes of the initial memory of a machine running the ROM (see Chip8Utils.create_image)
+        """
+        key = hashlib.sha1(rom).digest()
+        image = self._images.pop(key, None)
+        if image is None:
+            image = Chip8Utils.create_image(rom)
+            self.misses += 1
+        else:
+            self.hits += 1
+        self._images[key] = image
+        if len(self._images) > self.size:
+            self._images.popitem(last=False)
+        return image
+
+    def __len__(self):
+        return len(self._images)
+
+    def __contains__(self, rom):
+        return hashlib.sha1(rom).digest() in self._images
+
+    def clear(self):
+        self._images.clear()
 
 
 class Chip8Utils(object):
+    INTERPRETER = 'interpreter'
+    DISPATCH = 'dispatch'
+    TRANSLATING = 'translating'
+
+    ENGINES = {
+        INTERPRETER: Chip8,
+        DISPATCH: DispatchChip8,
+        TRANSLATING: TranslatingChip8,
+    }
+
+    # memory images of the ROMs loaded by create_from_rom
+    ROM_CACHE = RomCache()
+
+    @staticmethod
+    def get_engine(engine=None):
+        if not engine:
+            engine = Chip8Utils.INTERPRETER
+        if engine not in Chip8Utils.ENGINES:
+            raise ValueError('Engine "%s" does not exist' % engine)
+        return Chip8Utils.ENGINES[engine]
+
+    # https://en.wikipedia.org/wiki/CHIP-8#Memory
+    # Real Chip8 memory would have its first 512 (0x0200) bytes
+    # occupied by the interpreter itself
+    ROM_ADDRESS = 0x0200
+    MAX_ROM_SIZE = Chip8.MEMORY_SIZE - ROM_ADDRESS
+
     @staticmethod
-    def create_from_rom(path, input_kb=None):
-        if not os.path.isfile(path):
-            raise RuntimeError('File "%s" does not exist' % path)
+    def read_rom(source, member=None):
+        """
+        Reads the content of a ROM
+
+        :param source: Path, file object or content (bytearray, memoryview, or bytes on Python 3) of the ROM, or of
+        a zip archive of ROMs
+        :param member: Name of the ROM in the zip archive; may be omitted for an archive of a single file
+        :return: bytes of the ROM
+        """
+        if Chip8Utils._is_content(source):
+            source = io.BytesIO(bytearray(source))
+        elif not hasattr(source, 'read'):
+            if not os.path.isfile(source):
+                raise RuntimeError('File "%s" does not exist' % source)
+            if member is None and not zipfile.is_zipfile(source):
+                with open(source, 'rb') as rom_file:
+                    return rom_file.read()
+        elif not Chip8Utils._is_seekable(source):
+            source = io.BytesIO(source.read())
+
+        if member is None and hasattr(source, 'read'):
+            position = source.tell()
+            is_archive = zipfile.is_zipfile(source)
+            source.seek(position)
+            if not is_archive:
+                return source.read()
+
+        with zipfile.ZipFile(source) as archive:
+            if member is None:
+                names = [info.filename for info in archive.infolist() if not info.filename.endswith('/')]
+                if len(names) != 1:
+                    raise ValueError('Archive holds %d ROMs (%s), the name of the one to load is required'
+                                     % (len(names), ', '.join(names)))
+                member = names[0]
+            return archive.read(member)
 
-        with open(path, 'rb') as rom_file:
-            rom = mmap.mmap(rom_file.fileno(), 0, access=mmap.ACCESS_READ)
+    @staticmethod
+    def read_archive(source):
+        """
+        :param source: Path, file object or content of a zip archive of ROMs
+        :return: Generator of (name, bytes of the ROM), in archive order
+        """
+        if Chip8Utils._is_content(source):
+            source = io.BytesIO(bytearray(source))
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                if not info.filename.endswith('/'):
+                    yield info.filename, archive.read(info)
+
+    @staticmethod
+    def _is_seekable(source):
+        if hasattr(source, 'seekable'):
+            return source.seekable()
+        # Python 2 files, pipes failing to tell
+        try:
+            source.tell()
+        except (AttributeError, IOError):
+            return False
+        return True
 
+    @staticmethod
+    def _is_content(source):
+        # bytes is str on Python 2, where a str is a path
+        return isinstance(source, (bytearray, memoryview)) or (bytes is not str and isinstance(source, bytes))
+
+    @staticmethod
+    def create_image(rom):
+        """
+        :param rom: Content of the ROM
+        :return: bytes of the initial memory of a machine running the ROM
+        """
+        if len(rom) > Chip8Utils.MAX_ROM_SIZE:
+            raise ValueError('ROM of %d bytes does not fit in memory (%d bytes at most)'
+                             % (len(rom), Chip8Utils.MAX_ROM_SIZE))
         memory = bytearray(Chip8.MEMORY_SIZE)
-        if rom:
-            for index, b in enumerate(rom):
-                # https://en.wikipedia.org/wiki/CHIP-8#Memory
-                # Real Chip8 memory would have its first 512 (0x0200) bytes
-                # occupied by the interpreter itself
-                memory[0x0200 + index] = b
-
-        return Chip8(memory=memory, input_kb=input_kb)
+        memory[Chip8Utils.ROM_ADDRESS:Chip8Utils.ROM_ADDRESS + len(rom)] = rom
+        return bytes(memory)
+
+    @staticmethod
+    def create_from_rom(path, input_kb=None, engine=None, member=None, cache=None, **kwargs):
+        """
+        Creates a Chip8 with a ROM loaded at 0x0200
+
+        :param path: Path, file object or content of the ROM, or of a zip archive of ROMs (see read_rom)
+        :param input_kb: Input of the machine
+        :param engine: Name of the engine in ENGINES (default: interpreter)
+        :param member: Name of the ROM in the zip archive
+        :param cache: RomCache of the memory images, None for ROM_CACHE, False for none
+        :param kwargs: Other arguments of the engine constructor (clock, instructions_per_frame, framebuffer, seed)
+        :return: The Chip8 engine instance
+        """
+        chip8_class = Chip8Utils.get_engine(engine)
+        rom = Chip8Utils.read_rom(path, member)
+        if cache is None:
+            cache = Chip8Utils.ROM_CACHE
+        image = Chip8Utils.create_image(rom) if cache is False else cache.get_image(rom)
+        return chip8_class(memory=bytearray(image), input_kb=input_kb, **kwargs)
@@ -0,0 +1,256 @@
+from chip8.emulator.Chip8 import Chip8
+
+
+class DispatchChip8(Chip8):
+    """
+    Chip8 engine decoding instructions through handler tables instead of the if/elif chain of Chip8.execute
+
+    Each instruction word is decoded once into a handler bound to this machine and its X, Y, NN and NNN operands,
+    the decoded form is then cached so executing it again is a dict lookup and a call.
+    """
+
+    # Handler names indexed by opcode family (instruction >> 12).
+    # Families with sub-opcodes map to (sub-opcode mask, {sub-opcode: handler name}).
+    HANDLERS = (
+        (0x0fff, {
+            0x0e0: '_op_clear_screen',
+            0x0ee: '_op_return',
+        }),
+        '_op_jump',
+        '_op_call',
+        '_op_skip_vx_eq_nn',
+        '_op_skip_vx_ne_nn',
+        (0x000f, {
+            0x0: '_op_skip_vx_eq_vy',
+        }),
+        '_op_set_vx_nn',
+        '_op_add_vx_nn',
+        (0x000f, {
+            0x0: '_op_set_vx_vy',
+            0x1: '_op_or_vx_vy',
+            0x2: '_op_and_vx_vy',
+            0x3: '_op_xor_vx_vy',
+            0x4: '_op_add_vx_vy',
+            0x5: '_op_sub_vx_vy',
+            0x6: '_op_shr_vx',
+            0x7: '_op_subn_vx_vy',
+            0xe: '_op_shl_vx',
+        }),
+        (0x000f, {
+            0x0: '_op_skip_vx_ne_vy',
+        }),
+        '_op_set_i',
+        '_op_jump_v0',
+        '_op_random',
+        '_op_draw',
+        (0x00ff, {
+            0x9e: '_op_skip_key_pressed',
+            0xa1: '_op_skip_key_not_pressed',
+        }),
+        (0x00ff, {
+            0x07: '_op_get_delay_timer',
+            0x0a: '_op_wait_key',
+            0x15: '_op_set_delay_timer',
+            0x18: '_op_set_sound_timer',
+            0x1e: '_op_add_i_vx',
+            0x29: '_op_set_i_font',
+            0x33: '_op_store_bcd',
+        }),
+    )
+
+    __slots__ = ('_decoded',)
+
+    def __init__(self, *args, **kwargs):
+        super(DispatchChip8, self).__init__(*args, **kwargs)
+        self._decoded = {}
+
+    def execute(self, instruction):
+        try:
+            handler, x, y, nn, nnn = self._decoded[instruction]
+        except KeyError:
+            handler, x, y, nn, nnn = self._decoded[instruction] = self.decode(instruction)
+        handler(x, y, nn, nnn)
+
+    def decode(self, instruction):
+        """
+        Decodes an instruction into its handler and operands
+
+        :param instruction: Instruction (0x0000 to 0xffff)
+        :return: (handler, x, y, nn, nnn), handler being bound to this machine
+        """
+        name = self.HANDLERS[instruction >> 12]
+        if isinstance(name, tuple):
+            mask, sub_opcodes = name
+            name = sub_opcodes.get(instruction & mask)
+        if name is None:
+            return self._op_unsupported, instruction, None, None, None
+        return (getattr(self, name),
+                (instruction & 0x0f00) >> 8,
+                (instruction & 0x00f0) >> 4,
+                instruction & 0x00ff,
+                instruction & 0x0fff)
+
+    # 00E0 Clears the screen.
+    def _op_clear_screen(self, x, y, nn, nnn):
+        self.framebuffer.clear()
+
+    # 00EE Returns from a subroutine.
+    def _op_return(self, x, y, nn, nnn):
+        self.sp -= 1
+        self.pc = self.stack[self.sp]
+
+    # 1NNN Jumps to address NNN.
+    def _op_jump(self, x, y, nn, nnn):
+        self.pc = nnn
+
+    # 2NNN Calls subroutine at NNN.
+    def _op_call(self, x, y, nn, nnn):
+        self.stack[self.sp] = self.pc
+        self.sp += 1
+        self.pc = nnn
+
+    # 3XNN Skips the next instruction if VX equals NN.
+    def _op_skip_vx_eq_nn(self, x, y, nn, nnn):
+        if self.registers[x] == nn:
+            self.pc += 2
+
+    # 4XNN Skips the next instruction if VX doesn't equal NN.
+    def _op_skip_vx_ne_nn(self, x, y, nn, nnn):
+        if self.registers[x] != nn:
+            self.pc += 2
+
+    # 5XY0 Skips the next instruction if VX equals VY.
+    def _op_skip_vx_eq_vy(self, x, y, nn, nnn):
+        if self.registers[x] == self.registers[y]:
+            self.pc += 2
+
+    # 6XNN Sets VX to NN.
+    def _op_set_vx_nn(self, x, y, nn, nnn):
+        self.registers[x] = nn
+
+    # 7XNN Adds NN to VX.
+    def _op_add_vx_nn(self, x, y, nn, nnn):
+        self.registers[x] = (self.registers[x] + nn) & 0xff
+
+    # 8XY0 Sets VX to the value of VY.
+    def _op_set_vx_vy(self, x, y, nn, nnn):
+        self.registers[x] = self.registers[y]
+
+    # 8XY1 Sets VX to VX or VY.
+    def _op_or_vx_vy(self, x, y, nn, nnn):
+        self.registers[x] |= self.registers[y]
+
+    # 8XY2 Sets VX to VX and VY.
+    def _op_and_vx_vy(self, x, y, nn, nnn):
+        self.registers[x] &= self.registers[y]
+
+    # 8XY3 Sets VX to VX xor VY.
+    def _op_xor_vx_vy(self, x, y, nn, nnn):
+        self.registers[x] ^= self.registers[y]
+
+    # 8XY4 Adds VY to VX. VF is set to 1 when there's a carry, and to 0 when there isn't.
+    def _op_add_vx_vy(self, x, y, nn, nnn):
+        registers = self.registers
+        val = registers[x] + registers[y]
+        registers[x] = val & 0xff
+        registers[0xf] = 1 if val > 0xff else 0
+
+    # 8XY5 VY is subtracted from VX. VF is set to 0 when there's a borrow, and 1 when there isn't.
+    def _op_sub_vx_vy(self, x, y, nn, nnn):
+        registers = self.registers
+        val = registers[x] - registers[y]
+        registers[x] = val & 0xff
+        registers[0xf] = 0 if val < 0 else 1
+
+    # 8XY6 Shifts VX right by one. VF is set to the value of the least significant bit of VX before the shift.
+    def _op_shr_vx(self, x, y, nn, nnn):
+        registers = self.registers
+        vx = registers[x]
+        registers[0xf] = vx & 0x1
+        registers[x] = vx >> 1
+
+    # 8XY7 Sets VX to VY minus VX. VF is set to 0 when there's a borrow, and 1 when there isn't.
+    def _op_subn_vx_vy(self, x, y, nn, nnn):
+        registers = self.registers
+        val = registers[y] - registers[x]
+        registers[x] = val & 0xff
+        registers[0xf] = 0 if val < 0 else 1
+
+    # 8XYE Shifts VX left by one. VF is set to the value of the most significant bit of VX before the shift.
+    def _op_shl_vx(self, x, y, nn, nnn):
+        registers = self.registers
+        vx = registers[x]
+        registers[0xf] = (vx >> 7) & 0x1
+        registers[x] = (vx << 1) & 0xff
+
+    # 9XY0 Skips the next instruction if VX doesn't equal VY.
+    def _op_skip_vx_ne_vy(self, x, y, nn, nnn):
+        if self.registers[x] != self.registers[y]:
+            self.pc += 2
+
+    # ANNN Sets I to the address NNN.
+    def _op_set_i(self, x, y, nn, nnn):
+        self.i_register = nnn
+
+    # BNNN Jumps to the address NNN plus V0.
+    def _op_jump_v0(self, x, y, nn, nnn):
+        self.pc = nnn + self.registers[0x0]
+
+    # CXNN Sets VX to the result of a bitwise and operation on a random number and NN.
+    def _op_random(self, x, y, nn, nnn):
+        self.registers[x] = self.random_byte() & nn
+
+    # DXYN Draws a sprite at coordinate (VX, VY) that has a width of 8 pixels and a height of N pixels.
+    def _op_draw(self, x, y, nn, nnn):
+        registers = self.registers
+        registers[0xf] = self.framebuffer.draw(registers[x], registers[y], self.memory, self.i_register, nn & 0x000f)
+
+    # EX9E Skips the next instruction if the key stored in VX is pressed.
+    def _op_skip_key_pressed(self, x, y, nn, nnn):
+        if self.input.read() == self.registers[x]:
+            self.pc += 0x02
+
+    # EXA1 Skips the next instruction if the key stored in VX isn't pressed.
+    def _op_skip_key_not_pressed(self, x, y, nn, nnn):
+        if self.input.read() != self.registers[x]:
+            self.pc += 0x02
+
+    # FX07 Sets VX to the value of the delay timer.
+    def _op_get_delay_timer(self, x, y, nn, nnn):
+        self.registers[x] = self.delay_timer
+
+    # FX0A A key press is awaited, and then stored in VX.
+    def _op_wait_key(self, x, y, nn, nnn):
+        i = self.input.read()
+        if i is None:
+            self.pc -= 2  # wait
+        else:
+            self.registers[x] = i
+
+    # FX15 Sets the delay timer to VX.
+    def _op_set_delay_timer(self, x, y, nn, nnn):
+        self.delay_timer = self.registers[x]
+
+    # FX18 Sets the sound timer to VX.
+    def _op_set_sound_timer(self, x, y, nn, nnn):
+        self.sound_timer = self.registers[x]
+
+    # FX1E Adds VX to I.
+    def _op_add_i_vx(self, x, y, nn, nnn):
+        self.i_register += self.registers[x]
+
+    # FX29 Sets I to the location of the sprite for the character in VX.
+    def _op_set_i_font(self, x, y, nn, nnn):
+        self.i_register = self.registers[x] * 5
+
+    # FX33 Stores the binary-coded decimal representation of VX at the addresses I, I plus 1 and I plus 2.
+    def _op_store_bcd(self, x, y, nn, nnn):
+        vx = self.registers[x]
+        i_register = self.i_register
+        self.memory[i_register] = vx // 100
+        self.memory[i_register + 1] = (vx % 100) // 10
+        self.memory[i_register + 2] = vx % 10
+        self._memory_written(i_register, 3)
+
+    def _op_unsupported(self, instruction, y, nn, nnn):
+        self._unsupported_instruction(instruction)
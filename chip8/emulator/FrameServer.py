@@ -0,0 +1,340 @@
+import binascii
+import os
+import socket
+import struct
+from threading import Condition, Lock, Thread
+
+from chip8.emulator.Framebuffer import Framebuffer
+
+
+class FrameCodec(object):
+    """
+    Encodes a screen (one byte, 0 or 1, per pixel) as the difference with a previous screen
+
+    The XOR of both screens is run-length encoded: alternating runs of unchanged and changed pixels, starting with
+    unchanged ones, each run length being a little-endian base 128 varint. A keyframe is the difference with a blank
+    screen.
+    """
+
+    SIZE = Framebuffer.WIDTH * Framebuffer.HEIGHT
+    BLANK = bytes(bytearray(SIZE))
+    # flips 0 and 1
+    FLIP = bytes(bytearray([1, 0]) + bytearray(254))
+
+    @staticmethod
+    def encode(previous, current):
+        """
+        :param previous: Screen known by the decoder (BLANK for a keyframe)
+        :param current: Screen to encode
+        :return: bytearray of the run lengths
+        """
+        size = len(current)
+        # XOR of the screens as big integers, much faster than pixel by pixel
+        delta = int(binascii.hexlify(previous), 16) ^ int(binascii.hexlify(current), 16)
+        delta = binascii.unhexlify('%0*x' % (2 * size, delta))
+        separators = (b'\x01', b'\x00')
+        encoded = bytearray()
+        position = 0
+        changed = 0
+        while position < size:
+            end = delta.find(separators[changed], position)
+            if end < 0:
+                end = size
+            FrameCodec._write_varint(encoded, end - position)
+            position = end
+            changed ^= 1
+        return encoded
+
+    @staticmethod
+    def decode(previous, encoded):
+        """
+        :param previous: Screen the encoded difference is relative to
+        :return: bytearray of the screen
+        """
+        screen = bytearray(previous)
+        position = 0
+        offset = 0
+        changed = False
+        while offset < len(encoded):
+            length, offset = FrameCodec._read_varint(encoded, offset)
+            if changed:
+                screen[position:position + length] = screen[position:position + length].translate(FrameCodec.FLIP)
+            position += length
+            changed = not changed
+        if position != len(screen):
+            raise ValueError('Frame covers %d pixels instead of %d' % (position, len(screen)))
+        return screen
+
+    @staticmethod
+    def _write_varint(encoded, value):
+        while value >= 0x80:
+            encoded.append((value & 0x7f) | 0x80)
+            value >>= 7
+        encoded.append(value)
+
+    @staticmethod
+    def _read_varint(encoded, offset):
+        value = 0
+        shift = 0
+        while True:
+            byte = encoded[offset]
+            offset += 1
+            value |= (byte & 0x7f) << shift
+            if not byte & 0x80:
+                return value, offset
+            shift += 7
+
+
+class FrameProtocol(object):
+    """
+    Messages between a FrameServer and its clients
+
+    Server to client: FRAME header (type, frame number, payload length) then the FrameCodec payload, the type
+    telling whether it is a keyframe or relative to the previous frame received.
+    Client to server: KEY (type, key code).
+    """
+
+    FRAME = struct.Struct('<BII')
+    KEYFRAME = 1
+    DELTA = 2
+
+    KEY = struct.Struct('<BB')
+    PRESS = 1
+    UNPRESS = 2
+
+    @staticmethod
+    def create_socket(address):
+        """
+        :param address: (host, port) for TCP, path for a Unix socket
+        """
+        if isinstance(address, tuple):
+            return socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        return socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    @staticmethod
+    def receive(sock, size):
+        """
+        :return: size bytes read from a socket, None when it is closed first
+        """
+        data = b''
+        while len(data) < size:
+            chunk = sock.recv(size - len(data))
+            if not chunk:
+                return None
+            data += chunk
+        return data
+
+
+class FrameServer(object):
+    """
+    Streams the screen of a machine to the clients connected to a TCP or Unix socket
+
+    publish() hands a screen to every client, and only when it differs from the previous one. Each client has a
+    thread sending its frames and a mailbox holding the latest frame not sent yet: a client slower than the
+    emulator skips frames (counted in dropped), never slowing down the emulator nor the other clients. Frames are
+    encoded relative to the last frame sent to the client, the first one being a keyframe.
+
+    The key events sent by the clients are applied to kb_input.
+    """
+
+    def __init__(self, address=('127.0.0.1', 0), kb_input=None, backlog=16):
+        """
+        :param address: (host, port) for TCP (port 0: any free port), path for a Unix socket
+        :param kb_input: Input receiving the key events of the clients
+        """
+        self.kb_input = kb_input
+        self.listener = FrameProtocol.create_socket(address)
+        if isinstance(address, tuple):
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(address)
+        self.listener.listen(backlog)
+        self.address = self.listener.getsockname()
+        self.clients = []
+        self.frame = 0
+        self.screen = None
+        self.closed = False
+        self._lock = Lock()
+        self.thread = Thread(name='Frame-Server-Thread', target=self._accept_loop)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def publish(self, screen):
+        """
+        Hands a screen to the clients if it changed since the previous call
+        """
+        screen = bytes(bytearray(screen))
+        if screen == self.screen:
+            return False
+        with self._lock:
+            self.frame += 1
+            frame = self.frame
+            self.screen = screen
+            clients = list(self.clients)
+        for client in clients:
+            client.post(frame, screen)
+        return True
+
+    def close(self):
+        self.closed = True
+        try:
+            self.listener.shutdown(socket.SHUT_RDWR)
+        except socket.error:
+            pass
+        self.listener.close()
+        with self._lock:
+            clients = list(self.clients)
+        for client in clients:
+            client.close()
+        if not isinstance(self.address, tuple) and os.path.exists(self.address):
+            os.unlink(self.address)
+
+    def _accept_loop(self):
+        while not self.closed:
+            try:
+                sock, _ = self.listener.accept()
+            except socket.error:
+                break
+            client = FrameServerClient(self, sock)
+            with self._lock:
+                self.clients.append(client)
+                if self.screen is not None:
+                    client.post(self.frame, self.screen)
+            client.start()
+
+    def _remove(self, client):
+        with self._lock:
+            if client in self.clients:
+                self.clients.remove(client)
+
+    def _on_key(self, kind, key_code):
+        if self.kb_input is None:
+            return
+        if kind == FrameProtocol.PRESS:
+            self.kb_input.press(key_code)
+        elif kind == FrameProtocol.UNPRESS:
+            self.kb_input.unpress()
+
+
+class FrameServerClient(object):
+    """
+    Connection of a client to a FrameServer, with its sending and receiving threads
+    """
+
+    def __init__(self, server, sock):
+        self.server = server
+        self.sock = sock
+        self.condition = Condition()
+        # latest (frame number, screen) not sent yet
+        self.pending = None
+        self.sent = 0
+        self.dropped = 0
+        self.closed = False
+        self.sender = Thread(name='Frame-Sender-Thread', target=self._send_loop)
+        self.sender.daemon = True
+        self.receiver = Thread(name='Frame-Receiver-Thread', target=self._receive_loop)
+        self.receiver.daemon = True
+
+    def start(self):
+        self.sender.start()
+        self.receiver.start()
+
+    def post(self, frame, screen):
+        with self.condition:
+            if self.pending is not None:
+                self.dropped += 1
+            self.pending = (frame, screen)
+            self.condition.notify()
+
+    def close(self):
+        with self.condition:
+            if self.closed:
+                return
+            self.closed = True
+            self.condition.notify()
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except socket.error:
+            pass
+        self.sock.close()
+        self.server._remove(self)
+
+    def _send_loop(self):
+        previous = None
+        while True:
+            with self.condition:
+                while self.pending is None and not self.closed:
+                    self.condition.wait()
+                if self.closed:
+                    return
+                frame, screen = self.pending
+                self.pending = None
+            if previous is None:
+                kind, payload = FrameProtocol.KEYFRAME, FrameCodec.encode(FrameCodec.BLANK, screen)
+            else:
+                kind, payload = FrameProtocol.DELTA, FrameCodec.encode(previous, screen)
+            try:
+                self.sock.sendall(FrameProtocol.FRAME.pack(kind, frame, len(payload)) + bytes(payload))
+            except socket.error:
+                self.close()
+                return
+            previous = screen
+            self.sent += 1
+
+    def _receive_loop(self):
+        try:
+            while True:
+                data = FrameProtocol.receive(self.sock, FrameProtocol.KEY.size)
+                if data is None:
+                    break
+                kind, key_code = FrameProtocol.KEY.unpack(data)
+                try:
+                    self.server._on_key(kind, key_code)
+                except IndexError:
+                    # invalid key code, ignored
+                    pass
+        except socket.error:
+            pass
+        finally:
+            self.close()
+
+
+class FrameClient(object):
+    """
+    Viewer of a FrameServer, decoding the frames it receives and sending key events
+    """
+
+    def __init__(self, address, timeout=None):
+        """
+        :param address: Address of the server, as FrameServer.address
+        :param timeout: Timeout of the socket operations in seconds
+        """
+        self.sock = FrameProtocol.create_socket(address)
+        self.sock.settimeout(timeout)
+        self.sock.connect(address)
+        self.frame = 0
+        self.screen = bytearray(FrameCodec.BLANK)
+
+    def read_frame(self):
+        """
+        Waits for the next frame
+
+        :return: (frame number, screen as a bytearray), None when the server closed the connection
+        """
+        header = FrameProtocol.receive(self.sock, FrameProtocol.FRAME.size)
+        if header is None:
+            return None
+        kind, frame, length = FrameProtocol.FRAME.unpack(header)
+        payload = bytearray(FrameProtocol.receive(self.sock, length) or b'')
+        previous = FrameCodec.BLANK if kind == FrameProtocol.KEYFRAME else self.screen
+        self.screen = FrameCodec.decode(previous, payload)
+        self.frame = frame
+        return frame, self.screen
+
+    def press(self, key_code):
+        self.sock.sendall(FrameProtocol.KEY.pack(FrameProtocol.PRESS, key_code))
+
+    def unpress(self):
+        self.sock.sendall(FrameProtocol.KEY.pack(FrameProtocol.UNPRESS, 0))
+
+    def close(self):
+        self.sock.close()
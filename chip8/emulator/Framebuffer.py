@@ -0,0 +1,237 @@
+import sys
+
+
+def read_only_view(data):
+    """
+    :param data: bytearray
+    :return: memoryview of data refusing writes (where the Python version allows it), reflecting its changes
+    """
+    view = memoryview(data)
+    if hasattr(view, 'toreadonly'):
+        return view.toreadonly()
+    if sys.version_info[0] == 2:
+        return memoryview(buffer(data))
+    return view
+
+
+class Framebuffer(object):
+    """
+    64x32 monochrome screen storing one byte per pixel
+
+    Sprites wrap around both axes.
+
+    The lines and columns changed by draw() and clear() are recorded until consume_dirty() is called, and
+    on_change (if set) is called with the framebuffer after each of them changing at least one pixel. The changed
+    lines are also recorded separately until consume_changed_lines() is called, for state tracking (rewind)
+    independent of the display.
+    """
+
+    WIDTH = 64
+    HEIGHT = 32
+
+    LINE_MASK = (1 << 64) - 1
+
+    def __init__(self):
+        self.pixels = bytearray(self.WIDTH * self.HEIGHT)
+        # pixels is never reallocated, so this view stays valid
+        self.view = read_only_view(self.pixels)
+        self.on_change = None
+        # bit i is line i / bit (63 - x) is column x
+        self.dirty_lines = 0
+        self.dirty_columns = 0
+        self.changed_lines = 0
+
+    def clear(self):
+        pixels = self.pixels
+        width = self.WIDTH
+        lines = 0
+        for line in range(0, self.HEIGHT):
+            if pixels.find(b'\x01', line * width, (line + 1) * width) != -1:
+                lines |= 1 << line
+        if lines:
+            pixels[:] = bytearray(width * self.HEIGHT)
+            self._changed(lines, self.LINE_MASK)
+
+    def draw(self, x, y, memory, address, rows):
+        """
+        XOR draws a sprite 8 pixels wide
+
+        :param x: Column of the left of the sprite
+        :param y: Line of the top of the sprite
+        :param memory: Memory holding the sprite, one byte per line
+        :param address: Address of the first line of the sprite
+        :param rows: Number of lines of the sprite
+        :return: 1 if any pixel was flipped from set to unset, 0 otherwise
+        """
+        pixels = self.pixels
+        width = self.WIDTH
+        x %= width
+        collision = 0
+        lines = 0
+        columns = 0
+        for i in range(0, rows):
+            sprite = memory[address + i]
+            if not sprite:
+                continue
+            line = (y + i) % self.HEIGHT
+            lines |= 1 << line
+            columns |= sprite
+            line *= width
+            for bit in range(0, 8):
+                if sprite & (0x80 >> bit):
+                    index = line + (x + bit) % width
+                    if pixels[index]:
+                        collision = 1
+                    pixels[index] ^= 1
+        if lines:
+            columns <<= 56
+            self._changed(lines, ((columns >> x) | (columns << (64 - x))) & self.LINE_MASK)
+        return collision
+
+    def get_sprite(self, x, y):
+        """
+        Packs the 8 pixels starting at a coordinate as a byte, the leftmost pixel being the most significant bit
+        """
+        line = (y % self.HEIGHT) * self.WIDTH
+        sprite = 0
+        for bit in range(0, 8):
+            sprite = (sprite << 1) | self.pixels[line + (x + bit) % self.WIDTH]
+        return sprite
+
+    def get_screen(self, copy=True):
+        """
+        :param copy: False for a read-only view of the pixels, following their changes, instead of a copy
+        :return: One byte (0 or 1) per pixel, line by line (bytearray, or memoryview when not a copy)
+        """
+        if copy:
+            return self.pixels[:]
+        return self.view
+
+    def dump(self):
+        """
+        :return: The pixels, one byte (0 or 1) per pixel, line by line (not a copy for this class)
+        """
+        return self.pixels
+
+    def load(self, pixels):
+        """
+        Replaces all the pixels, marking the whole screen as changed
+
+        :param pixels: WIDTH * HEIGHT bytes (0 or 1), line by line, as returned by dump()
+        """
+        self.pixels[:] = pixels
+        self._changed((1 << self.HEIGHT) - 1, self.LINE_MASK)
+
+    def is_dirty(self):
+        return self.dirty_lines != 0
+
+    def consume_dirty(self):
+        """
+        Returns and forgets the lines and columns changed since the previous call
+
+        :return: (lines, columns) lists of indexes, None if nothing changed
+        """
+        lines = self.dirty_lines
+        if not lines:
+            return None
+        columns = self.dirty_columns
+        self.dirty_lines = 0
+        self.dirty_columns = 0
+        return ([y for y in range(0, self.HEIGHT) if (lines >> y) & 0x1],
+                [x for x in range(0, self.WIDTH) if (columns >> (63 - x)) & 0x1])
+
+    def consume_changed_lines(self):
+        """
+        Returns and forgets the lines changed since the previous call, independently of consume_dirty()
+
+        :return: Mask of the lines, bit i being line i
+        """
+        lines = self.changed_lines
+        self.changed_lines = 0
+        return lines
+
+    def _changed(self, lines, columns):
+        self.dirty_lines |= lines
+        self.dirty_columns |= columns
+        self.changed_lines |= lines
+        if self.on_change is not None:
+            self.on_change(self)
+
+
+class PackedFramebuffer(Framebuffer):
+    """
+    64x32 monochrome screen storing each line as a 64 bits integer, the leftmost pixel being the most significant bit
+
+    Drawing a sprite line is a rotation, an AND for the collision and a XOR.
+    get_screen() expands the lines to one byte per pixel, so even without a copy it allocates the returned
+    (read-only) buffer, which does not follow later changes.
+    """
+
+    # 8 pixels (one byte per pixel) for each byte of a line
+    BYTE_PIXELS = [bytes(bytearray([(b >> 7) & 1, (b >> 6) & 1, (b >> 5) & 1, (b >> 4) & 1,
+                                    (b >> 3) & 1, (b >> 2) & 1, (b >> 1) & 1, b & 1])) for b in range(0, 0x100)]
+    # translates pixels (0 or 1) to binary digits
+    PIXEL_DIGITS = bytes(bytearray([ord('0'), ord('1')]) + bytearray(range(2, 0x100)))
+
+    def __init__(self):
+        self.lines = [0] * self.HEIGHT
+        self.on_change = None
+        self.dirty_lines = 0
+        self.dirty_columns = 0
+        self.changed_lines = 0
+
+    def clear(self):
+        lines = 0
+        for y, line in enumerate(self.lines):
+            if line:
+                lines |= 1 << y
+        if lines:
+            self.lines[:] = [0] * self.HEIGHT
+            self._changed(lines, self.LINE_MASK)
+
+    def draw(self, x, y, memory, address, rows):
+        lines = self.lines
+        height = self.HEIGHT
+        mask = self.LINE_MASK
+        x %= self.WIDTH
+        collision = 0
+        dirty_lines = 0
+        dirty_columns = 0
+        for i in range(0, rows):
+            # sprite at the left of the line, rotated right by x
+            sprite = memory[address + i] << 56
+            if not sprite:
+                continue
+            sprite = ((sprite >> x) | (sprite << (64 - x))) & mask
+            line = (y + i) % height
+            old = lines[line]
+            if old & sprite:
+                collision = 1
+            lines[line] = old ^ sprite
+            dirty_lines |= 1 << line
+            dirty_columns |= sprite
+        if dirty_lines:
+            self._changed(dirty_lines, dirty_columns)
+        return collision
+
+    def get_sprite(self, x, y):
+        x %= self.WIDTH
+        line = self.lines[y % self.HEIGHT]
+        return (((line << x) | (line >> (64 - x))) >> 56) & 0xff
+
+    def get_screen(self, copy=True):
+        byte_pixels = self.BYTE_PIXELS
+        screen = bytearray(b''.join(
+            byte_pixels[(line >> shift) & 0xff] for line in self.lines for shift in (56, 48, 40, 32, 24, 16, 8, 0)
+        ))
+        return screen if copy else read_only_view(screen)
+
+    def dump(self):
+        return self.get_screen()
+
+    def load(self, pixels):
+        width = self.WIDTH
+        digits = self.PIXEL_DIGITS
+        pixels = bytes(bytearray(pixels))
+        self.lines[:] = [int(pixels[y * width:(y + 1) * width].translate(digits), 2) for y in range(0, self.HEIGHT)]
+        self._changed((1 << self.HEIGHT) - 1, self.LINE_MASK)
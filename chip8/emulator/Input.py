@@ -12,7 +12,13 @@ class Input(object):
     def unpress(self):
         self.press(None)
 
+    def next_frame(self):
+        """
+        Called by the machine each time its timers tick
+        """
+        pass
+
     @staticmethod
     def _ensure_key_code(key_code):
-        if key_code is not None and key_code < 0x0 or key_code > 0xf:
+        if key_code is not None and (key_code < 0x0 or key_code > 0xf):
             raise IndexError('KeyCode %s is not valid' % hex(key_code))
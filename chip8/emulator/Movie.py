@@ -0,0 +1,128 @@
+import struct
+
+from chip8.emulator.Chip8 import Chip8
+from chip8.emulator.Chip8Utils import Chip8Utils
+from chip8.emulator.Input import Input
+
+
+class Movie(object):
+    """
+    Key presses of a session, frame by frame, to replay it exactly
+
+    A movie holds the ROM digest, the seed of the random generator, the instructions per frame of the virtual clock,
+    the number of frames and the changes of the pressed key, each being (frame, key code or None). The same ROM
+    run on the virtual clock with the same seed and the same movie always reaches the same state.
+    """
+
+    MAGIC = b'C8MV'
+    VERSION = 2
+    # magic, version, SHA-1 of the ROM, 1 if seeded else 0, 32-bit seed, instructions per frame, frames,
+    # number of events
+    HEADER = struct.Struct('<4sB20sBIHII')
+    # frame, key code (NO_KEY if none)
+    EVENT = struct.Struct('<IB')
+    NO_KEY = 0xff
+
+    def __init__(self, rom_hash=b'', seed=None, instructions_per_frame=Chip8.INSTRUCTIONS_PER_FRAME, frames=0,
+                 events=None):
+        self.rom_hash = rom_hash
+        self.seed = Chip8.normalize_seed(seed)
+        self.instructions_per_frame = instructions_per_frame
+        self.frames = frames
+        self.events = events or []
+
+    def save(self, path):
+        with open(path, 'wb') as movie_file:
+            movie_file.write(self.HEADER.pack(self.MAGIC, self.VERSION, self.rom_hash,
+                                              self.seed is not None, self.seed or 0, self.instructions_per_frame,
+                                              self.frames, len(self.events)))
+            for frame, key in self.events:
+                movie_file.write(self.EVENT.pack(frame, self.NO_KEY if key is None else key))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as movie_file:
+            header = movie_file.read(cls.HEADER.size)
+            if len(header) < cls.HEADER.size:
+                raise ValueError('Not a Chip8 movie')
+            magic, version, rom_hash, seeded, seed, instructions_per_frame, frames, count = \
+                cls.HEADER.unpack(header)
+            if magic != cls.MAGIC:
+                raise ValueError('Not a Chip8 movie')
+            if version != cls.VERSION:
+                raise ValueError('Unsupported movie version %d' % version)
+            data = movie_file.read(count * cls.EVENT.size)
+        if len(data) < count * cls.EVENT.size:
+            raise ValueError('Truncated movie')
+        events = []
+        for offset in range(0, len(data), cls.EVENT.size):
+            frame, key = cls.EVENT.unpack_from(data, offset)
+            events.append((frame, None if key == cls.NO_KEY else key))
+        return cls(rom_hash, seed if seeded else None, instructions_per_frame, frames, events)
+
+    def create_machine(self, path, engine=None, record=False, **kwargs):
+        """
+        Creates the machine of this movie: ROM loaded, seeded, on the virtual clock, with a MovieInput
+
+        :param path: Path to the ROM file
+        :param record: Record the presses into this movie instead of replaying it
+        :param kwargs: Other arguments of the engine constructor
+        """
+        return Chip8Utils.create_from_rom(path, input_kb=MovieInput(self, record), engine=engine,
+                                          clock=Chip8.CLOCK_VIRTUAL,
+                                          instructions_per_frame=self.instructions_per_frame, seed=self.seed,
+                                          **kwargs)
+
+    def replay(self, path, engine=None, **kwargs):
+        """
+        Runs a ROM through the whole movie
+
+        :return: The machine, stopped where the recorded session was
+        """
+        chip8 = self.create_machine(path, engine, **kwargs)
+        chip8.run_frames(self.frames)
+        return chip8
+
+
+class MovieInput(Input):
+    """
+    Input changing the pressed key only when the timers tick, so the changes can be replayed at the same instant
+
+    When recording the presses are appended to the movie. When playing the presses of the movie are replayed and
+    press() and unpress() are ignored.
+    """
+
+    # no press pending
+    NONE = object()
+
+    def __init__(self, movie=None, record=False):
+        """
+        :param movie: Movie to play, or to record into with record; None to record into a new movie
+        """
+        super(MovieInput, self).__init__()
+        self.playing = movie is not None and not record
+        self.movie = movie if movie is not None else Movie()
+        self.frame = 0
+        self._event = 0
+        self._pending = self.NONE
+
+    def press(self, key_code):
+        self._ensure_key_code(key_code)
+        if not self.playing:
+            self._pending = key_code
+
+    def next_frame(self):
+        movie = self.movie
+        if self.playing:
+            events = movie.events
+            while self._event < len(events) and events[self._event][0] <= self.frame:
+                self.key_code = events[self._event][1]
+                self._event += 1
+        elif self._pending is not self.NONE:
+            if self._pending != self.key_code:
+                self.key_code = self._pending
+                movie.events.append((self.frame, self.key_code))
+            self._pending = self.NONE
+        self.frame += 1
+        if not self.playing:
+            movie.frames = self.frame
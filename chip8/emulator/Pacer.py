@@ -0,0 +1,143 @@
+import math
+import time
+import timeit
+
+from chip8.emulator.Chip8 import Chip8
+
+
+class Pacer(object):
+    """
+    Throttles a machine to a target number of instructions per second
+
+    The instructions are run in batches of ips / fps instructions, one per frame. After each batch the pacer
+    sleeps until the deadline of the next frame. Deadlines are absolute (start + n / fps), so the time lost
+    oversleeping a frame is caught up on the following ones instead of accumulating. The last SPIN_TIME of a
+    wait is spent polling the timer, time.sleep() being too coarse on some systems.
+
+    When it is more than MAX_LAG frames late (slow host, debugger), the schedule restarts from now rather than
+    running the late frames back to back.
+
+    In turbo mode nothing is throttled, the rates are still measured.
+    """
+
+    SPIN_TIME = 0.001
+    MAX_LAG = 5
+
+    timer = staticmethod(timeit.default_timer)
+    sleep = staticmethod(time.sleep)
+
+    def __init__(self, ips=Chip8.INSTRUCTIONS_PER_FRAME * Chip8.TIMER_FREQUENCY, fps=Chip8.TIMER_FREQUENCY,
+                 turbo=False):
+        """
+        :param ips: Target instructions per second
+        :param fps: Frames (batches of instructions followed by a wait) per second
+        :param turbo: Run unthrottled
+        """
+        self.ips = 0
+        self.fps = 0
+        self.instructions_per_frame = 0
+        self.set_speed(ips, fps)
+        self.turbo = turbo
+        self.reset()
+
+    def set_speed(self, ips=None, fps=None):
+        """
+        Changes the target rates, restarting the schedule
+
+        :param ips: Target instructions per second (default: unchanged)
+        :param fps: Frames per second (default: unchanged)
+        """
+        ips = ips or self.ips
+        fps = fps or self.fps
+        if ips <= 0 or fps <= 0:
+            raise ValueError('Rates must be positive (given: %s ips, %s fps)' % (ips, fps))
+        self.ips = ips
+        self.fps = fps
+        self.instructions_per_frame = max(1, int(round(float(ips) / fps)))
+        self._restart()
+
+    def set_turbo(self, turbo):
+        self.turbo = turbo
+        self._restart()
+
+    def reset(self):
+        """
+        Restarts the schedule and the measures, to be called when the machine is (re)started or resumed
+        """
+        self.instructions = 0
+        self.frames = 0
+        self.resyncs = 0
+        self._pending = 0
+        self._started = self.timer()
+        # sum and sum of squares of the lateness of the wake-ups, for the jitter
+        self._lateness = 0.0
+        self._lateness_squares = 0.0
+        self._waits = 0
+        self.drift = 0.0
+        self._restart()
+
+    def _restart(self):
+        self._origin = self.timer()
+        self._scheduled = 0
+
+    def tick(self, instructions=1):
+        """
+        Counts executed instructions, waiting for the next frame when a batch is complete
+        """
+        self.instructions += instructions
+        self._pending += instructions
+        while self._pending >= self.instructions_per_frame:
+            self._pending -= self.instructions_per_frame
+            self.frame()
+
+    def frame(self):
+        """
+        Ends a frame, waiting for the deadline of the next one unless in turbo mode
+        """
+        self.frames += 1
+        self._scheduled += 1
+        if self.turbo:
+            return
+        timer = self.timer
+        deadline = self._origin + float(self._scheduled) / self.fps
+        now = timer()
+        if now - deadline > float(self.MAX_LAG) / self.fps:
+            self.drift = now - deadline
+            self.resyncs += 1
+            self._restart()
+            return
+        remaining = deadline - now - self.SPIN_TIME
+        if remaining > 0:
+            self.sleep(remaining)
+        now = timer()
+        while now < deadline:
+            now = timer()
+        lateness = self.drift = now - deadline
+        self._lateness += lateness
+        self._lateness_squares += lateness * lateness
+        self._waits += 1
+
+    def report(self):
+        """
+        :return: dict of the measures since the last reset(): achieved instructions and frames per second,
+            jitter (standard deviation of the lateness of the wake-ups) and drift (lateness of the last frame
+            on its schedule), in seconds
+        """
+        elapsed = self.timer() - self._started
+        jitter = 0.0
+        if self._waits:
+            mean = self._lateness / self._waits
+            jitter = math.sqrt(max(0.0, self._lateness_squares / self._waits - mean * mean))
+        return {
+            'target_ips': self.ips,
+            'target_fps': self.fps,
+            'turbo': self.turbo,
+            'instructions': self.instructions,
+            'frames': self.frames,
+            'elapsed': elapsed,
+            'ips': self.instructions / elapsed if elapsed > 0 else 0.0,
+            'fps': self.frames / elapsed if elapsed > 0 else 0.0,
+            'jitter': jitter,
+            'drift': self.drift,
+            'resyncs': self.resyncs,
+        }
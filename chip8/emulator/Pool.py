@@ -0,0 +1,70 @@
+from contextlib import contextmanager
+from threading import Lock
+
+from chip8.emulator.Chip8Utils import Chip8Utils
+
+
+class Chip8Pool(object):
+    """
+    Hands out machines running a ROM, released machines being reset and handed out again instead of being built
+
+    The ROM is read once. acquire() returns a machine as if just created, release() resets it (see Chip8.reset())
+    and keeps it for the next acquire(), up to size idle machines.
+    """
+
+    def __init__(self, path, engine=None, member=None, size=16, **kwargs):
+        """
+        :param path: Path, file object or content of the ROM, or of a zip archive of ROMs (see Chip8Utils.read_rom)
+        :param engine: Name of the engine in Chip8Utils.ENGINES (default: interpreter)
+        :param member: Name of the ROM in the zip archive
+        :param size: Maximum number of idle machines kept
+        :param kwargs: Other arguments of the engine constructor (clock, instructions_per_frame, seed)
+        """
+        if size < 1:
+            raise ValueError('Pool size must be positive (given: %s)' % size)
+        Chip8Utils.get_engine(engine)
+        self.rom = bytearray(Chip8Utils.read_rom(path, member))
+        self.engine = engine
+        self.size = size
+        self.kwargs = kwargs
+        self.created = 0
+        self._idle = []
+        self._lock = Lock()
+
+    def acquire(self):
+        """
+        :return: A machine with the ROM loaded, to be given back to release()
+        """
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+            self.created += 1
+        return Chip8Utils.create_from_rom(self.rom, engine=self.engine, **self.kwargs)
+
+    def release(self, chip8):
+        """
+        Resets a machine given by acquire() and keeps it for the next one (its input released, its tracer,
+        profiler and screen listener removed)
+        """
+        chip8.reset()
+        chip8.input.unpress()
+        chip8.set_tracer(None)
+        chip8.set_profiler(None)
+        chip8.set_screen_listener(None)
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(chip8)
+
+    @contextmanager
+    def machine(self):
+        """
+        Context manager acquiring a machine and releasing it on exit
+        """
+        chip8 = self.acquire()
+        try:
+            yield chip8
+        finally:
+            self.release(chip8)
+
+    def __len__(self):
+        return len(self._idle)
@@ -0,0 +1,257 @@
+import multiprocessing
+import struct
+import time
+from threading import Thread
+
+from chip8.emulator import Emulator
+from chip8.emulator.Framebuffer import Framebuffer
+from chip8.emulator.Input import Input
+
+
+class SharedState(object):
+    """
+    State of a machine published by one process and read by others, in a block of shared memory
+
+    The block starts with a sequence counter, then the header (frame counter, status, pc, i, sp, timers, cycle
+    counter, registers) and the screen (one byte per pixel). The writer makes the counter odd, writes, then makes it
+    even again; readers copy the state and retry when the counter was odd or changed meanwhile (seqlock), so they
+    never block the writer.
+    """
+
+    SEQUENCE = struct.Struct('<I')
+    # frame counter, status, pc, i, sp, delay timer, sound timer, cycle counter, 16 registers
+    HEADER = struct.Struct('<IBHHBBBq16s')
+    SCREEN_OFFSET = SEQUENCE.size + HEADER.size
+    SCREEN_SIZE = Framebuffer.WIDTH * Framebuffer.HEIGHT
+    SIZE = SCREEN_OFFSET + SCREEN_SIZE
+
+    STATUSES = (Emulator.STOPPED, Emulator.RUNNING, Emulator.PAUSED, Emulator.TERMINATED)
+
+    def __init__(self, raw=None):
+        """
+        :param raw: multiprocessing.RawArray of SIZE bytes to share (default: a new one)
+        """
+        if raw is None:
+            raw = multiprocessing.RawArray('B', self.SIZE)
+        if len(raw) != self.SIZE:
+            raise ValueError('Shared state must be %d bytes (given: %d)' % (self.SIZE, len(raw)))
+        self.raw = raw
+        view = memoryview(raw)
+        try:
+            view = view.cast('B')
+        except AttributeError:
+            # Python 2 memoryviews of ctypes arrays are already assignable from bytes
+            pass
+        self.view = view
+        self.frame = 0
+
+    def get_sequence(self):
+        return self.SEQUENCE.unpack_from(self.raw, 0)[0]
+
+    def publish(self, chip8, status):
+        """
+        Writes the state of a machine (single writer)
+        """
+        sequence = self.get_sequence()
+        self.SEQUENCE.pack_into(self.raw, 0, (sequence + 1) & 0xffffffff)
+        self.frame += 1
+        self.HEADER.pack_into(self.raw, self.SEQUENCE.size, self.frame & 0xffffffff, self.STATUSES.index(status),
+                              chip8.pc & 0xffff, chip8.i_register & 0xffff, chip8.sp & 0xff, chip8.delay_timer,
+                              chip8.sound_timer, chip8.get_cycle_counter(), bytes(chip8.registers))
+        self.view[self.SCREEN_OFFSET:self.SIZE] = chip8.get_screen(copy=False)
+        self.SEQUENCE.pack_into(self.raw, 0, (sequence + 2) & 0xffffffff)
+
+    def publish_status(self, status):
+        """
+        Writes the status only, for a machine not created yet
+        """
+        sequence = self.get_sequence()
+        self.SEQUENCE.pack_into(self.raw, 0, (sequence + 1) & 0xffffffff)
+        # the status follows the frame counter in the header
+        struct.pack_into('<B', self.raw, self.SEQUENCE.size + 4, self.STATUSES.index(status))
+        self.SEQUENCE.pack_into(self.raw, 0, (sequence + 2) & 0xffffffff)
+
+    def read(self):
+        """
+        :return: dict of a consistent copy of the state, the screen being a bytearray
+        """
+        raw = self.raw
+        while True:
+            sequence = self.get_sequence()
+            if sequence & 0x1:
+                # the writer is publishing: give up the processor rather than spin until it is done
+                time.sleep(0)
+                continue
+            frame, status, pc, i_register, sp, delay_timer, sound_timer, cycle, registers = \
+                self.HEADER.unpack_from(raw, self.SEQUENCE.size)
+            screen = bytearray(self.view[self.SCREEN_OFFSET:self.SIZE])
+            if self.get_sequence() == sequence:
+                break
+        return {
+            'sequence': sequence,
+            'frame': frame,
+            'status': self.STATUSES[status],
+            'pc': pc,
+            'i': i_register,
+            'sp': sp,
+            'delay_timer': delay_timer,
+            'sound_timer': sound_timer,
+            'cycle': cycle,
+            'registers': bytearray(registers),
+            'screen': screen,
+        }
+
+    def get_screen_view(self):
+        """
+        :return: View of the screen in shared memory, without copy nor consistency (see read())
+        """
+        return self.view[self.SCREEN_OFFSET:self.SIZE]
+
+
+class SharedStateEmulator(Emulator):
+    """
+    Emulator publishing the state of its machine into a SharedState each time the timers tick and on each change of
+    status or step
+    """
+
+    def __init__(self, shared, *args, **kwargs):
+        self.shared = shared
+        self._published_timer = None
+        super(SharedStateEmulator, self).__init__(*args, **kwargs)
+
+    def _after_cycle(self, counter):
+        chip8 = self.chip8
+        if chip8.next_timer != self._published_timer or self.status != self.RUNNING:
+            self._published_timer = chip8.next_timer
+            self.shared.publish(chip8, self.status)
+
+    def _change_status(self, status):
+        if not super(SharedStateEmulator, self)._change_status(status):
+            return False
+        if self.chip8:
+            self.shared.publish(self.chip8, status)
+        else:
+            self.shared.publish_status(status)
+        return True
+
+
+def run_emulator_process(raw, commands, kwargs):
+    """
+    Runs a SharedStateEmulator, controlled by the commands of a queue (module level so the process can unpickle it)
+
+    :param raw: RawArray of the SharedState
+    :param commands: multiprocessing.Queue of (command name, arguments)
+    :param kwargs: Arguments of the Emulator
+    """
+    emulator = SharedStateEmulator(SharedState(raw), **kwargs)
+
+    def listen():
+        while True:
+            name, args = commands.get()
+            if name in ProcessEmulator.INPUT_COMMANDS:
+                getattr(emulator.kb_input, name)(*args)
+            else:
+                getattr(emulator, name)(*args)
+            if name == 'terminate':
+                break
+
+    listener = Thread(name='Emulator-Commands-Thread', target=listen)
+    listener.daemon = True
+    listener.start()
+    emulator._loop()
+
+
+class ProcessEmulator(object):
+    """
+    Runs an emulator in a process of its own, so emulation and rendering do not share an interpreter lock
+
+    The control methods of Emulator and the key presses (kb_input) are sent to the process through a queue. The
+    state of the machine is read from shared memory with read(), or get_screen_view() without copy.
+    """
+
+    INPUT_COMMANDS = frozenset(['press', 'unpress'])
+    # arguments of the Emulator holding threads, sockets or results which would stay in the parent process
+    LOCAL_ARGUMENTS = ('tracer', 'profiler', 'server', 'recorder')
+
+    def __init__(self, **kwargs):
+        """
+        :param kwargs: Arguments of the Emulator (rom_path, engine...), to be picklable; none of LOCAL_ARGUMENTS
+        """
+        for name in self.LOCAL_ARGUMENTS:
+            if kwargs.get(name) is not None:
+                raise ValueError('The %s of an emulator cannot be given to its process' % name)
+        kwargs['auto_start'] = False
+        # RewindBuffer given to the process, which records into its own copy
+        self.rewind = kwargs.get('rewind')
+        self.shared = SharedState()
+        self.commands = multiprocessing.Queue()
+        self.process = multiprocessing.Process(name='Emulator-Process', target=run_emulator_process,
+                                               args=(self.shared.raw, self.commands, kwargs))
+        self.process.daemon = True
+        self.process.start()
+        self.kb_input = ProcessInput(self.commands)
+
+    def _send(self, name, *args):
+        self.commands.put((name, args))
+
+    def start(self):
+        self._send('start')
+
+    def un_pause(self):
+        self._send('un_pause')
+
+    def toggle_pause(self):
+        self._send('toggle_pause')
+
+    def stop(self):
+        self._send('stop')
+
+    def pause(self):
+        self._send('pause')
+
+    def terminate(self):
+        self._send('terminate')
+
+    def step(self):
+        self._send('step')
+
+    def step_back(self, frames=1):
+        self._send('step_back', frames)
+
+    def set_speed(self, ips=None, fps=None):
+        self._send('set_speed', ips, fps)
+
+    def set_turbo(self, turbo):
+        self._send('set_turbo', turbo)
+
+    def read(self):
+        return self.shared.read()
+
+    def get_status(self):
+        return self.read()['status']
+
+    def get_screen_view(self):
+        return self.shared.get_screen_view()
+
+    def join(self, timeout=None):
+        """
+        Terminates the emulator and waits for its process to exit
+        """
+        self.terminate()
+        self.process.join(timeout)
+
+
+class ProcessInput(object):
+    """
+    Input of a ProcessEmulator, sending the presses to its process
+    """
+
+    def __init__(self, commands):
+        self.commands = commands
+
+    def press(self, key_code):
+        Input._ensure_key_code(key_code)
+        self.commands.put(('press', (key_code,)))
+
+    def unpress(self):
+        self.commands.put(('unpress', ()))
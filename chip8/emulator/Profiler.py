@@ -0,0 +1,122 @@
+import json
+import timeit
+
+
+class Profiler(object):
+    """
+    Counts executions and accumulates execution time per opcode family and per address
+
+    Calls (2NNN) and returns (00EE) are followed to attribute each instruction to the stack of subroutines it
+    runs in, a subroutine being named after its address. The root of the stacks is the address of the first
+    recorded instruction.
+    """
+
+    timer = staticmethod(timeit.default_timer)
+
+    def __init__(self):
+        self.opcodes = {}
+        self.addresses = {}
+        self.calls = {}
+        self.stacks = {}
+        self.instructions = 0
+        self.time = 0.0
+        self._families = {}
+        self._stack = None
+
+    def record(self, pc, instruction, elapsed):
+        """
+        :param pc: Address of the executed instruction
+        :param instruction: Executed instruction
+        :param elapsed: Time spent executing it, in seconds
+        """
+        try:
+            family = self._families[instruction]
+        except KeyError:
+            family = self._families[instruction] = self.family(instruction)
+        self.instructions += 1
+        self.time += elapsed
+        self._add(self.opcodes, family, elapsed)
+        self._add(self.addresses, pc, elapsed)
+
+        stack = self._stack
+        if stack is None:
+            stack = self._stack = (pc,)
+        self._add(self.stacks, stack, elapsed)
+        if family == '2NNN':
+            callee = instruction & 0x0fff
+            self._add(self.calls, (stack[-1], callee), elapsed)
+            self._stack = stack + (callee,)
+        elif family == '00EE' and len(stack) > 1:
+            self._stack = stack[:-1]
+
+    @staticmethod
+    def _add(stats, key, elapsed):
+        try:
+            stat = stats[key]
+            stat[0] += 1
+            stat[1] += elapsed
+        except KeyError:
+            stats[key] = [1, elapsed]
+
+    @staticmethod
+    def family(instruction):
+        """
+        Names the branch of Chip8.execute handling an instruction
+
+        :return: Opcode pattern, for instance 'DXYN' or '8XY4'
+        """
+        opcode = instruction >> 12
+        if opcode == 0x0:
+            if instruction in (0x00E0, 0x00EE):
+                return '{:04X}'.format(instruction)
+            return '0NNN'
+        if opcode in (0x1, 0x2, 0xA, 0xB):
+            return '{:X}NNN'.format(opcode)
+        if opcode in (0x3, 0x4, 0x6, 0x7, 0xC):
+            return '{:X}XNN'.format(opcode)
+        if opcode in (0x5, 0x8, 0x9):
+            return '{:X}XY{:X}'.format(opcode, instruction & 0x000f)
+        if opcode == 0xD:
+            return 'DXYN'
+        return '{:X}X{:02X}'.format(opcode, instruction & 0x00ff)
+
+    def reset(self):
+        self.__init__()
+
+    def report(self):
+        """
+        :return: dict of the statistics, rows sorted by decreasing time, addresses formatted as 0xNNNN
+        """
+        def rows(stats, columns):
+            return [dict(columns(key), count=count, time=elapsed)
+                    for key, (count, elapsed) in sorted(stats.items(), key=lambda item: -item[1][1])]
+
+        address = '0x{:04X}'.format
+        return {
+            'instructions': self.instructions,
+            'time': self.time,
+            'opcodes': rows(self.opcodes, lambda opcode: {'opcode': opcode}),
+            'addresses': rows(self.addresses, lambda pc: {'address': address(pc)}),
+            'calls': rows(self.calls, lambda call: {'caller': address(call[0]), 'callee': address(call[1])}),
+        }
+
+    def to_json(self, file_object, **kwargs):
+        """
+        Writes report() as JSON
+
+        :param kwargs: Forwarded to json.dump
+        """
+        json.dump(self.report(), file_object, **kwargs)
+
+    def to_collapsed(self, file_object, weight='count'):
+        """
+        Writes the stacks in the collapsed format of flame graph tools: one 'caller;callee count' line per stack
+
+        :param weight: 'count' to weight the stacks with their number of instructions, 'time' with their
+            execution time in microseconds
+        """
+        if weight not in ('count', 'time'):
+            raise ValueError('Unknown weight %s' % weight)
+        for stack, (count, elapsed) in sorted(self.stacks.items()):
+            value = count if weight == 'count' else int(round(elapsed * 1000000))
+            file_object.write('%s %d\n' % (';'.join('0x{:04X}'.format(address) for address in stack), value))
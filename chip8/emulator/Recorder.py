@@ -0,0 +1,221 @@
+import hashlib
+import struct
+import time
+import zlib
+from threading import Thread
+
+try:
+    from Queue import Queue
+except ImportError:
+    from queue import Queue
+
+from chip8.emulator.Chip8 import Chip8
+from chip8.emulator.FrameServer import FrameCodec
+
+
+class Recording(object):
+    """
+    Format of the recordings of a session: the screen and the pressed key of each frame
+
+    A header (magic, version, keyframe interval, SHA-1 of the ROM, 1 if seeded else 0, 32-bit seed of the random
+    generator), then chunks of keyframe_interval frames. A chunk is a header (first frame, number of frames, compressed size) and
+    the zlib-compressed frames. Each frame is its key (NO_KEY if none) and the FrameCodec encoding of its screen,
+    relative to the previous frame of the chunk (the first one being a keyframe), empty when the screen did not
+    change.
+    """
+
+    MAGIC = b'C8RC'
+    VERSION = 2
+    HEADER = struct.Struct('<4sBH20sBI')
+    CHUNK = struct.Struct('<III')
+    FRAME = struct.Struct('<BH')
+    NO_KEY = 0xff
+
+    @staticmethod
+    def hash_rom(path):
+        """
+        :return: SHA-1 digest of a ROM file
+        """
+        with open(path, 'rb') as rom_file:
+            return hashlib.sha1(rom_file.read()).digest()
+
+
+class Recorder(object):
+    """
+    Records the frames of a session into a file
+
+    The frames are encoded as they are recorded; each complete chunk is handed to a background thread which
+    compresses and writes it, so recording costs the emulation thread little more than the encoding.
+    """
+
+    def __init__(self, path, rom_hash=b'', seed=None, keyframe_interval=60):
+        """
+        :param path: Path of the recording file
+        :param rom_hash: SHA-1 digest of the ROM (see Recording.hash_rom)
+        :param seed: Seed of the random generator of the machine, reduced to 32 bits (see Chip8.normalize_seed())
+        :param keyframe_interval: Number of frames of a chunk, the granularity of seeking
+        """
+        if keyframe_interval < 1:
+            raise ValueError('Keyframe interval must be positive (given: %s)' % keyframe_interval)
+        self.path = path
+        self.rom_hash = rom_hash
+        self.seed = Chip8.normalize_seed(seed)
+        self.keyframe_interval = keyframe_interval
+        self.frames = 0
+        self._chunk = bytearray()
+        self._chunk_start = 0
+        self._previous = None
+        self.queue = Queue()
+        self.file = open(path, 'wb')
+        self.file.write(Recording.HEADER.pack(Recording.MAGIC, Recording.VERSION, keyframe_interval, rom_hash,
+                                              self.seed is not None, self.seed or 0))
+        self.thread = Thread(name='Recorder-Thread', target=self._write_loop)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def record(self, chip8):
+        """
+        Records the current screen and key of a machine as the next frame
+        """
+        self.record_frame(chip8.get_screen(copy=False), chip8.input.read())
+
+    def record_frame(self, screen, key=None):
+        """
+        :param screen: One byte (0 or 1) per pixel
+        :param key: Key pressed during the frame, None if none
+        """
+        screen = bytes(bytearray(screen))
+        if self._previous is None:
+            payload = FrameCodec.encode(FrameCodec.BLANK, screen)
+        elif screen == self._previous:
+            payload = b''
+        else:
+            payload = FrameCodec.encode(self._previous, screen)
+        self._chunk += Recording.FRAME.pack(Recording.NO_KEY if key is None else key, len(payload))
+        self._chunk += payload
+        self._previous = screen
+        self.frames += 1
+        if self.frames - self._chunk_start == self.keyframe_interval:
+            self._flush_chunk()
+
+    def _flush_chunk(self):
+        count = self.frames - self._chunk_start
+        if count:
+            self.queue.put((self._chunk_start, count, bytes(self._chunk)))
+        self._chunk = bytearray()
+        self._chunk_start = self.frames
+        self._previous = None
+
+    def close(self):
+        """
+        Writes the last frames and closes the file
+        """
+        if self.file is None:
+            return
+        self._flush_chunk()
+        self.queue.put(None)
+        self.thread.join()
+        self.file.close()
+        self.file = None
+
+    def _write_loop(self):
+        while True:
+            chunk = self.queue.get()
+            if chunk is None:
+                break
+            start, count, data = chunk
+            data = zlib.compress(data)
+            self.file.write(Recording.CHUNK.pack(start, count, len(data)))
+            self.file.write(data)
+
+
+class Player(object):
+    """
+    Plays a recording back, without emulating
+
+    The chunks are indexed when the recording is opened; seeking decodes from the start of the chunk of the frame.
+    """
+
+    # clock and sleep pacing play(), replaced by a fake clock in tests
+    timer = staticmethod(time.time)
+    sleep = staticmethod(time.sleep)
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as recording_file:
+            header = recording_file.read(Recording.HEADER.size)
+            if len(header) < Recording.HEADER.size:
+                raise ValueError('Not a Chip8 recording')
+            magic, version, self.keyframe_interval, self.rom_hash, seeded, seed = Recording.HEADER.unpack(header)
+            if magic != Recording.MAGIC:
+                raise ValueError('Not a Chip8 recording')
+            if version != Recording.VERSION:
+                raise ValueError('Unsupported recording version %d' % version)
+            self.seed = seed if seeded else None
+            # (first frame, number of frames, offset of the compressed data, compressed size)
+            self.chunks = []
+            offset = Recording.HEADER.size
+            while True:
+                chunk_header = recording_file.read(Recording.CHUNK.size)
+                if len(chunk_header) < Recording.CHUNK.size:
+                    break
+                start, count, size = Recording.CHUNK.unpack(chunk_header)
+                offset += Recording.CHUNK.size
+                self.chunks.append((start, count, offset, size))
+                offset += size
+                recording_file.seek(offset)
+        self.frame_count = sum(chunk[1] for chunk in self.chunks)
+
+    def frames(self, start=0):
+        """
+        :param start: First frame
+        :return: Generator of (frame, key, screen) from a frame to the end, key being None if none
+        """
+        with open(self.path, 'rb') as recording_file:
+            for chunk_start, count, offset, size in self.chunks:
+                if chunk_start + count <= start:
+                    continue
+                recording_file.seek(offset)
+                data = zlib.decompress(recording_file.read(size))
+                screen = bytearray(FrameCodec.BLANK)
+                position = 0
+                for frame in range(chunk_start, chunk_start + count):
+                    key, length = Recording.FRAME.unpack_from(data, position)
+                    position += Recording.FRAME.size
+                    if length:
+                        screen = FrameCodec.decode(screen, bytearray(data[position:position + length]))
+                        position += length
+                    if frame >= start:
+                        yield frame, None if key == Recording.NO_KEY else key, bytearray(screen)
+
+    def seek(self, frame):
+        """
+        :return: (frame, key, screen) of a frame
+        """
+        if not 0 <= frame < self.frame_count:
+            raise IndexError('Frame %d is not recorded (%d frames)' % (frame, self.frame_count))
+        frames = self.frames(frame)
+        try:
+            return next(frames)
+        finally:
+            frames.close()
+
+    def play(self, listener, speed=1.0, start=0, frame_rate=Chip8.TIMER_FREQUENCY):
+        """
+        Hands the frames to a listener at the pace they were recorded at, times speed
+
+        :param listener: Callable taking (frame, key, screen)
+        :param speed: Playback speed factor, None for as fast as possible
+        :return: Number of frames played
+        """
+        played = 0
+        deadline = self.timer()
+        for frame, key, screen in self.frames(start):
+            if speed is not None:
+                deadline += 1.0 / (frame_rate * speed)
+                remaining = deadline - self.timer()
+                if remaining > 0:
+                    self.sleep(remaining)
+            listener(frame, key, screen)
+            played += 1
+        return played
@@ -0,0 +1,140 @@
+from collections import deque
+
+from chip8.emulator.Chip8 import Chip8
+from chip8.emulator.Framebuffer import Framebuffer
+
+
+class RewindBuffer(object):
+    """
+    Keeps the last states of a machine, one per frame, to step back through them
+
+    Every keyframe_interval frames a full snapshot is kept (keyframe). The frames in between only keep the
+    snapshot header and the memory pages and screen lines changed since their keyframe, as tracked by
+    Chip8.consume_written_pages() (FX33) and Framebuffer.consume_changed_lines() (DXYN, 00E0). Restoring a frame
+    is then a copy of its keyframe patched with its changes, whatever the length of the history.
+
+    The oldest keyframe and its frames are dropped when the history exceeds max_frames or max_bytes, the
+    current keyframe always being kept.
+    """
+
+    def __init__(self, seconds=10, frame_rate=Chip8.TIMER_FREQUENCY, keyframe_interval=60,
+                 max_bytes=16 * 1024 * 1024):
+        """
+        :param seconds: Duration of the history
+        :param frame_rate: Frames recorded per second
+        :param keyframe_interval: Number of frames between two keyframes
+        :param max_bytes: Approximate bound of the memory used by the history
+        """
+        if keyframe_interval < 1:
+            raise ValueError('Keyframe interval must be positive (given: %s)' % keyframe_interval)
+        self.max_frames = int(seconds * frame_rate)
+        self.keyframe_interval = keyframe_interval
+        self.max_bytes = max_bytes
+        # [keyframe snapshot, [frames]], a frame being (size, header, ((page, bytes), ...), ((line, bytes), ...))
+        self.groups = deque()
+        self.frames = 0
+        self.size = 0
+        # pages and lines changed since the current keyframe
+        self._pages = 0
+        self._lines = 0
+
+    def record(self, chip8):
+        """
+        Records the current state of a machine as the latest frame
+        """
+        pages = chip8.consume_written_pages()
+        lines = chip8.framebuffer.consume_changed_lines()
+        if not self.groups or len(self.groups[-1][1]) >= self.keyframe_interval:
+            keyframe = bytes(chip8.snapshot())
+            self.groups.append([keyframe, []])
+            self._add(len(keyframe), None, (), ())
+            self._pages = 0
+            self._lines = 0
+        else:
+            self._pages |= pages
+            self._lines |= lines
+            self._add_changes(chip8)
+        self._evict()
+
+    def _add_changes(self, chip8):
+        page_size = Chip8.PAGE_SIZE
+        memory = chip8.memory
+        page_data = tuple((page, bytes(memory[page * page_size:(page + 1) * page_size]))
+                          for page in self._bits(self._pages, len(memory) // page_size))
+        line_data = ()
+        if self._lines:
+            width = Framebuffer.WIDTH
+            pixels = chip8.framebuffer.dump()
+            line_data = tuple((line, bytes(pixels[line * width:(line + 1) * width]))
+                              for line in self._bits(self._lines, Framebuffer.HEIGHT))
+        header = chip8.get_state()
+        size = len(header) + sum(len(data) for _, data in page_data + line_data)
+        self._add(size, header, page_data, line_data)
+
+    def _add(self, size, header, page_data, line_data):
+        self.groups[-1][1].append((size, header, page_data, line_data))
+        self.frames += 1
+        self.size += size
+
+    def _evict(self):
+        groups = self.groups
+        while len(groups) > 1 and (self.frames > self.max_frames or self.size > self.max_bytes):
+            keyframe, frames = groups.popleft()
+            self.frames -= len(frames)
+            self.size -= sum(frame[0] for frame in frames)
+
+    @staticmethod
+    def _bits(mask, count):
+        return [n for n in range(0, count) if (mask >> n) & 0x1]
+
+    def step_back(self, chip8, frames=1):
+        """
+        Forgets the latest frames and restores the machine to the frame preceding them
+
+        :param frames: Number of frames to step back
+        :return: Number of frames actually stepped back (the oldest frame is never forgotten)
+        """
+        stepped = 0
+        groups = self.groups
+        while stepped < frames and self.frames > 1:
+            group_frames = groups[-1][1]
+            self.size -= group_frames.pop()[0]
+            self.frames -= 1
+            if not group_frames:
+                groups.pop()
+            stepped += 1
+        if groups:
+            self._restore(chip8)
+        return stepped
+
+    def _restore(self, chip8):
+        keyframe, frames = self.groups[-1]
+        size, header, page_data, line_data = frames[-1]
+        snap = bytearray(keyframe)
+        if header is not None:
+            header_size = Chip8.SNAPSHOT_HEADER.size
+            memory_end = header_size + len(chip8.memory)
+            snap[0:header_size] = header
+            for page, data in page_data:
+                address = header_size + page * Chip8.PAGE_SIZE
+                snap[address:address + len(data)] = data
+            for line, data in line_data:
+                address = memory_end + line * Framebuffer.WIDTH
+                snap[address:address + len(data)] = data
+        chip8.restore(snap)
+        # restore() reports the whole memory and screen as changed, the frame knows what changed since its keyframe
+        chip8.consume_written_pages()
+        chip8.framebuffer.consume_changed_lines()
+        self._pages = 0
+        self._lines = 0
+        for page, _ in page_data:
+            self._pages |= 1 << page
+        for line, _ in line_data:
+            self._lines |= 1 << line
+
+    def clear(self):
+        self.groups.clear()
+        self.frames = 0
+        self.size = 0
+        self._pages = 0
+        self._lines = 0
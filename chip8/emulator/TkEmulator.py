@@ -1,38 +1,53 @@
 from __future__ import print_function
 
-from StringIO import StringIO
-from Tkinter import Tk, Frame, BOTH, RAISED, LEFT, RIGHT, Button, Canvas, CENTER
+from Tkinter import Tk, Frame, BOTH, RAISED, LEFT, RIGHT, Button, Canvas, CENTER, NW, PhotoImage, DISABLED
 from threading import Thread
 from ttk import Style
 
 from chip8.emulator import Emulator
+from chip8.emulator.Chip8 import Chip8
+from chip8.emulator.Framebuffer import Framebuffer
+from chip8.emulator.ProcessEmulator import ProcessEmulator
+from chip8.emulator.Tracer import TraceDecoder
 
 
 # http://zetcode.com/gui/tkinter/layout/
 
 
 class TkEmulator(Emulator):
+    FRAME_RATE = 60
+
     def __init__(self, *args, **kwargs):
         kwargs['auto_start'] = False
         super(TkEmulator, self).__init__(*args, **kwargs)
+        # incremented by the emulation thread after each change of the screen, only read by the Tk thread
+        self.screen_version = 0
+        self._rendered_version = None
 
         self.tk_root = Tk()
         self.tk_frame = TkEmulatorFrame(self.tk_root, self)
 
         self._loop()
 
-    def _before_cycle(self, counter):
-        # print('cycle {:d}'.format(counter))
-        out = StringIO()
-        self.chip8.debug_dump(file=out)
-        # print(len(out.getvalue()))
-
-    def _after_cycle(self, counter):
-        self.tk_frame.update_pixels(self.chip8.get_screen())
-        # self.chip8._dump_screen()
-
     def _on_crash(self, e):
         print(e)
+        if self.tracer:
+            TraceDecoder.dump(list(TraceDecoder.unpack(self.tracer.get_records()))[-16:])
+        self.chip8.debug_dump()
+
+    def _on_screen_change(self, framebuffer):
+        self.screen_version += 1
+
+    def _render(self):
+        # runs on the Tk thread, independently of the emulation thread: the version is read before the screen, so a
+        # change racing with the copy is rendered by the next call, and the dirty state of the machine is left to
+        # its own consumers
+        chip8 = self.chip8
+        version = self.screen_version
+        if chip8 and version != self._rendered_version:
+            self._rendered_version = version
+            self.tk_frame.update_screen(chip8.get_screen())
+        self.tk_root.after(1000 // self.FRAME_RATE, self._render)
 
     def _loop(self):
         thread = Thread(name='Emulator-Thread', target=super(TkEmulator, self)._loop)
@@ -42,10 +57,41 @@ class TkEmulator(Emulator):
         self.tk_root.update()
         self.tk_root.minsize(800, 500)
 
+        self._render()
         self.tk_root.mainloop()
         print('Tk Stopped')
         self.terminate()
 
+
+class TkProcessEmulator(ProcessEmulator):
+    """
+    Tk frontend of an emulator running in another process, rendering the frames it publishes in shared memory
+    """
+
+    FRAME_RATE = 60
+
+    def __init__(self, **kwargs):
+        super(TkProcessEmulator, self).__init__(**kwargs)
+        self._rendered_frame = None
+
+        self.tk_root = Tk()
+        self.tk_frame = TkEmulatorFrame(self.tk_root, self)
+
+        self.tk_root.update()
+        self.tk_root.minsize(800, 500)
+
+        self._render()
+        self.tk_root.mainloop()
+        print('Tk Stopped')
+        self.join()
+
+    def _render(self):
+        state = self.read()
+        if state['frame'] != self._rendered_frame:
+            self._rendered_frame = state['frame']
+            self.tk_frame.update_screen(state['screen'])
+        self.tk_root.after(1000 // self.FRAME_RATE, self._render)
+
 # import pillow
 
 class TkEmulatorFrame(Frame):
@@ -87,6 +133,12 @@ class TkEmulatorFrame(Frame):
         self.screen_canvas.configure(background='red')
         self.screen_canvas.place_configure(anchor=CENTER, relx=.5, rely=.5)
 
+        # the screen is drawn in a 64x32 image, copied zoomed into the displayed image
+        self.screen_image = PhotoImage(width=Framebuffer.WIDTH, height=Framebuffer.HEIGHT)
+        self.scaled_screen_image = PhotoImage(width=w, height=h)
+        self.screen_canvas.create_image(0, 0, anchor=NW, image=self.scaled_screen_image)
+        self.update_screen(bytearray(Framebuffer.WIDTH * Framebuffer.HEIGHT))
+
         self.main_frame.pack(fill=BOTH, expand=True)
         self.pack(fill=BOTH, expand=True)
 
@@ -99,6 +151,12 @@ class TkEmulatorFrame(Frame):
         step_button = Button(self, text="Step", command=self.emulator.step)
         step_button.pack(side=LEFT, padx=5, pady=5)
 
+        back_button = Button(self, text="Back", command=lambda: self.emulator.step_back(Chip8.TIMER_FREQUENCY))
+        back_button.pack(side=LEFT, padx=5, pady=5)
+        if self.emulator.rewind is None:
+            # nothing to step back into
+            back_button.configure(state=DISABLED)
+
         stop_button = Button(self, text="Stop", command=self.emulator.stop)
         stop_button.pack(side=LEFT, padx=5, pady=5)
 
@@ -108,14 +166,13 @@ class TkEmulatorFrame(Frame):
         quit_button = Button(self, text="Quit", command=self.quit)
         quit_button.pack(side=RIGHT, padx=5, pady=5)
 
-    def update_pixels(self, screen):
-        for i, p in enumerate(screen):
-            px = i % 64
-            py = (i - px) / 64
-            x1 = px * self.screen_scale
-            y1 = py * self.screen_scale
-            x2 = x1 + self.screen_scale
-            y2 = y1 + self.screen_scale
-            # self.screen_canvas.create_rectangle(x1, y1, x2, y2, fill='black' if p else 'white')
-            # frame = self.pixel_frames[i]
-            # frame.configure(background='black' if p else 'white')
+    def update_screen(self, screen):
+        colors = ('#ffffff', '#000000')
+        width = Framebuffer.WIDTH
+        data = ' '.join(
+            '{' + ' '.join([colors[p] for p in screen[index:index + width]]) + '}'
+            for index in range(0, len(screen), width)
+        )
+        self.screen_image.put(data)
+        self.scaled_screen_image.tk.call(self.scaled_screen_image, 'copy', self.screen_image,
+                                         '-zoom', self.screen_scale, self.screen_scale)
@@ -0,0 +1,183 @@
+from __future__ import print_function
+
+import struct
+import sys
+from threading import Thread
+
+try:
+    from Queue import Queue
+except ImportError:
+    from queue import Queue
+
+
+class Tracer(object):
+    """
+    Records executed instructions in a fixed-size ring buffer of binary records
+
+    Each record holds the cycle, the PC and the opcode of the instruction, the I register, the V register written
+    by the instruction with its value (NO_REGISTER if none) and the value of VF when the instruction set it as a
+    flag (NO_FLAG if not), all after its execution.
+
+    With a writer, the records are handed to it each time the ring is full and on flush(), so the trace file
+    holds every instruction. Without a writer, the ring only keeps the last records.
+    """
+
+    MAGIC = b'C8TR'
+    VERSION = 2
+    HEADER = struct.Struct('<4sBB')
+    # cycle, pc, opcode, i, register index, register value, VF flag
+    RECORD = struct.Struct('<IHHHBBB')
+    NO_REGISTER = 0xff
+    # VF set as a flag is 0 or 1
+    NO_FLAG = 0xff
+
+    def __init__(self, capacity=4096, writer=None):
+        if capacity < 1:
+            raise ValueError('Capacity must be positive (given: %s)' % capacity)
+        self.capacity = capacity
+        self.writer = writer
+        self.buffer = bytearray(capacity * self.RECORD.size)
+        self.position = 0
+        self.flushed = 0
+
+    def record(self, cycle, pc, opcode, i_register, register, value, flag=NO_FLAG):
+        index = self.position % self.capacity
+        self.RECORD.pack_into(self.buffer, index * self.RECORD.size,
+                              cycle & 0xffffffff, pc & 0xffff, opcode, i_register & 0xffff, register, value, flag)
+        self.position += 1
+        if self.writer is not None and index == self.capacity - 1:
+            self.flush()
+
+    def get_records(self):
+        """
+        :return: The records still in the ring, oldest first, as binary data
+        """
+        size = self.RECORD.size
+        count = min(self.position, self.capacity)
+        start = (self.position - count) % self.capacity
+        data = self.buffer[start * size:(start + count) * size]
+        if start + count > self.capacity:
+            data += self.buffer[:(start + count - self.capacity) * size]
+        return bytes(data)
+
+    def flush(self):
+        """
+        Hands the records not given yet to the writer
+        """
+        if self.writer is None:
+            return
+        pending = min(self.position - self.flushed, self.capacity)
+        if pending:
+            self.writer.write(self.get_records()[-pending * self.RECORD.size:])
+        self.flushed = self.position
+
+    def close(self):
+        """
+        Hands the last records to the writer and closes it, the trace file being complete once it returns
+        """
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+
+    def save(self, path):
+        """
+        Writes the records still in the ring to a trace file
+        """
+        with open(path, 'wb') as trace_file:
+            trace_file.write(self.header())
+            trace_file.write(self.get_records())
+
+    @classmethod
+    def header(cls):
+        return cls.HEADER.pack(cls.MAGIC, cls.VERSION, cls.RECORD.size)
+
+
+class TraceWriter(object):
+    """
+    Writes trace records to a file from a background thread
+
+    The file is flushed after each chunk of records, so a trace survives the process exiting without close().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.closed = False
+        self.queue = Queue()
+        self.thread = Thread(name='Trace-Writer-Thread', target=self._write_loop)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def write(self, data):
+        self.queue.put(data)
+
+    def close(self):
+        """
+        Writes the records queued and closes the file
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.thread.join()
+
+    def _write_loop(self):
+        with open(self.path, 'wb') as trace_file:
+            trace_file.write(Tracer.header())
+            trace_file.flush()
+            while True:
+                data = self.queue.get()
+                if data is None:
+                    break
+                trace_file.write(data)
+                trace_file.flush()
+
+
+class TraceDecoder(object):
+    """
+    Decodes trace files
+    """
+
+    @staticmethod
+    def read(trace_file):
+        """
+        :param trace_file: Binary file object positioned at the start of a trace
+        :return: Generator of (cycle, pc, opcode, i, register index, register value, VF flag)
+        """
+        header = trace_file.read(Tracer.HEADER.size)
+        magic, version, record_size = Tracer.HEADER.unpack(header)
+        if magic != Tracer.MAGIC:
+            raise ValueError('Not a Chip8 trace')
+        if version != Tracer.VERSION or record_size != Tracer.RECORD.size:
+            raise ValueError('Unsupported trace version %d' % version)
+        while True:
+            data = trace_file.read(record_size * 1024)
+            for record in TraceDecoder.unpack(data):
+                yield record
+            if len(data) < record_size * 1024:
+                break
+
+    @staticmethod
+    def unpack(data):
+        """
+        :param data: Binary records, as returned by Tracer.get_records()
+        :return: Generator of (cycle, pc, opcode, i, register index, register value, VF flag)
+        """
+        size = Tracer.RECORD.size
+        for offset in range(0, len(data) - size + 1, size):
+            yield Tracer.RECORD.unpack_from(data, offset)
+
+    @staticmethod
+    def dump(records, file=sys.stdout):
+        """
+        Prints records in the format of Chip8.debug_dump
+        """
+        for cycle, pc, opcode, i_register, register, value, flag in records:
+            print('===== Chip8 trace =====', file=file)
+            print('cycle: {:d}'.format(cycle), file=file)
+            print('pc: 0x{:04X}'.format(pc), file=file)
+            print('opcode: 0x{:04X}'.format(opcode), file=file)
+            print('i:  0x{:04X}'.format(i_register), file=file)
+            if register != Tracer.NO_REGISTER:
+                print('v{}: 0x{:02X}'.format(hex(register)[2:].upper(), value), file=file)
+            if flag != Tracer.NO_FLAG:
+                print('vF: 0x{:02X}'.format(flag), file=file)
@@ -0,0 +1,213 @@
+import time
+
+from chip8.emulator.DispatchChip8 import DispatchChip8
+
+
+class TranslatingChip8(DispatchChip8):
+    """
+    Chip8 engine translating basic blocks of the program into Python functions
+
+    A block is the straight-line run of instructions starting at a given PC, up to (and including) the first
+    instruction changing the PC, drawing or storing in memory. Each block is compiled once from generated source
+    and cached by its start address, one cycle() then executes a whole block.
+
+    Blocks covering bytes written by the program (FX33) are evicted. Writing into self.memory from outside of the
+    machine requires a call to invalidate_blocks().
+
+    While a tracer or a profiler is set, instructions are executed one at a time so each of them is observed.
+    """
+
+    MAX_BLOCK_LENGTH = 64
+
+    # Handlers ending a block
+    TERMINATORS = frozenset([
+        '_op_return',
+        '_op_jump',
+        '_op_call',
+        '_op_skip_vx_eq_nn',
+        '_op_skip_vx_ne_nn',
+        '_op_skip_vx_eq_vy',
+        '_op_skip_vx_ne_vy',
+        '_op_jump_v0',
+        '_op_draw',
+        '_op_skip_key_pressed',
+        '_op_skip_key_not_pressed',
+        '_op_wait_key',
+        '_op_store_bcd',
+        '_op_unsupported',
+    ])
+
+    # Python source inlined in blocks in place of a handler call, V being the registers
+    TEMPLATES = {
+        '_op_set_vx_nn': ['V[{x}] = {nn}'],
+        '_op_add_vx_nn': ['V[{x}] = (V[{x}] + {nn}) & 0xff'],
+        '_op_set_vx_vy': ['V[{x}] = V[{y}]'],
+        '_op_or_vx_vy': ['V[{x}] |= V[{y}]'],
+        '_op_and_vx_vy': ['V[{x}] &= V[{y}]'],
+        '_op_xor_vx_vy': ['V[{x}] ^= V[{y}]'],
+        '_op_add_vx_vy': ['val = V[{x}] + V[{y}]', 'V[{x}] = val & 0xff', 'V[15] = 1 if val > 0xff else 0'],
+        '_op_sub_vx_vy': ['val = V[{x}] - V[{y}]', 'V[{x}] = val & 0xff', 'V[15] = 0 if val < 0 else 1'],
+        '_op_shr_vx': ['val = V[{x}]', 'V[15] = val & 0x1', 'V[{x}] = val >> 1'],
+        '_op_subn_vx_vy': ['val = V[{y}] - V[{x}]', 'V[{x}] = val & 0xff', 'V[15] = 0 if val < 0 else 1'],
+        '_op_shl_vx': ['val = V[{x}]', 'V[15] = (val >> 7) & 0x1', 'V[{x}] = (val << 1) & 0xff'],
+        '_op_set_i': ['self.i_register = {nnn}'],
+        '_op_random': ['V[{x}] = random_byte() & {nn}'],
+        '_op_get_delay_timer': ['V[{x}] = self.delay_timer'],
+        '_op_set_delay_timer': ['self.delay_timer = V[{x}]'],
+        '_op_set_sound_timer': ['self.sound_timer = V[{x}]'],
+        '_op_add_i_vx': ['self.i_register += V[{x}]'],
+        '_op_set_i_font': ['self.i_register = V[{x}] * 5'],
+    }
+
+    __slots__ = ('_blocks', '_block_owners')
+
+    def __init__(self, *args, **kwargs):
+        super(TranslatingChip8, self).__init__(*args, **kwargs)
+        self._blocks = {}
+        self._block_owners = {}
+
+    def cycle(self):
+        if self.is_instrumented():
+            return super(TranslatingChip8, self).cycle()
+        pc = self.pc
+        try:
+            block, end = self._blocks[pc]
+        except KeyError:
+            block, end = self._translate(pc)
+        if block is None:
+            return super(TranslatingChip8, self).cycle()
+        self._update_timers()
+        length = (end - pc) >> 1
+        if self.clock == self.CLOCK_VIRTUAL and self._cycle_counter + length > self.next_timer:
+            # single step when the timers tick within the block
+            self._cycle_counter += 1
+            self.pc = pc + 0x2
+            self.execute((self.memory[pc] << 8) | self.memory[pc + 1])
+            return self._cycle_counter
+        self._cycle_counter += length
+        block()
+        return self._cycle_counter
+
+    def _run(self, max_cycles, stop_pc, predicate, max_frames):
+        if predicate is not None or self.is_instrumented():
+            return super(TranslatingChip8, self)._run(max_cycles, stop_pc, predicate, max_frames)
+        blocks = self._blocks
+        translate = self._translate
+        memory = self.memory
+        execute = self.execute
+        count_down_timers = self._count_down_timers
+        now = time.time
+        virtual = self.clock == self.CLOCK_VIRTUAL
+        cycle_counter = self._cycle_counter
+        frame_duration = self.instructions_per_frame if virtual else 1000.0 / self.TIMER_FREQUENCY
+        next_timer = self.next_timer
+        executed = 0
+        frames = 0
+        reason = self.STOP_CYCLES
+        try:
+            while max_cycles is None or executed < max_cycles:
+                pc = self.pc
+                if pc == stop_pc:
+                    reason = self.STOP_PC
+                    break
+                if virtual:
+                    if cycle_counter + executed >= next_timer:
+                        if frames == max_frames:
+                            reason = self.STOP_FRAMES
+                            break
+                        count_down_timers()
+                        next_timer += frame_duration
+                        frames += 1
+                else:
+                    current_time = now() * 1000.0
+                    if current_time > next_timer:
+                        if frames == max_frames:
+                            reason = self.STOP_FRAMES
+                            break
+                        count_down_timers()
+                        next_timer = current_time + frame_duration
+                        frames += 1
+                try:
+                    block, end = blocks[pc]
+                except KeyError:
+                    block, end = translate(pc)
+                length = (end - pc) >> 1
+                if block is None or (max_cycles is not None and executed + length > max_cycles) or \
+                        (stop_pc is not None and pc < stop_pc < end) or \
+                        (virtual and cycle_counter + executed + length > next_timer):
+                    # single step when the block cannot run to its end
+                    executed += 1
+                    self.pc = pc + 0x2
+                    execute((memory[pc] << 8) | memory[pc + 1])
+                else:
+                    executed += length
+                    block()
+        finally:
+            self.next_timer = next_timer
+            self._cycle_counter += executed
+        return executed, reason
+
+    def invalidate_blocks(self, address=0x0, length=None):
+        """
+        Evicts the cached blocks covering some bytes of memory
+
+        :param address: Address of the first byte
+        :param length: Number of bytes (default: up to the end of memory)
+        """
+        if length is None:
+            length = len(self.memory) - address
+        if address <= 0 and address + length >= len(self.memory):
+            self._blocks.clear()
+            self._block_owners.clear()
+            return
+        for a in range(address, address + length):
+            starts = self._block_owners.pop(a, None)
+            if starts:
+                for start in starts:
+                    self._blocks.pop(start, None)
+
+    def _memory_written(self, address, length):
+        super(TranslatingChip8, self)._memory_written(address, length)
+        self.invalidate_blocks(address, length)
+
+    def _translate(self, start):
+        """
+        Compiles and caches the block starting at an address
+
+        :param start: Address of the first instruction of the block
+        :return: (block function, address following the block), the function being None if nothing can be compiled
+        """
+        memory = self.memory
+        pc = start
+        lines = []
+        namespace = {'self': self, 'random_byte': self.random_byte}
+        terminator = None
+        while pc + 1 < len(memory) and (pc - start) < 2 * self.MAX_BLOCK_LENGTH:
+            instruction = (memory[pc] << 8) | memory[pc + 1]
+            handler, x, y, nn, nnn = self.decode(instruction)
+            pc += 2
+            name = handler.__name__
+            if name in self.TERMINATORS:
+                terminator = 'h(%r, %r, %r, %r)' % (x, y, nn, nnn)
+                namespace['h'] = handler
+                break
+            if name in self.TEMPLATES:
+                lines.extend(line.format(x=x, y=y, nn=nn, nnn=nnn) for line in self.TEMPLATES[name])
+            else:
+                namespace['h%d' % pc] = handler
+                lines.append('h%d(%r, %r, %r, %r)' % (pc, x, y, nn, nnn))
+        if pc == start:
+            return None, start + 0x2
+
+        source = ['def block():', '    V = self.registers']
+        source.extend('    ' + line for line in lines)
+        source.append('    self.pc = %d' % pc)
+        if terminator:
+            source.append('    ' + terminator)
+        code = compile('\n'.join(source), '<chip8 block 0x%04X>' % start, 'exec')
+        exec(code, namespace)
+
+        block = self._blocks[start] = namespace['block'], pc
+        for a in range(start, pc):
+            self._block_owners.setdefault(a, set()).add(start)
+        return block
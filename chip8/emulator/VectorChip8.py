@@ -0,0 +1,405 @@
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from chip8.emulator.Chip8 import Chip8
+
+
+class VectorChip8(object):
+    """
+    Runs N Chip8 machines in lockstep, their state being NumPy arrays of shape (N, ...)
+
+    One step() executes one instruction on every running machine: the fetched instructions are grouped by opcode
+    family and each group is executed by masked array updates. The machines run on the virtual clock, so their
+    timers tick every instructions_per_frame steps like Chip8 with CLOCK_VIRTUAL.
+
+    A machine executing an instruction Chip8.execute rejects (unsupported instruction, stack overflow, address
+    out of memory) is halted instead of raising, the instruction being kept in faults. Its PC is already past the
+    instruction, as after a crash of Chip8.cycle(); the instruction itself has no effect.
+
+    CXNN draws from a NumPy random generator (seedable) instead of the random module.
+
+    Requires NumPy.
+    """
+
+    MEMORY_SIZE = Chip8.MEMORY_SIZE
+    WIDTH = 64
+    HEIGHT = 32
+    STACK_SIZE = 16
+
+    def __init__(self, count, memory=None, instructions_per_frame=None, seed=None):
+        """
+        :param count: Number of machines
+        :param memory: bytearray loaded in every machine, or list of one bytearray per machine
+        :param instructions_per_frame: Instructions per tick of the timers (default: Chip8.INSTRUCTIONS_PER_FRAME)
+        :param seed: Seed of the random generator of CXNN
+        """
+        if numpy is None:
+            raise ImportError('VectorChip8 requires numpy')
+        if count < 1:
+            raise ValueError('Count must be positive (given: %s)' % count)
+        self.count = count
+
+        self.memory = numpy.zeros((count, self.MEMORY_SIZE), dtype=numpy.uint8)
+        if memory is not None:
+            memories = [memory] * count if isinstance(memory, bytearray) else memory
+            if len(memories) != count:
+                raise ValueError('Expected %d memories (given: %d)' % (count, len(memories)))
+            for index, machine_memory in enumerate(memories):
+                self.memory[index, :len(machine_memory)] = numpy.frombuffer(bytes(machine_memory), dtype=numpy.uint8)
+        self.memory[:, :len(Chip8.FONTS)] = Chip8.FONTS
+
+        self.registers = numpy.zeros((count, 16), dtype=numpy.uint8)
+        self.i_register = numpy.zeros(count, dtype=numpy.int64)
+        self.pc = numpy.full(count, 0x0200, dtype=numpy.int64)
+        self.sp = numpy.zeros(count, dtype=numpy.int64)
+        self.stack = numpy.zeros((count, self.STACK_SIZE), dtype=numpy.int64)
+        self.delay_timer = numpy.zeros(count, dtype=numpy.int64)
+        self.sound_timer = numpy.zeros(count, dtype=numpy.int64)
+        self.screen = numpy.zeros((count, self.HEIGHT, self.WIDTH), dtype=numpy.uint8)
+        # pressed key of each machine, -1 for none
+        self.keys = numpy.full(count, -1, dtype=numpy.int64)
+        self.halted = numpy.zeros(count, dtype=bool)
+        self.faults = numpy.zeros(count, dtype=numpy.int64)
+
+        self.instructions_per_frame = instructions_per_frame or Chip8.INSTRUCTIONS_PER_FRAME
+        self.next_timer = 0
+        self._cycle_counter = 0
+        self.random = numpy.random.RandomState(seed)
+
+        self._families = (
+            self._family_0, self._family_1, self._family_2, self._family_3,
+            self._family_4, self._family_5, self._family_6, self._family_7,
+            self._family_8, self._family_9, self._family_a, self._family_b,
+            self._family_c, self._family_d, self._family_e, self._family_f,
+        )
+
+    @classmethod
+    def from_roms(cls, roms, **kwargs):
+        """
+        Creates one machine per ROM, loaded at 0x0200
+
+        :param roms: ROMs as bytes
+        :param kwargs: Other arguments of the constructor
+        """
+        memories = []
+        for rom in roms:
+            memory = bytearray(cls.MEMORY_SIZE)
+            memory[0x0200:0x0200 + len(rom)] = rom
+            memories.append(memory)
+        return cls(len(memories), memory=memories, **kwargs)
+
+    def get_cycle_counter(self):
+        return self._cycle_counter
+
+    def get_screen(self, machine):
+        """
+        :return: Screen of a machine as Chip8.get_screen() returns it
+        """
+        return bytearray(self.screen[machine].tobytes())
+
+    def press(self, machine, key_code):
+        """
+        :param key_code: Pressed key (0x0 to 0xf), None to release it
+        """
+        self.keys[machine] = -1 if key_code is None else key_code
+
+    def run(self, cycles):
+        """
+        :param cycles: Number of steps to execute
+        :return: Number of machines still running
+        """
+        for _ in range(0, cycles):
+            if not self.step():
+                break
+        return self.count - int(self.halted.sum())
+
+    def step(self):
+        """
+        Executes one instruction on every running machine
+
+        :return: Number of machines which executed an instruction
+        """
+        running = numpy.flatnonzero(~self.halted)
+        if self._cycle_counter >= self.next_timer:
+            self._count_down_timers(running)
+            self.next_timer += self.instructions_per_frame
+        self._cycle_counter += 1
+
+        pc = self.pc[running]
+        out = pc + 1 >= self.MEMORY_SIZE
+        if out.any():
+            self._fault(running[out], 0)
+            running = running[~out]
+            pc = pc[~out]
+        memory = self.memory
+        instructions = (memory[running, pc].astype(numpy.int64) << 8) | memory[running, pc + 1]
+        self.pc[running] = pc + 2
+
+        families = instructions >> 12
+        for family in numpy.unique(families):
+            group = families == family
+            self._families[family](running[group], instructions[group])
+        return len(running)
+
+    def _count_down_timers(self, machines):
+        delay = self.delay_timer[machines]
+        self.delay_timer[machines] = numpy.where(delay > 0, delay - 1, delay)
+        sound = self.sound_timer[machines]
+        self.sound_timer[machines] = numpy.where(sound > 0, sound - 1, sound)
+
+    def _fault(self, machines, instructions):
+        self.halted[machines] = True
+        self.faults[machines] = instructions
+
+    def _get(self, machines, registers):
+        return self.registers[machines, registers].astype(numpy.int64)
+
+    @staticmethod
+    def _x(instructions):
+        return (instructions & 0x0f00) >> 8
+
+    @staticmethod
+    def _y(instructions):
+        return (instructions & 0x00f0) >> 4
+
+    def _skip(self, machines, condition):
+        self.pc[machines[condition]] += 2
+
+    def _split(self, machines, instructions, mask, handlers):
+        """
+        Dispatches a family on its sub-opcodes, faulting on the sub-opcodes missing from handlers
+        """
+        sub_opcodes = instructions & mask
+        for sub_opcode in numpy.unique(sub_opcodes):
+            group = sub_opcodes == sub_opcode
+            handler = handlers.get(int(sub_opcode))
+            if handler is None:
+                self._fault(machines[group], instructions[group])
+            else:
+                handler(machines[group], instructions[group])
+
+    # 00E0 / 00EE
+    def _family_0(self, machines, instructions):
+        self._split(machines, instructions, 0x0fff, {
+            0x0e0: self._clear_screen,
+            0x0ee: self._return,
+        })
+
+    def _clear_screen(self, machines, instructions):
+        self.screen[machines] = 0
+
+    def _return(self, machines, instructions):
+        sp = self.sp[machines] - 1
+        # negative indexes wrap as in the array of Chip8.stack
+        bad = sp < -self.STACK_SIZE
+        self._fault(machines[bad], instructions[bad])
+        machines, sp = machines[~bad], sp[~bad]
+        self.sp[machines] = sp
+        self.pc[machines] = self.stack[machines, sp % self.STACK_SIZE]
+
+    # 1NNN
+    def _family_1(self, machines, instructions):
+        self.pc[machines] = instructions & 0x0fff
+
+    # 2NNN
+    def _family_2(self, machines, instructions):
+        sp = self.sp[machines]
+        bad = sp >= self.STACK_SIZE
+        self._fault(machines[bad], instructions[bad])
+        machines, sp, instructions = machines[~bad], sp[~bad], instructions[~bad]
+        self.stack[machines, sp % self.STACK_SIZE] = self.pc[machines]
+        self.sp[machines] = sp + 1
+        self.pc[machines] = instructions & 0x0fff
+
+    # 3XNN
+    def _family_3(self, machines, instructions):
+        self._skip(machines, self._get(machines, self._x(instructions)) == instructions & 0x00ff)
+
+    # 4XNN
+    def _family_4(self, machines, instructions):
+        self._skip(machines, self._get(machines, self._x(instructions)) != instructions & 0x00ff)
+
+    # 5XY0
+    def _family_5(self, machines, instructions):
+        self._split(machines, instructions, 0x000f, {0x0: self._skip_vx_eq_vy})
+
+    def _skip_vx_eq_vy(self, machines, instructions):
+        registers = self.registers
+        self._skip(machines, registers[machines, self._x(instructions)] == registers[machines, self._y(instructions)])
+
+    # 6XNN
+    def _family_6(self, machines, instructions):
+        self.registers[machines, self._x(instructions)] = instructions & 0x00ff
+
+    # 7XNN
+    def _family_7(self, machines, instructions):
+        x = self._x(instructions)
+        self.registers[machines, x] = (self._get(machines, x) + (instructions & 0x00ff)) & 0xff
+
+    # 8XYN
+    def _family_8(self, machines, instructions):
+        self._split(machines, instructions, 0x000f, {
+            0x0: self._set_vx_vy,
+            0x1: self._or_vx_vy,
+            0x2: self._and_vx_vy,
+            0x3: self._xor_vx_vy,
+            0x4: self._add_vx_vy,
+            0x5: self._sub_vx_vy,
+            0x6: self._shr_vx,
+            0x7: self._subn_vx_vy,
+            0xe: self._shl_vx,
+        })
+
+    def _set_vx_vy(self, machines, instructions):
+        self.registers[machines, self._x(instructions)] = self.registers[machines, self._y(instructions)]
+
+    def _or_vx_vy(self, machines, instructions):
+        x, y = self._x(instructions), self._y(instructions)
+        self.registers[machines, x] = self.registers[machines, x] | self.registers[machines, y]
+
+    def _and_vx_vy(self, machines, instructions):
+        x, y = self._x(instructions), self._y(instructions)
+        self.registers[machines, x] = self.registers[machines, x] & self.registers[machines, y]
+
+    def _xor_vx_vy(self, machines, instructions):
+        x, y = self._x(instructions), self._y(instructions)
+        self.registers[machines, x] = self.registers[machines, x] ^ self.registers[machines, y]
+
+    def _set_vx_flag(self, machines, x, val, flag):
+        # VX first: VF ends with the flag when X is F, as in Chip8.execute
+        self.registers[machines, x] = val & 0xff
+        self.registers[machines, 0xf] = flag
+
+    def _add_vx_vy(self, machines, instructions):
+        x = self._x(instructions)
+        val = self._get(machines, x) + self._get(machines, self._y(instructions))
+        self._set_vx_flag(machines, x, val, val > 0xff)
+
+    def _sub_vx_vy(self, machines, instructions):
+        x = self._x(instructions)
+        val = self._get(machines, x) - self._get(machines, self._y(instructions))
+        self._set_vx_flag(machines, x, val, val >= 0)
+
+    def _shr_vx(self, machines, instructions):
+        x = self._x(instructions)
+        vx = self._get(machines, x)
+        self.registers[machines, 0xf] = vx & 0x1
+        self.registers[machines, x] = vx >> 1
+
+    def _subn_vx_vy(self, machines, instructions):
+        x = self._x(instructions)
+        val = self._get(machines, self._y(instructions)) - self._get(machines, x)
+        self._set_vx_flag(machines, x, val, val >= 0)
+
+    def _shl_vx(self, machines, instructions):
+        x = self._x(instructions)
+        vx = self._get(machines, x)
+        self.registers[machines, 0xf] = (vx >> 7) & 0x1
+        self.registers[machines, x] = (vx << 1) & 0xff
+
+    # 9XY0
+    def _family_9(self, machines, instructions):
+        self._split(machines, instructions, 0x000f, {0x0: self._skip_vx_ne_vy})
+
+    def _skip_vx_ne_vy(self, machines, instructions):
+        registers = self.registers
+        self._skip(machines, registers[machines, self._x(instructions)] != registers[machines, self._y(instructions)])
+
+    # ANNN
+    def _family_a(self, machines, instructions):
+        self.i_register[machines] = instructions & 0x0fff
+
+    # BNNN
+    def _family_b(self, machines, instructions):
+        self.pc[machines] = (instructions & 0x0fff) + self._get(machines, 0x0)
+
+    # CXNN
+    def _family_c(self, machines, instructions):
+        values = self.random.randint(0x0, 0x100, size=len(machines))
+        self.registers[machines, self._x(instructions)] = values & instructions & 0x00ff
+
+    # DXYN
+    def _family_d(self, machines, instructions):
+        rows = numpy.arange(15)
+        heights = instructions & 0x000f
+        drawn = rows < heights[:, None]
+        addresses = self.i_register[machines][:, None] + rows
+        bad = (drawn & (addresses >= self.MEMORY_SIZE)).any(axis=1)
+        if bad.any():
+            self._fault(machines[bad], instructions[bad])
+            machines, instructions, drawn, addresses = machines[~bad], instructions[~bad], drawn[~bad], addresses[~bad]
+        sx = self._get(machines, self._x(instructions)) % self.WIDTH
+        sy = self._get(machines, self._y(instructions))
+
+        # (machine, row, bit) pixels of the sprites, 0 below their height
+        sprites = self.memory[machines[:, None], numpy.where(drawn, addresses, 0)] * drawn
+        pixels = ((sprites[:, :, None] >> (7 - numpy.arange(8))) & 0x1).astype(numpy.uint8)
+        lines = ((sy[:, None] + rows) % self.HEIGHT)[:, :, None]
+        columns = ((sx[:, None] + numpy.arange(8)) % self.WIDTH)[:, None, :]
+        targets = machines[:, None, None], lines, columns
+
+        screen = self.screen
+        old = screen[targets]
+        screen[targets] = old ^ pixels
+        self.registers[machines, 0xf] = (old & pixels).any(axis=(1, 2))
+
+    # EX9E / EXA1
+    def _family_e(self, machines, instructions):
+        self._split(machines, instructions, 0x00ff, {
+            0x9e: self._skip_key_pressed,
+            0xa1: self._skip_key_not_pressed,
+        })
+
+    def _skip_key_pressed(self, machines, instructions):
+        self._skip(machines, self.keys[machines] == self._get(machines, self._x(instructions)))
+
+    def _skip_key_not_pressed(self, machines, instructions):
+        self._skip(machines, self.keys[machines] != self._get(machines, self._x(instructions)))
+
+    # FXNN
+    def _family_f(self, machines, instructions):
+        self._split(machines, instructions, 0x00ff, {
+            0x07: self._get_delay_timer,
+            0x0a: self._wait_key,
+            0x15: self._set_delay_timer,
+            0x18: self._set_sound_timer,
+            0x1e: self._add_i_vx,
+            0x29: self._set_i_font,
+            0x33: self._store_bcd,
+        })
+
+    def _get_delay_timer(self, machines, instructions):
+        self.registers[machines, self._x(instructions)] = self.delay_timer[machines]
+
+    def _wait_key(self, machines, instructions):
+        keys = self.keys[machines]
+        waiting = keys < 0
+        self.pc[machines[waiting]] -= 2
+        pressed = ~waiting
+        self.registers[machines[pressed], self._x(instructions[pressed])] = keys[pressed]
+
+    def _set_delay_timer(self, machines, instructions):
+        self.delay_timer[machines] = self._get(machines, self._x(instructions))
+
+    def _set_sound_timer(self, machines, instructions):
+        self.sound_timer[machines] = self._get(machines, self._x(instructions))
+
+    def _add_i_vx(self, machines, instructions):
+        self.i_register[machines] += self._get(machines, self._x(instructions))
+
+    def _set_i_font(self, machines, instructions):
+        self.i_register[machines] = self._get(machines, self._x(instructions)) * 5
+
+    def _store_bcd(self, machines, instructions):
+        i_register = self.i_register[machines]
+        bad = i_register + 2 >= self.MEMORY_SIZE
+        if bad.any():
+            self._fault(machines[bad], instructions[bad])
+            machines, instructions, i_register = machines[~bad], instructions[~bad], i_register[~bad]
+        vx = self._get(machines, self._x(instructions))
+        memory = self.memory
+        memory[machines, i_register] = vx // 100
+        memory[machines, i_register + 1] = (vx % 100) // 10
+        memory[machines, i_register + 2] = vx % 10
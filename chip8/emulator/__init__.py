@@ -1,16 +1,36 @@
+from threading import Event
+
+try:
+    from Queue import Queue, Empty
+except ImportError:
+    from queue import Queue, Empty
+
+from chip8.emulator.Chip8 import Chip8
 from chip8.emulator.Input import Input
 from chip8.emulator.Chip8Utils import Chip8Utils
+from chip8.emulator.Tracer import Tracer
 
 
 class Emulator(object):
-    STOPPED = 'stopped',
-    RUNNING = 'running',
-    PAUSED = 'paused',
-    TERMINATED = 'terminated',
+    """
+    Runs a machine on the thread calling _loop(), controlled from any other thread
+
+    start(), pause(), step()... only queue a command: the commands are applied by the emulation thread, between two
+    cycles while running. While stopped or paused the emulation thread blocks until the next command, using no CPU.
+    """
 
-    def __init__(self, rom_path=None, auto_start=False, debug=False, kb_input=None):
+    STOPPED = 'stopped'
+    RUNNING = 'running'
+    PAUSED = 'paused'
+    TERMINATED = 'terminated'
+
+    def __init__(self, rom_path=None, auto_start=False, debug=False, kb_input=None, engine=None, tracer=None,
+                 profiler=None, rewind=None, pacer=None, server=None, recorder=None, seed=None):
         self.chip8 = None
         self.rom_path = rom_path
+        self.engine = engine
+        # seed of the random generator of the machine, None for the random module
+        self.seed = Chip8.normalize_seed(seed)
         self.status = self.STOPPED
         self.step_counter = 0
         if not kb_input:
@@ -19,63 +39,220 @@ class Emulator(object):
         if debug:
             debug = True
         self.debug = debug
+        if debug and not tracer:
+            tracer = Tracer()
+        self.tracer = tracer
+        self.profiler = profiler
+        # RewindBuffer recording a state each time the timers tick
+        self.rewind = rewind
+        self._last_timer = None
+        # Pacer throttling the machine, running flat out without one
+        self.pacer = pacer
+        # FrameServer streaming the screen to remote viewers, their key presses going to kb_input
+        self.server = server
+        if server is not None and server.kb_input is None:
+            server.kb_input = kb_input
+        # Recorder writing the screen and key of each frame
+        if recorder is not None and recorder.seed != self.seed:
+            raise ValueError('Recorder seed %s differs from the seed of the machine %s' % (recorder.seed, self.seed))
+        self.recorder = recorder
+        # commands queued by the control methods, _pending being set while the queue may hold some
+        self._commands = Queue()
+        self._pending = Event()
 
         if auto_start:
             self._loop()
 
     def _loop(self):
+        pending = self._pending
         try:
             while True:
-                step_counter = self.step_counter
-                while self.get_status() in [self.STOPPED, self.PAUSED] and step_counter == self.step_counter:
+                if self.status != self.RUNNING or pending.is_set():
+                    self._process_commands(block=self.status != self.RUNNING)
+                    if self.status == self.TERMINATED:
+                        break
                     continue
-                if self.status == self.TERMINATED:
-                    break
                 if self.chip8:  # might not be available already on STARTED
-                    self._before_cycle(self.chip8.get_cycle_counter())
-                    counter = self.chip8.cycle()
-                    self._after_cycle(counter)
+                    counter = self.chip8.get_cycle_counter()
+                    self._cycle()
+                    if self.pacer is not None:
+                        self.pacer.tick(self.chip8.get_cycle_counter() - counter)
         except Exception as e:
-            self._change_status(self.STOPPED)
-            self._on_crash(e)
+            self._crashed(e)
             raise e
             # print('Emulator crashed !', file=o)
             # print('  %s: %s' % (e.__class__.__name__, e), file=o)S
             # self.chip8.debug_dump(file=o)
 
+    def _crashed(self, e):
+        self._change_status(self.STOPPED)
+        # the session ends with the crash: the recording and trace are complete up to the crashing instruction
+        self._close_outputs()
+        self._on_crash(e)
+
+    def _close_outputs(self):
+        if self.server is not None:
+            self.server.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.tracer:
+            self.tracer.close()
+
+    def _cycle(self):
+        self._before_cycle(self.chip8.get_cycle_counter())
+        counter = self.chip8.cycle()
+        self._after_cycle(counter)
+        if (self.rewind is not None or self.server is not None or self.recorder is not None) and \
+                self.chip8.next_timer != self._last_timer:
+            self._last_timer = self.chip8.next_timer
+            self._on_frame()
+
+    def _on_frame(self):
+        """
+        Called each time the timers tick, with a rewind buffer, a server or a recorder
+        """
+        if self.rewind is not None:
+            self.rewind.record(self.chip8)
+        if self.recorder is not None:
+            self.recorder.record(self.chip8)
+        if self.server is not None:
+            self.server.publish(self.chip8.get_screen(copy=False))
+
+    def _post(self, command, *args):
+        """
+        Queues a command for the emulation thread, safe to call from any thread
+        """
+        self._commands.put((command, args))
+        self._pending.set()
+
+    def _process_commands(self, block=False):
+        """
+        Applies the queued commands on the emulation thread
+
+        :param block: Wait for a command when none is queued
+        """
+        commands = self._commands
+        if block:
+            command, args = commands.get()
+            command(*args)
+        # cleared before draining: a command queued meanwhile sets it again
+        self._pending.clear()
+        while True:
+            try:
+                command, args = commands.get_nowait()
+            except Empty:
+                break
+            command(*args)
+
     def get_status(self):
         return self.status
 
     def start(self):
+        self._post(self._start)
+
+    def un_pause(self):
+        self._post(self._un_pause)
+
+    def toggle_pause(self):
+        self._post(self._toggle_pause)
+
+    def stop(self):
+        self._post(self._stop)
+
+    def pause(self):
+        self._post(self._pause)
+
+    def terminate(self):
+        self._post(self._terminate)
+
+    def step(self):
+        """
+        Executes one cycle while stopped or paused
+        """
+        self._post(self._step)
+
+    def step_back(self, frames=1):
+        """
+        Requests the machine to be restored to the state it had a number of frames ago (requires a RewindBuffer)
+        """
+        if self.rewind is not None:
+            self._post(self._step_back, frames)
+
+    def set_speed(self, ips=None, fps=None):
+        """
+        Changes the target rates of the pacer
+
+        :param ips: Target instructions per second (default: unchanged)
+        :param fps: Frames per second (default: unchanged)
+        """
+        if self.pacer is not None:
+            self._post(self.pacer.set_speed, ips, fps)
+
+    def set_turbo(self, turbo):
+        """
+        Runs unthrottled, or back at the speed of the pacer
+        """
+        if self.pacer is not None:
+            self._post(self.pacer.set_turbo, turbo)
+
+    def _start(self):
         if self._change_status(self.RUNNING):
-            self.chip8 = Chip8Utils.create_from_rom(path=self.rom_path, input_kb=self.kb_input)
+            if self.chip8 is None:
+                self.chip8 = self._create_chip8()
+                self.chip8.set_screen_listener(self._on_screen_change)
+                self.chip8.set_tracer(self.tracer)
+                self.chip8.set_profiler(self.profiler)
+            else:
+                # restarting: the machine is reset instead of being built and loaded again
+                self.chip8.reset()
+            if self.rewind is not None:
+                self.rewind.clear()
+                self._last_timer = None
+            if self.pacer is not None:
+                self.pacer.reset()
             self._on_start()
 
-    def un_pause(self):
+    def _create_chip8(self):
+        return Chip8Utils.create_from_rom(path=self.rom_path, input_kb=self.kb_input, engine=self.engine,
+                                          seed=self.seed)
+
+    def _un_pause(self):
         if self._change_status(self.RUNNING):
+            if self.pacer is not None:
+                self.pacer.reset()
             self._on_un_pause()
 
-    def toggle_pause(self):
+    def _toggle_pause(self):
         if self.status == self.PAUSED:
-            self.un_pause()
+            self._un_pause()
         else:
-            self.pause()
+            self._pause()
 
-    def stop(self):
+    def _stop(self):
         if self._change_status(self.STOPPED):
             self._on_stop()
 
-    def pause(self):
+    def _pause(self):
         if self.status != self.PAUSED and self._change_status(self.PAUSED):
             self._on_pause()
 
-    def terminate(self):
+    def _terminate(self):
         if self._change_status(self.TERMINATED):
+            self._close_outputs()
             self._on_stop()
             self._on_terminate()
 
-    def step(self):
+    def _step(self):
         self.step_counter += 1
+        if self.chip8 and self.status in (self.STOPPED, self.PAUSED):
+            self._cycle()
+
+    def _step_back(self, frames):
+        if self.chip8:
+            self.rewind.step_back(self.chip8, frames)
+            self._last_timer = self.chip8.next_timer
+            if self.server is not None:
+                self.server.publish(self.chip8.get_screen(copy=False))
 
     def _change_status(self, status):
         if self.status == status:
@@ -107,3 +284,6 @@ class Emulator(object):
 
     def _on_crash(self, e):
         pass
+
+    def _on_screen_change(self, framebuffer):
+        pass
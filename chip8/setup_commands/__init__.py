@@ -1,6 +1,12 @@
 # https://seasonofcode.com/posts/how-to-add-custom-build-steps-and-commands-to-setuppy.html
+from batch import BatchCommand
+from benchmark import BenchmarkCommand
+from decode_trace import DecodeTraceCommand
 from run_emulator import RunEmulatorCommand
 
 commands = {
-    'run_emulator': RunEmulatorCommand
+    'batch': BatchCommand,
+    'benchmark': BenchmarkCommand,
+    'decode_trace': DecodeTraceCommand,
+    'run_emulator': RunEmulatorCommand,
 }
@@ -0,0 +1,50 @@
+import sys
+from distutils.cmd import Command
+from distutils.errors import DistutilsOptionError
+
+from chip8.emulator.BatchRunner import BatchRunner
+from chip8.emulator.Chip8Utils import Chip8Utils
+
+
+class BatchCommand(Command):
+    description = 'run many Chip8 ROMs headless in worker processes'
+    user_options = [
+        ('roms=', None, 'directory or glob pattern of the ROM files'),
+        ('engine=', None, 'the Chip8 engine (default: interpreter)'),
+        ('cycles=', None, 'maximum number of instructions per ROM'),
+        ('frames=', None, 'maximum number of frames per ROM'),
+        ('processes=', None, 'number of worker processes (default: number of CPUs)'),
+        ('output=', None, 'write the JSON lines results to this path (default: standard output)'),
+    ]
+
+    def __init__(self, dist):
+        Command.__init__(self, dist)
+        self.roms = None
+        self.engine = Chip8Utils.INTERPRETER
+        self.cycles = None
+        self.frames = None
+        self.processes = None
+        self.output = None
+
+    def initialize_options(self):
+        pass
+
+    def finalize_options(self):
+        if not self.roms:
+            raise DistutilsOptionError('The ROM files are required (--roms)')
+        if self.engine not in Chip8Utils.ENGINES:
+            raise DistutilsOptionError('Engine "{}" does not exist'.format(self.engine))
+        if self.cycles is None and self.frames is None:
+            raise DistutilsOptionError('A budget is required (--cycles and/or --frames)')
+        for option in ('cycles', 'frames', 'processes'):
+            if getattr(self, option) is not None:
+                setattr(self, option, int(getattr(self, option)))
+
+    def run(self):
+        runner = BatchRunner(BatchRunner.find_roms(self.roms), engine=self.engine, cycles=self.cycles,
+                             frames=self.frames, processes=self.processes)
+        if self.output:
+            with open(self.output, 'w') as output_file:
+                runner.run_to_file(output_file)
+        else:
+            runner.run_to_file(sys.stdout)
@@ -0,0 +1,64 @@
+from __future__ import print_function
+
+import json
+import os
+from distutils.cmd import Command
+from distutils.errors import DistutilsError, DistutilsOptionError
+
+from chip8.emulator.Benchmark import Benchmark
+from chip8.emulator.Chip8Utils import Chip8Utils
+
+
+class BenchmarkCommand(Command):
+    description = 'benchmark the Chip8 engines on a ROM corpus'
+    user_options = [
+        ('roms=', None, 'directory of the ROM files (default: tests/emulator/resources)'),
+        ('engine=', None, 'comma separated engines to benchmark (default: all)'),
+        ('frames=', None, 'number of frames to run each ROM for (default: 600)'),
+        ('output=', None, 'write the results as JSON to this path'),
+        ('compare=', None, 'JSON results of a previous run to compare with'),
+        ('threshold=', None, 'ratio a measure may worsen by before being a regression (default: 0.1)'),
+    ]
+
+    def __init__(self, dist):
+        Command.__init__(self, dist)
+        self.roms = os.path.join('tests', 'emulator', 'resources')
+        self.engine = None
+        self.frames = 600
+        self.output = None
+        self.compare = None
+        self.threshold = 0.1
+
+    def initialize_options(self):
+        pass
+
+    def finalize_options(self):
+        if not os.path.isdir(self.roms):
+            raise DistutilsOptionError('ROM directory "{}" does not exist'.format(self.roms))
+        if self.engine:
+            self.engine = self.engine.split(',')
+            for engine in self.engine:
+                if engine not in Chip8Utils.ENGINES:
+                    raise DistutilsOptionError('Engine "{}" does not exist'.format(engine))
+        if self.compare:
+            self.ensure_filename('compare')
+        self.frames = int(self.frames)
+        self.threshold = float(self.threshold)
+
+    def run(self):
+        results = Benchmark(Benchmark.find_roms(self.roms), engines=self.engine, frames=self.frames).run()
+        for rom, engines in sorted(results['roms'].items()):
+            for engine, result in sorted(engines.items()):
+                print('{:<20} {:<12} {:>12.0f} IPS  p50 {:.3f} ms  p99 {:.3f} ms'.format(
+                    rom, engine, result['ips'], result['frame_p50'] * 1000, result['frame_p99'] * 1000))
+        if self.output:
+            with open(self.output, 'w') as output_file:
+                json.dump(results, output_file, indent=2, sort_keys=True)
+        if self.compare:
+            with open(self.compare) as baseline_file:
+                baseline = json.load(baseline_file)
+            regressions = Benchmark.compare(baseline, results, self.threshold)
+            for name, old, new in regressions:
+                print('REGRESSION {}: {} -> {}'.format(name, old, new))
+            if regressions:
+                raise DistutilsError('{} regression(s) beyond {:.0%}'.format(len(regressions), self.threshold))
@@ -0,0 +1,24 @@
+from distutils.cmd import Command
+
+from chip8.emulator.Tracer import TraceDecoder
+
+
+class DecodeTraceCommand(Command):
+    description = 'print a Chip8 binary trace as text'
+    user_options = [
+        ('trace=', None, 'path to the trace file'),
+    ]
+
+    def __init__(self, dist):
+        Command.__init__(self, dist)
+        self.trace = None
+
+    def initialize_options(self):
+        pass
+
+    def finalize_options(self):
+        self.ensure_filename('trace')
+
+    def run(self):
+        with open(self.trace, 'rb') as trace_file:
+            TraceDecoder.dump(TraceDecoder.read(trace_file))
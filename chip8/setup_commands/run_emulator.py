@@ -2,7 +2,14 @@ from distutils.cmd import Command
 from distutils.errors import DistutilsOptionError
 
 from chip8.emulator import Emulator
-from chip8.emulator.TkEmulator import TkEmulator
+from chip8.emulator.Chip8Utils import Chip8Utils
+from chip8.emulator.FrameServer import FrameServer
+from chip8.emulator.Pacer import Pacer
+from chip8.emulator.Profiler import Profiler
+from chip8.emulator.Recorder import Recorder, Recording
+from chip8.emulator.Rewind import RewindBuffer
+from chip8.emulator.TkEmulator import TkEmulator, TkProcessEmulator
+from chip8.emulator.Tracer import Tracer, TraceWriter
 
 
 class RunEmulatorCommand(Command):
@@ -11,11 +18,22 @@ class RunEmulatorCommand(Command):
         ('rom=', None, 'path to the ROM file'),
         ('debug', None, 'enable debug'),
         ('emulator=', None, 'the emulator class (default: emulator)'),
+        ('engine=', None, 'the Chip8 engine (default: interpreter)'),
+        ('seed=', None, 'seed of the random generator of the machine, making its CXNN reproducible'),
+        ('ips=', None, 'throttle the machine to this number of instructions per second'),
+        ('turbo', None, 'run the machine unthrottled, measuring its speed'),
+        ('rewind=', None, 'keep this number of seconds of history to step back into'),
+        ('serve=', None, 'stream the screen to remote viewers on this address (host:port or Unix socket path)'),
+        ('record=', None, 'record the screen and keys of the session to this path'),
+        ('trace=', None, 'write every executed instruction to this trace file (see decode_trace)'),
+        ('profile=', None, 'write a JSON execution profile to this path'),
+        ('profile-stacks=', None, 'write the profiled call stacks in collapsed (flame graph) format to this path'),
     ]
 
     emulators = {
         'emulator': Emulator,
         'tk': TkEmulator,
+        'tk-process': TkProcessEmulator,
     }
 
     def __init__(self, dist):
@@ -23,6 +41,16 @@ class RunEmulatorCommand(Command):
         self.rom = None
         self.debug = False
         self.emulator = 'emulator'
+        self.engine = Chip8Utils.INTERPRETER
+        self.seed = None
+        self.ips = None
+        self.turbo = False
+        self.rewind = None
+        self.serve = None
+        self.record = None
+        self.trace = None
+        self.profile = None
+        self.profile_stacks = None
 
     def initialize_options(self):
         pass
@@ -32,6 +60,46 @@ class RunEmulatorCommand(Command):
             self.ensure_filename('rom')
         if not self.emulator or self.emulator not in self.emulators:
             raise DistutilsOptionError('Emulator "{}" does not exist'.format(self.emulator))
+        if self.engine not in Chip8Utils.ENGINES:
+            raise DistutilsOptionError('Engine "{}" does not exist'.format(self.engine))
+        if self.rewind is not None:
+            self.rewind = float(self.rewind)
+        if self.seed is not None:
+            self.seed = int(self.seed)
+        if self.ips is not None:
+            self.ips = int(self.ips)
+        if self.emulator == 'tk-process':
+            local = [option for option, value in (('serve', self.serve), ('record', self.record),
+                                                  ('trace', self.trace), ('profile', self.profile),
+                                                  ('profile-stacks', self.profile_stacks)) if value]
+            if local:
+                raise DistutilsOptionError('Emulator "tk-process" does not support --{}'.format(', --'.join(local)))
+        if self.serve and ':' in self.serve:
+            host, port = self.serve.rsplit(':', 1)
+            self.serve = (host, int(port))
 
     def run(self):
-        e = self.emulators[self.emulator](rom_path=self.rom, auto_start=True, debug=self.debug)
+        profiler = Profiler() if self.profile or self.profile_stacks else None
+        pacer = None
+        if self.ips or self.turbo:
+            pacer = Pacer(turbo=self.turbo)
+            pacer.set_speed(ips=self.ips)
+        rewind = RewindBuffer(seconds=self.rewind) if self.rewind else None
+        server = FrameServer(self.serve) if self.serve else None
+        recorder = Recorder(self.record, Recording.hash_rom(self.rom), seed=self.seed) if self.record else None
+        tracer = Tracer(writer=TraceWriter(self.trace)) if self.trace else None
+        try:
+            e = self.emulators[self.emulator](rom_path=self.rom, auto_start=True, debug=self.debug,
+                                                 engine=self.engine, tracer=tracer, profiler=profiler, pacer=pacer,
+                                                 rewind=rewind, server=server, recorder=recorder, seed=self.seed)
+        finally:
+            if recorder is not None:
+                recorder.close()
+            if tracer is not None:
+                tracer.close()
+            if self.profile:
+                with open(self.profile, 'w') as profile_file:
+                    profiler.to_json(profile_file, indent=2)
+            if self.profile_stacks:
+                with open(self.profile_stacks, 'w') as stacks_file:
+                    profiler.to_collapsed(stacks_file)
@@ -21,6 +21,9 @@ setup(
     install_requires=[
         # 'pillow'
     ],
+    extras_require={
+        'vector': ['numpy'],
+    },
     test_suite='tests.chip8_test_suite',
     tests_require=[
         'mock',
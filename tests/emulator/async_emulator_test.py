@@ -0,0 +1,84 @@
+import os
+import unittest
+
+from chip8.emulator.AsyncEmulator import AsyncEmulator, asyncio
+
+
+@unittest.skipIf(asyncio is None, 'asyncio is not available')
+class AsyncEmulatorTest(unittest.TestCase):
+    """
+    The asyncio emulator runs one frame per callback of the loop,
+    several emulators sharing the same loop.
+    """
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.path = os.path.join(os.path.dirname(__file__), 'resources', 'E07GraphicsRom.ch8')
+
+    def tearDown(self):
+        self.loop.close()
+
+    def create(self, frame_rate=None):
+        return AsyncEmulator(rom_path=self.path, loop=self.loop, frame_rate=frame_rate)
+
+    def sleep(self, seconds):
+        self.loop.run_until_complete(asyncio.sleep(seconds))
+
+    def testFrames(self):
+        emulator = self.create()
+        frames = emulator.frames()
+        emulator.start()
+        number, screen = self.loop.run_until_complete(frames.__anext__())
+        self.assertEquals(1, number)
+        self.assertEquals(64 * 32, len(screen))
+        number, _ = self.loop.run_until_complete(frames.__anext__())
+        self.assertTrue(number > 1)
+        self.assertEquals(10 * emulator.frame_counter, emulator.chip8.get_cycle_counter())
+        emulator.terminate()
+
+    def testPauseAndTerminate(self):
+        emulator = self.create()
+        frames = emulator.frames()
+        emulator.start()
+        self.sleep(0.01)
+        emulator.pause()
+        self.sleep(0)
+        counter = emulator.frame_counter
+        self.sleep(0.01)
+        self.assertEquals(AsyncEmulator.PAUSED, emulator.get_status())
+        self.assertEquals(counter, emulator.frame_counter)
+
+        emulator.terminate()
+        self.sleep(0)
+        # the latest frame is still delivered, then the iteration ends
+        self.assertEquals(counter, self.loop.run_until_complete(frames.__anext__())[0])
+        self.assertRaises(StopAsyncIteration, self.loop.run_until_complete, frames.__anext__())
+
+    def testSharedLoop(self):
+        emulators = [self.create() for _ in range(0, 3)]
+        for emulator in emulators:
+            emulator.start()
+        self.sleep(0.01)
+        for emulator in emulators:
+            self.assertTrue(emulator.frame_counter > 0)
+            emulator.terminate()
+
+    def testFramePacing(self):
+        emulator = self.create(frame_rate=100)
+        emulator.start()
+        self.sleep(0.1)
+        emulator.terminate()
+        self.assertTrue(5 <= emulator.frame_counter <= 12, emulator.frame_counter)
+
+    def testCrash(self):
+        emulator = self.create()
+        frames = emulator.frames()
+        emulator.start()
+        self.sleep(0)
+        # unsupported instruction 0x0000
+        emulator.chip8.pc = 0xF00
+        with self.assertRaises(NotImplementedError):
+            # a frame executed before the crash is still delivered first
+            for _ in range(0, 2):
+                self.loop.run_until_complete(frames.__anext__())
+        self.assertEquals(AsyncEmulator.STOPPED, emulator.get_status())
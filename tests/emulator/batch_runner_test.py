@@ -0,0 +1,58 @@
+import hashlib
+import json
+import os
+import unittest
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+from chip8.emulator.BatchRunner import BatchRunner, run_rom
+from chip8.emulator.Chip8 import Chip8
+
+
+class BatchRunnerTest(unittest.TestCase):
+    """
+    The batch runner executes ROMs headless in worker processes and produces
+    one result record per ROM.
+    """
+
+    RESOURCES = os.path.join(os.path.dirname(__file__), 'resources')
+
+    def testFindRoms(self):
+        roms = BatchRunner.find_roms(self.RESOURCES)
+        self.assertTrue(os.path.join(self.RESOURCES, 'E03TestRom.ch8') in roms)
+        self.assertEquals(roms, BatchRunner.find_roms(os.path.join(self.RESOURCES, '*.ch8')))
+        self.assertEquals([os.path.join(self.RESOURCES, 'E05SoundLoop.ch8'),
+                           os.path.join(self.RESOURCES, 'E05TimerLoop.ch8')],
+                          BatchRunner.find_roms(os.path.join(self.RESOURCES, 'E05*')))
+
+    def testRunRom(self):
+        record = run_rom((os.path.join(self.RESOURCES, 'E05TimerLoop.ch8'), 'interpreter', None, 5))
+        self.assertEquals(50, record['cycles'])
+        self.assertEquals(Chip8.STOP_FRAMES, record['reason'])
+        self.assertEquals(None, record['error'])
+        self.assertEquals(hashlib.sha1(bytes(bytearray(64 * 32))).hexdigest(), record['screen'])
+
+        record = run_rom((os.path.join(self.RESOURCES, 'E03TestRom.ch8'), 'dispatch', 100, None))
+        self.assertEquals(5, record['cycles'])
+        self.assertEquals({'type': 'NotImplementedError', 'message': 'Instruction "0x0000" is not supported'},
+                          record['error'])
+
+        record = run_rom((os.path.join(self.RESOURCES, 'missing.ch8'), 'interpreter', 100, None))
+        self.assertEquals('RuntimeError', record['error']['type'])
+        self.assertEquals(None, record['screen'])
+
+    def testRunToFile(self):
+        roms = BatchRunner.find_roms(self.RESOURCES)
+        output = StringIO()
+        self.assertEquals(len(roms), BatchRunner(roms, cycles=200, processes=2).run_to_file(output))
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEquals(roms, sorted(record['rom'] for record in records))
+        for record in records:
+            self.assertTrue(0 < record['cycles'] <= 200)
+
+    def testBudgetRequired(self):
+        self.assertRaises(ValueError, BatchRunner, [])
+        self.assertRaises(ValueError, BatchRunner, [], engine='unknown', cycles=1)
@@ -0,0 +1,49 @@
+import os
+import unittest
+
+from chip8.emulator.Benchmark import Benchmark
+from chip8.emulator.Chip8Utils import Chip8Utils
+
+
+class BenchmarkTest(unittest.TestCase):
+    """
+    The benchmark runs the ROM corpus on every engine and compares its
+    results with a baseline.
+    """
+
+    RESOURCES = os.path.join(os.path.dirname(__file__), 'resources')
+
+    def testRun(self):
+        roms = [os.path.join(self.RESOURCES, rom) for rom in ('E03TestRom.ch8', 'E05TimerLoop.ch8')]
+        results = Benchmark(roms, frames=5, constructions=1, opcode_iterations=10).run()
+        self.assertEquals(['E03TestRom.ch8', 'E05TimerLoop.ch8'], sorted(results['roms']))
+        for engines in results['roms'].values():
+            self.assertEquals(sorted(Chip8Utils.ENGINES), sorted(engines))
+        # E05TimerLoop never crashes: 5 frames of 10 instructions
+        timer_loop = results['roms']['E05TimerLoop.ch8'][Chip8Utils.INTERPRETER]
+        self.assertEquals(50, timer_loop['instructions'])
+        self.assertEquals(0, timer_loop['crashes'])
+        self.assertTrue(timer_loop['ips'] > 0)
+        self.assertTrue(timer_loop['frame_p50'] <= timer_loop['frame_p99'])
+        self.assertEquals(len(Benchmark.OPCODES), len(results['opcodes'][Chip8Utils.DISPATCH]))
+
+    def testPercentile(self):
+        values = [5, 1, 4, 2, 3]
+        self.assertEquals(1, Benchmark.percentile(values, 0))
+        self.assertEquals(3, Benchmark.percentile(values, 50))
+        self.assertEquals(5, Benchmark.percentile(values, 99))
+        self.assertEquals(0.0, Benchmark.percentile([], 50))
+
+    def testCompare(self):
+        baseline = {
+            'roms': {'a.ch8': {'interpreter': {'ips': 1000.0, 'frame_p99': 0.010, 'construction_time': 0.001}}},
+            'opcodes': {'interpreter': {'DXYN': 0.002, '6XNN': 0.001}},
+        }
+        current = {
+            'roms': {'a.ch8': {'interpreter': {'ips': 800.0, 'frame_p99': 0.0105, 'construction_time': 0.0005}},
+                     'b.ch8': {'interpreter': {'ips': 1.0}}},
+            'opcodes': {'interpreter': {'DXYN': 0.003, '6XNN': 0.001}},
+        }
+        self.assertEquals([('a.ch8/interpreter/ips', 1000.0, 800.0), ('opcodes/interpreter/DXYN', 0.002, 0.003)],
+                          Benchmark.compare(baseline, current, threshold=0.1))
+        self.assertEquals([], Benchmark.compare(baseline, current, threshold=0.6))
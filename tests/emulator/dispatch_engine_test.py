@@ -0,0 +1,75 @@
+import os
+import random
+import unittest
+
+from chip8.emulator.Chip8 import Chip8
+from chip8.emulator.Chip8Utils import Chip8Utils
+from chip8.emulator.DispatchChip8 import DispatchChip8
+
+
+class DispatchEngineTest(unittest.TestCase):
+    """
+    The dispatch engine decodes instructions through handler tables. It must
+    behave exactly like the if/elif interpreter of Chip8.execute.
+    """
+
+    SETUP = [0x6064, 0x6127, 0x6212, 0x63AE, 0x64FF, 0x65B4, 0x6642, 0x673F, 0x681F, 0x6F25, 0xA202]
+
+    def assertSameState(self, expected, actual):
+        self.assertEquals(expected.registers, actual.registers)
+        self.assertEquals(expected.get_pc(), actual.get_pc())
+        self.assertEquals(expected.get_i_register(), actual.get_i_register())
+        self.assertEquals(expected.sp, actual.sp)
+        self.assertEquals(list(expected.stack), list(actual.stack))
+        self.assertEquals(expected.delay_timer, actual.delay_timer)
+        self.assertEquals(expected.sound_timer, actual.sound_timer)
+        self.assertEquals(expected.get_memory(), actual.get_memory())
+        self.assertEquals(expected.get_screen(), actual.get_screen())
+
+    def testSelectEngine(self):
+        path = os.path.join(os.path.dirname(__file__), 'resources', 'E03TestRom.ch8')
+        self.assertEquals(Chip8, type(Chip8Utils.create_from_rom(path)))
+        self.assertEquals(DispatchChip8, type(Chip8Utils.create_from_rom(path, engine=Chip8Utils.DISPATCH)))
+        self.assertRaises(ValueError, Chip8Utils.create_from_rom, path, engine='unknown')
+
+    def testInstructionsMatchInterpreter(self):
+        instructions = [
+            0x00E0, 0x1DAE, 0x2DAE, 0x3064, 0x3164, 0x4064, 0x4164, 0x5070, 0x5170, 0x6A12, 0x7AFF, 0x7101,
+            0x8010, 0x8011, 0x8012, 0x8013, 0x8014, 0x8344, 0x8015, 0x8105, 0x8016, 0x8306, 0x8017, 0x8107,
+            0x801E, 0x844E, 0x8F14, 0x8F15, 0x8F1E, 0x9070, 0x9170, 0xA123, 0xB432, 0xC1FF, 0xD122, 0xD212,
+            0xE09E, 0xE0A1, 0xF007, 0xF015, 0xF018, 0xF11E, 0xF029, 0xF433, 0xF20A,
+        ]
+        for instruction in instructions:
+            interpreter = Chip8()
+            dispatch = DispatchChip8()
+            for chip8 in (interpreter, dispatch):
+                for setup in self.SETUP:
+                    chip8.execute(setup)
+                random.seed(instruction)
+                chip8.execute(instruction)
+            self.assertSameState(interpreter, dispatch)
+
+    def testReturnFromSubroutine(self):
+        interpreter = Chip8()
+        dispatch = DispatchChip8()
+        for chip8 in (interpreter, dispatch):
+            chip8.execute(0x2DAE)
+            chip8.execute(0x00EE)
+        self.assertSameState(interpreter, dispatch)
+
+    def testUnsupportedInstructions(self):
+        for instruction in [0x0123, 0x5121, 0x812F, 0x9121, 0xE1FF, 0xF1FF, 0xF155, 0xF165]:
+            chip8 = DispatchChip8()
+            self.assertRaises(NotImplementedError, chip8.execute, instruction)
+
+    def testRomsMatchInterpreter(self):
+        for rom, cycles in [('E03TestRom.ch8', 4), ('E05TimerLoop.ch8', 50), ('E07GraphicsRom.ch8', 10),
+                            ('smile.ch8', 5)]:
+            path = os.path.join(os.path.dirname(__file__), 'resources', rom)
+            interpreter = Chip8Utils.create_from_rom(path)
+            dispatch = Chip8Utils.create_from_rom(path, engine=Chip8Utils.DISPATCH)
+            for cycle in range(0, cycles):
+                for chip8 in (interpreter, dispatch):
+                    random.seed(cycle)
+                    chip8.cycle()
+                self.assertSameState(interpreter, dispatch)
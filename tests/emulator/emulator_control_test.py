@@ -0,0 +1,114 @@
+import os
+import time
+import unittest
+from threading import Thread
+
+from chip8.emulator import Emulator
+
+
+class RecordingEmulator(Emulator):
+    def __init__(self, *args, **kwargs):
+        self.events = []
+        super(RecordingEmulator, self).__init__(*args, **kwargs)
+
+    def _on_start(self):
+        self.events.append('start')
+
+    def _on_pause(self):
+        self.events.append('pause')
+
+    def _on_un_pause(self):
+        self.events.append('un_pause')
+
+    def _on_stop(self):
+        self.events.append('stop')
+
+    def _on_terminate(self):
+        self.events.append('terminate')
+
+
+class EmulatorControlTest(unittest.TestCase):
+    """
+    The control methods queue commands applied by the emulation thread,
+    which blocks while the emulator is stopped or paused.
+    """
+
+    def setUp(self):
+        path = os.path.join(os.path.dirname(__file__), 'resources', 'E05TimerLoop.ch8')
+        self.emulator = RecordingEmulator(rom_path=path)
+        self.thread = Thread(target=self.emulator._loop)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def tearDown(self):
+        self.emulator.terminate()
+        self.thread.join(5)
+
+    def wait_for(self, predicate):
+        deadline = time.time() + 5
+        while not predicate():
+            self.assertTrue(time.time() < deadline, 'Timed out')
+            time.sleep(0.001)
+
+    def sync(self):
+        # once the step is applied, every command queued before it is applied too
+        counter = self.emulator.step_counter
+        self.emulator.step()
+        self.wait_for(lambda: self.emulator.step_counter > counter)
+
+    def testIdleUntilStarted(self):
+        time.sleep(0.01)
+        self.assertEquals(Emulator.STOPPED, self.emulator.get_status())
+        self.assertEquals(None, self.emulator.chip8)
+        self.sync()
+        self.assertEquals(None, self.emulator.chip8)
+
+    def testStartPauseStep(self):
+        emulator = self.emulator
+        emulator.start()
+        self.wait_for(lambda: emulator.chip8 is not None and emulator.chip8.get_cycle_counter() > 10)
+        self.assertEquals(Emulator.RUNNING, emulator.get_status())
+
+        emulator.pause()
+        self.wait_for(lambda: emulator.get_status() == Emulator.PAUSED)
+        counter = emulator.chip8.get_cycle_counter()
+        time.sleep(0.01)
+        self.assertEquals(counter, emulator.chip8.get_cycle_counter())
+
+        self.sync()
+        self.assertEquals(counter + 1, emulator.chip8.get_cycle_counter())
+
+        emulator.toggle_pause()
+        self.wait_for(lambda: emulator.chip8.get_cycle_counter() > counter + 1)
+        self.assertEquals(Emulator.RUNNING, emulator.get_status())
+
+        emulator.stop()
+        self.sync()
+        self.assertEquals(Emulator.STOPPED, emulator.get_status())
+        self.assertEquals(['start', 'pause', 'un_pause', 'stop'], emulator.events)
+
+    def testRestartReusesMachine(self):
+        emulator = self.emulator
+        emulator.start()
+        self.wait_for(lambda: emulator.chip8 is not None and emulator.chip8.get_cycle_counter() > 10)
+        emulator.stop()
+        self.sync()
+        chip8 = emulator.chip8
+        emulator.start()
+        emulator.pause()
+        self.sync()
+        self.assertTrue(emulator.chip8 is chip8)
+        self.assertEquals(['start', 'stop', 'start', 'pause'], emulator.events)
+
+    def testTerminate(self):
+        self.emulator.start()
+        self.emulator.terminate()
+        self.thread.join(5)
+        self.assertFalse(self.thread.is_alive())
+        self.assertEquals(Emulator.TERMINATED, self.emulator.get_status())
+        self.assertEquals(['start', 'stop', 'terminate'], self.emulator.events)
+
+    def testTerminateWhileStopped(self):
+        self.emulator.terminate()
+        self.thread.join(5)
+        self.assertFalse(self.thread.is_alive())
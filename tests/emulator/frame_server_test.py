@@ -0,0 +1,140 @@
+import os
+import random
+import shutil
+import socket
+import tempfile
+import time
+import unittest
+from threading import Thread
+
+from chip8.emulator import Emulator
+from chip8.emulator.FrameServer import FrameClient, FrameCodec, FrameServer, FrameServerClient
+from chip8.emulator.Input import Input
+
+
+class FrameServerTest(unittest.TestCase):
+    """
+    The frame server streams the changes of the screen, run-length encoded,
+    to its clients, and applies the key events they send back.
+    """
+
+    def setUp(self):
+        self.random = random.Random(42)
+        self.servers = []
+
+    def tearDown(self):
+        for server in self.servers:
+            server.close()
+
+    def create_screen(self):
+        return bytes(bytearray(self.random.randint(0, 1) for _ in range(0, FrameCodec.SIZE)))
+
+    def create_server(self, address=('127.0.0.1', 0), kb_input=None):
+        server = FrameServer(address, kb_input=kb_input)
+        self.servers.append(server)
+        return server
+
+    def wait_for(self, predicate):
+        deadline = time.time() + 5
+        while not predicate():
+            self.assertTrue(time.time() < deadline, 'Timed out')
+            time.sleep(0.001)
+
+    def testCodec(self):
+        previous = self.create_screen()
+        current = bytearray(previous)
+        current[0] ^= 1
+        current[100] ^= 1
+        current[101] ^= 1
+        current = bytes(current)
+        encoded = FrameCodec.encode(previous, current)
+        # 0 unchanged, 1 changed, 99 unchanged, 2 changed, 1946 unchanged
+        self.assertEquals(bytearray([0, 1, 99, 2, 0x9a, 0x0f]), encoded)
+        self.assertEquals(bytearray(current), FrameCodec.decode(previous, encoded))
+
+        self.assertEquals(bytearray([0x80, 0x10]), FrameCodec.encode(current, current))
+        self.assertEquals(bytearray(current), FrameCodec.decode(FrameCodec.BLANK,
+                                                                FrameCodec.encode(FrameCodec.BLANK, current)))
+        self.assertRaises(ValueError, FrameCodec.decode, previous, bytearray([1]))
+
+    def testStream(self):
+        server = self.create_server()
+        first = self.create_screen()
+        server.publish(first)
+        client = FrameClient(server.address, timeout=5)
+        self.assertEquals((1, bytearray(first)), client.read_frame())
+
+        # unchanged screens are not sent
+        self.assertFalse(server.publish(first))
+        second = self.create_screen()
+        self.assertTrue(server.publish(second))
+        self.assertEquals((2, bytearray(second)), client.read_frame())
+        client.close()
+
+    def testKeys(self):
+        server = self.create_server(kb_input=Input())
+        client = FrameClient(server.address, timeout=5)
+        client.press(0xA)
+        self.wait_for(lambda: server.kb_input.read() == 0xA)
+        client.press(0x42)
+        client.unpress()
+        self.wait_for(lambda: server.kb_input.read() is None)
+        client.close()
+
+    def testUnixSocket(self):
+        directory = tempfile.mkdtemp()
+        try:
+            server = self.create_server(os.path.join(directory, 'chip8.sock'))
+            screen = self.create_screen()
+            server.publish(screen)
+            client = FrameClient(server.address, timeout=5)
+            self.assertEquals((1, bytearray(screen)), client.read_frame())
+            client.close()
+            server.close()
+            self.assertFalse(os.path.exists(server.address))
+        finally:
+            shutil.rmtree(directory)
+
+    def testManyClients(self):
+        server = self.create_server()
+        clients = [FrameClient(server.address, timeout=5) for _ in range(0, 4)]
+        self.wait_for(lambda: len(server.clients) == 4)
+        screens = [self.create_screen() for _ in range(0, 10)]
+        for index, screen in enumerate(screens):
+            server.publish(screen)
+            for client in clients:
+                self.assertEquals((index + 1, bytearray(screen)), client.read_frame())
+        for client in clients:
+            client.close()
+        self.wait_for(lambda: not server.clients)
+
+    def testMailboxKeepsLatestFrame(self):
+        server = self.create_server()
+        sock = socket.socket()
+        # not started, as if its sender thread were blocked by a slow viewer
+        client = FrameServerClient(server, sock)
+        screens = [self.create_screen() for _ in range(0, 3)]
+        for index, screen in enumerate(screens):
+            client.post(index + 1, screen)
+        self.assertEquals(2, client.dropped)
+        self.assertEquals((3, screens[-1]), client.pending)
+        sock.close()
+
+    def testEmulator(self):
+        path = os.path.join(os.path.dirname(__file__), 'resources', 'smile.ch8')
+        server = self.create_server()
+        emulator = Emulator(rom_path=path, server=server)
+        self.assertTrue(server.kb_input is emulator.kb_input)
+        thread = Thread(target=emulator._loop)
+        thread.daemon = True
+        thread.start()
+        client = FrameClient(server.address, timeout=5)
+        emulator.start()
+        frame, screen = client.read_frame()
+        while not any(screen):
+            frame, screen = client.read_frame()
+        emulator.terminate()
+        thread.join(5)
+        self.assertTrue(server.closed)
+        self.assertEquals(None, client.read_frame())
+        client.close()
@@ -0,0 +1,84 @@
+import random
+import unittest
+
+from chip8.emulator.Chip8 import Chip8
+from chip8.emulator.Framebuffer import Framebuffer, PackedFramebuffer
+
+
+class FramebufferTest(unittest.TestCase):
+    """
+    The screen can be stored one byte per pixel or as one 64 bits integer per
+    line, both must draw the same pixels.
+    """
+
+    def testPackedMatchesBytes(self):
+        rnd = random.Random(8)
+        memory = bytearray(rnd.randint(0, 0xff) for _ in range(0, 0x100))
+        framebuffer = Framebuffer()
+        packed = PackedFramebuffer()
+        for _ in range(0, 200):
+            x = rnd.randint(0, 0xff)
+            y = rnd.randint(0, 0xff)
+            address = rnd.randint(0, 0xf0)
+            rows = rnd.randint(0, 0xf)
+            self.assertEquals(framebuffer.draw(x, y, memory, address, rows), packed.draw(x, y, memory, address, rows))
+            self.assertEquals(framebuffer.get_sprite(x, y), packed.get_sprite(x, y))
+        self.assertEquals(framebuffer.get_screen(), packed.get_screen())
+
+        framebuffer.clear()
+        packed.clear()
+        self.assertEquals(bytearray(64 * 32), packed.get_screen())
+        self.assertEquals(framebuffer.get_screen(), packed.get_screen())
+
+    def testSpritesWrapAround(self):
+        for framebuffer in (Framebuffer(), PackedFramebuffer()):
+            chip8 = Chip8(framebuffer=framebuffer)
+            chip8.execute(0x673E)  # V7 = 62
+            chip8.execute(0x681F)  # V8 = 31
+            chip8.execute(0xF029)  # I = sprite of 0 (0xF0, 0x90, 0x90, 0x90, 0xF0)
+            chip8.execute(0xD782)  # Draw 2 lines of sprite at 62, 31
+            self.assertEquals(0x0, chip8.get_vf())
+
+            video = chip8.get_screen()
+            self.assertEquals(1, video[62 + 64 * 31])
+            self.assertEquals(1, video[63 + 64 * 31])
+            self.assertEquals(1, video[0 + 64 * 31])
+            self.assertEquals(1, video[1 + 64 * 31])
+            self.assertEquals(0, video[2 + 64 * 31])
+            self.assertEquals(1, video[62])
+            self.assertEquals(0, video[63])
+            self.assertEquals(0, video[0])
+            self.assertEquals(1, video[1])
+            self.assertEquals(0xF0, chip8._get_sprite(126, 31))
+
+            chip8.execute(0xD782)
+            self.assertEquals(0x1, chip8.get_vf())
+            self.assertEquals(bytearray(64 * 32), chip8.get_screen())
+
+    def testDirtyTracking(self):
+        for framebuffer in (Framebuffer(), PackedFramebuffer()):
+            chip8 = Chip8(framebuffer=framebuffer)
+            changes = []
+            chip8.set_screen_listener(changes.append)
+            self.assertEquals(None, chip8.consume_dirty())
+
+            chip8.execute(0x00E0)  # Clearing a blank screen changes nothing
+            self.assertEquals(None, chip8.consume_dirty())
+
+            chip8.execute(0x673E)  # V7 = 62
+            chip8.execute(0x681F)  # V8 = 31
+            chip8.execute(0xA000)  # I = sprite of 0 (0xF0, 0x90, 0x90, 0x90, 0xF0)
+            chip8.execute(0xD782)  # Draw 2 lines of sprite at 62, 31
+            self.assertEquals(([0, 31], [0, 1, 62, 63]), chip8.consume_dirty())
+            self.assertEquals(None, chip8.consume_dirty())
+            self.assertEquals([framebuffer], changes)
+
+            chip8.execute(0xA100)  # Drawing blank lines changes nothing
+            chip8.execute(0xD785)
+            self.assertEquals(None, chip8.consume_dirty())
+            self.assertEquals(1, len(changes))
+
+            chip8.execute(0x00E0)
+            lines, columns = chip8.consume_dirty()
+            self.assertEquals([0, 31], lines)
+            self.assertEquals(2, len(changes))
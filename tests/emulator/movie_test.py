@@ -0,0 +1,151 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from chip8.emulator.Chip8 import Chip8
+from chip8.emulator.Chip8Utils import Chip8Utils
+from chip8.emulator.Movie import Movie
+from chip8.emulator.Recorder import Recording
+
+
+class MovieTest(unittest.TestCase):
+    """
+    A seeded machine draws the same random numbers on every engine, and a
+    movie of its key presses replays a session to the same state.
+    """
+
+    # adds random bytes into V2, counting into V3 the cycles key 0 is down
+    ROM = bytearray([
+        0xC1, 0xFF,  # 0x200: V1 = rand() & 0xFF
+        0x82, 0x14,  # 0x202: V2 += V1
+        0xE0, 0x9E,  # 0x204: skip if key V0 pressed
+        0x12, 0x00,  # 0x206: jump 0x200
+        0x73, 0x01,  # 0x208: V3 += 1
+        0x12, 0x00,  # 0x20A: jump 0x200
+    ])
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.rom_path = os.path.join(self.directory, 'random.ch8')
+        with open(self.rom_path, 'wb') as rom_file:
+            rom_file.write(self.ROM)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    @staticmethod
+    def draw(engine, seed, count=32):
+        chip8 = Chip8Utils.get_engine(engine)(seed=seed)
+        values = []
+        for _ in range(0, count):
+            chip8.execute(0xC0FF)
+            values.append(chip8.get_v0())
+        return values
+
+    def testSeededRandomIsDeterministic(self):
+        expected = self.draw(Chip8Utils.INTERPRETER, 1234)
+        self.assertEquals(expected, self.draw(Chip8Utils.INTERPRETER, 1234))
+        self.assertEquals(expected, self.draw(Chip8Utils.DISPATCH, 1234))
+        self.assertEquals(expected, self.draw(Chip8Utils.TRANSLATING, 1234))
+        self.assertNotEqual(expected, self.draw(Chip8Utils.INTERPRETER, 4321))
+        # 0 is a valid seed, xorshift being kept away from its zero state
+        self.assertEquals(self.draw(Chip8Utils.INTERPRETER, 0), self.draw(Chip8Utils.DISPATCH, 0))
+        self.assertTrue(any(self.draw(Chip8Utils.INTERPRETER, 0)))
+
+    def testMaskedRandom(self):
+        chip8 = Chip8(seed=99)
+        for _ in range(0, 32):
+            chip8.execute(0xC00F)
+            self.assertEquals(0, chip8.get_v0() & 0xF0)
+
+    def testSnapshotKeepsRandomState(self):
+        chip8 = Chip8(seed=5)
+        chip8.execute(0xC0FF)
+        snap = chip8.snapshot()
+        expected = self.draw_from(chip8)
+        chip8.restore(snap)
+        self.assertEquals(expected, self.draw_from(chip8))
+
+        restored = Chip8()
+        restored.restore(snap)
+        self.assertEquals(expected, self.draw_from(restored))
+
+    def testResetAfterRestoreUsesRestoredSeed(self):
+        snap = Chip8(seed=5).snapshot()
+        chip8 = Chip8(seed=9)
+        chip8.restore(snap)
+        self.draw_from(chip8)
+        chip8.reset()
+        self.assertEquals(5, chip8.seed)
+        self.assertEquals(self.draw_from(Chip8(seed=5)), self.draw_from(chip8))
+
+        chip8.restore(Chip8().snapshot())
+        chip8.reset()
+        self.assertEquals(None, chip8.seed)
+
+    @staticmethod
+    def draw_from(chip8, count=8):
+        values = []
+        for _ in range(0, count):
+            chip8.execute(0xC0FF)
+            values.append(chip8.get_v0())
+        return values
+
+    def record(self, engine=None):
+        movie = Movie(Recording.hash_rom(self.rom_path), seed=77, instructions_per_frame=10)
+        chip8 = movie.create_machine(self.rom_path, engine, record=True)
+        kb_input = chip8.input
+        script = {3: 0x0, 4: 0x0, 9: 0x5, 12: None, 20: 0x0, 25: None}
+        for frame in range(0, 30):
+            if frame in script:
+                if script[frame] is None:
+                    kb_input.unpress()
+                else:
+                    kb_input.press(script[frame])
+            chip8.run_frames(1)
+        return movie, chip8
+
+    def testRecordAndReplay(self):
+        movie, chip8 = self.record()
+        # the second press of key 0 changes nothing
+        self.assertEquals([(3, 0x0), (9, 0x5), (12, None), (20, 0x0), (25, None)], movie.events)
+        self.assertEquals(30, movie.frames)
+        self.assertTrue(chip8.get_v3() > 0)
+
+        for engine in (Chip8Utils.INTERPRETER, Chip8Utils.DISPATCH, Chip8Utils.TRANSLATING):
+            replayed = movie.replay(self.rom_path, engine)
+            self.assertEquals(chip8.snapshot(), replayed.snapshot())
+
+        # presses are ignored while playing
+        player = movie.create_machine(self.rom_path)
+        player.input.press(0x0)
+        player.run_frames(2)
+        self.assertEquals(None, player.input.read())
+
+    def testSaveAndLoad(self):
+        movie, chip8 = self.record()
+        path = os.path.join(self.directory, 'session.c8mv')
+        movie.save(path)
+        loaded = Movie.load(path)
+        self.assertEquals(movie.rom_hash, loaded.rom_hash)
+        self.assertEquals(77, loaded.seed)
+        self.assertEquals(10, loaded.instructions_per_frame)
+        self.assertEquals(movie.frames, loaded.frames)
+        self.assertEquals(movie.events, loaded.events)
+        self.assertEquals(chip8.snapshot(), loaded.replay(self.rom_path).snapshot())
+
+        self.assertEquals(None, Movie.load(self.save_unseeded()).seed)
+        # seeds are kept to 32 bits, drawing the same numbers
+        Movie(seed=-1).save(path)
+        self.assertEquals(0xffffffff, Movie.load(path).seed)
+        self.assertEquals(self.draw(Chip8Utils.INTERPRETER, 2 ** 32 + 77), self.draw(Chip8Utils.INTERPRETER, 77))
+
+        with open(path, 'wb') as movie_file:
+            movie_file.write(b'C8RC' + bytearray(64))
+        self.assertRaises(ValueError, Movie.load, path)
+
+    def save_unseeded(self):
+        path = os.path.join(self.directory, 'unseeded.c8mv')
+        Movie().save(path)
+        return path
@@ -0,0 +1,110 @@
+import os
+import time
+import unittest
+from threading import Thread
+
+from chip8.emulator import Emulator
+from chip8.emulator.Pacer import Pacer
+
+
+class FakeClockPacer(Pacer):
+    """
+    Pacer on a fake clock, each sleep lasting oversleep seconds longer than asked and each reading of the clock
+    taking 10 microseconds
+    """
+
+    now = 0.0
+    oversleep = 0.0
+
+    def timer(self):
+        self.now += 0.00001
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds + self.oversleep
+
+    def __init__(self, *args, **kwargs):
+        self.sleeps = []
+        super(FakeClockPacer, self).__init__(*args, **kwargs)
+
+
+class PacerTest(unittest.TestCase):
+    """
+    The pacer waits after each batch of instructions for the deadline of
+    the next frame, deadlines being absolute so oversleeping does not drift.
+    """
+
+    def testBatches(self):
+        pacer = FakeClockPacer(ips=600, fps=60)
+        self.assertEquals(10, pacer.instructions_per_frame)
+        pacer.tick(9)
+        self.assertEquals([], pacer.sleeps)
+        pacer.tick(1)
+        self.assertEquals(1, len(pacer.sleeps))
+        self.assertAlmostEqual(1.0 / 60 - Pacer.SPIN_TIME, pacer.sleeps[0], places=4)
+        self.assertAlmostEqual(1.0 / 60, pacer.now, places=4)
+
+    def testRates(self):
+        pacer = FakeClockPacer(ips=600, fps=60)
+        for _ in range(0, 60):
+            pacer.tick(10)
+        report = pacer.report()
+        self.assertEquals(600, report['instructions'])
+        self.assertEquals(60, report['frames'])
+        self.assertAlmostEqual(1.0, report['elapsed'], places=4)
+        self.assertAlmostEqual(600.0, report['ips'], places=1)
+        self.assertAlmostEqual(60.0, report['fps'], places=1)
+        self.assertAlmostEqual(0.0, report['jitter'], places=4)
+
+    def testNoDrift(self):
+        pacer = FakeClockPacer(ips=600, fps=60)
+        pacer.oversleep = 0.002
+        for _ in range(0, 60):
+            pacer.tick(10)
+        # each frame is late by the oversleep minus the spin time, the lateness does not accumulate
+        self.assertAlmostEqual(1.001, pacer.now, places=4)
+        self.assertAlmostEqual(0.001, pacer.report()['drift'], places=4)
+
+    def testResync(self):
+        pacer = FakeClockPacer(ips=600, fps=60)
+        pacer.tick(10)
+        pacer.now += 1.0
+        pacer.tick(10)
+        self.assertEquals(1, pacer.resyncs)
+        self.assertEquals(1, len(pacer.sleeps))
+        start = pacer.now
+        pacer.tick(10)
+        self.assertAlmostEqual(start + 1.0 / 60, pacer.now, places=4)
+
+    def testTurbo(self):
+        pacer = FakeClockPacer(ips=600, fps=60, turbo=True)
+        pacer.tick(6000)
+        self.assertEquals([], pacer.sleeps)
+        self.assertEquals(600, pacer.frames)
+        pacer.set_turbo(False)
+        pacer.tick(10)
+        self.assertEquals(1, len(pacer.sleeps))
+
+    def testInvalidSpeed(self):
+        self.assertRaises(ValueError, Pacer, 0)
+        self.assertRaises(ValueError, Pacer().set_speed, -600)
+
+    def testEmulator(self):
+        path = os.path.join(os.path.dirname(__file__), 'resources', 'E07GraphicsRom.ch8')
+        pacer = FakeClockPacer(ips=1000, fps=100)
+        emulator = Emulator(rom_path=path, pacer=pacer)
+        thread = Thread(target=emulator._loop)
+        thread.daemon = True
+        thread.start()
+        emulator.start()
+        deadline = time.time() + 5
+        while pacer.instructions < 500:
+            self.assertTrue(time.time() < deadline, 'Timed out')
+            time.sleep(0.001)
+        emulator.terminate()
+        thread.join(5)
+        report = pacer.report()
+        self.assertTrue(report['frames'] >= 50, report['frames'])
+        # paced on the fake clock, whatever the load of the machine running the test
+        self.assertAlmostEqual(1000.0, report['ips'], delta=50)
@@ -0,0 +1,102 @@
+import os
+import unittest
+
+from chip8.emulator.Chip8 import Chip8
+from chip8.emulator.Chip8Utils import Chip8Utils
+from chip8.emulator.Pool import Chip8Pool
+
+
+class PoolTest(unittest.TestCase):
+    """
+    A machine resets to its prototype (fonts and ROM) in place, and a pool
+    hands out reset machines instead of building new ones.
+    """
+
+    ENGINES = (Chip8Utils.INTERPRETER, Chip8Utils.DISPATCH, Chip8Utils.TRANSLATING)
+
+    def setUp(self):
+        self.path = os.path.join(os.path.dirname(__file__), 'resources', 'smile.ch8')
+
+    def create(self, engine=None):
+        return Chip8Utils.create_from_rom(self.path, engine=engine, clock=Chip8.CLOCK_VIRTUAL, seed=3)
+
+    def testReset(self):
+        for engine in self.ENGINES:
+            chip8 = self.create(engine)
+            fresh = chip8.snapshot()
+            chip8.run_frames(20)
+            chip8.execute(0x6042)
+            chip8.execute(0xA300)
+            chip8.execute(0xF033)
+            self.assertNotEqual(fresh, chip8.snapshot())
+            memory = chip8.memory
+
+            chip8.reset()
+            self.assertEquals(fresh, chip8.snapshot())
+            self.assertTrue(chip8.memory is memory)
+            # a reset machine runs as a fresh one
+            chip8.run_frames(20)
+            expected = self.create(engine)
+            expected.run_frames(20)
+            self.assertEquals(expected.snapshot(), chip8.snapshot())
+
+    def testResetReportsChangedPages(self):
+        chip8 = self.create()
+        chip8.consume_written_pages()
+        chip8.execute(0x6042)
+        chip8.execute(0xA300)
+        chip8.execute(0xF033)
+        chip8.consume_written_pages()
+        chip8.reset()
+        self.assertEquals(1 << 3, chip8.consume_written_pages())
+        chip8.reset()
+        self.assertEquals(0, chip8.consume_written_pages())
+
+    def testResetNotifiesScreen(self):
+        chip8 = self.create()
+        chip8.run_frames(20)
+        self.assertTrue(any(chip8.get_screen()))
+        changes = []
+        chip8.set_screen_listener(changes.append)
+        chip8.reset()
+        self.assertEquals(1, len(changes))
+        self.assertFalse(any(chip8.get_screen()))
+
+    def testSetPrototype(self):
+        chip8 = self.create()
+        chip8.execute(0x6042)
+        chip8.execute(0xA300)
+        chip8.execute(0xF033)
+        chip8.set_prototype()
+        chip8.execute(0x6000)
+        chip8.execute(0xF033)
+        chip8.reset()
+        self.assertEquals(bytearray([0, 6, 6]), chip8.get_memory()[0x300:0x303])
+        self.assertRaises(ValueError, chip8.set_prototype, bytearray(16))
+
+    def testPool(self):
+        pool = Chip8Pool(self.path, engine=Chip8Utils.TRANSLATING, size=1, clock=Chip8.CLOCK_VIRTUAL, seed=3)
+        first = pool.acquire()
+        fresh = first.snapshot()
+        first.run_frames(20)
+        first.input.press(0x4)
+        pool.release(first)
+        self.assertEquals(1, len(pool))
+
+        self.assertTrue(pool.acquire() is first)
+        self.assertEquals(fresh, first.snapshot())
+        self.assertEquals(None, first.input.read())
+        second = pool.acquire()
+        self.assertFalse(second is first)
+        self.assertEquals(2, pool.created)
+
+        # idle machines are kept up to the size of the pool
+        pool.release(first)
+        pool.release(second)
+        self.assertEquals(1, len(pool))
+
+        with pool.machine() as chip8:
+            self.assertEquals(0, len(pool))
+            chip8.run_frames(5)
+        self.assertEquals(1, len(pool))
+        self.assertRaises(ValueError, Chip8Pool, self.path, size=0)
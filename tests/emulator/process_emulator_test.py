@@ -0,0 +1,73 @@
+import os
+import time
+import unittest
+
+from chip8.emulator import Emulator
+from chip8.emulator.Chip8 import Chip8
+from chip8.emulator.ProcessEmulator import ProcessEmulator, SharedState
+from chip8.emulator.Profiler import Profiler
+
+
+class ProcessEmulatorTest(unittest.TestCase):
+    """
+    The emulator process publishes the state of its machine into shared
+    memory, read by other processes without locking.
+    """
+
+    def testPublishAndRead(self):
+        chip8 = Chip8()
+        chip8.execute(0x6A42)
+        chip8.execute(0xA123)
+        chip8.execute(0xD005)
+        shared = SharedState()
+        shared.publish(chip8, Emulator.PAUSED)
+        self.assertEquals(2, shared.get_sequence())
+
+        state = SharedState(shared.raw).read()
+        self.assertEquals(2, state['sequence'])
+        self.assertEquals(1, state['frame'])
+        self.assertEquals(Emulator.PAUSED, state['status'])
+        self.assertEquals(0x123, state['i'])
+        self.assertEquals(0x42, state['registers'][0xA])
+        self.assertEquals(chip8.get_screen(), state['screen'])
+        self.assertEquals(chip8.get_screen(), bytearray(shared.get_screen_view()))
+
+    def testPublishStatus(self):
+        shared = SharedState()
+        shared.publish_status(Emulator.TERMINATED)
+        self.assertEquals(Emulator.TERMINATED, shared.read()['status'])
+
+    def testInvalidSize(self):
+        self.assertRaises(ValueError, SharedState, bytearray(16))
+
+    def testLocalArguments(self):
+        self.assertRaises(ValueError, ProcessEmulator, profiler=Profiler())
+
+    def wait_for(self, emulator, predicate):
+        deadline = time.time() + 10
+        state = emulator.read()
+        while not predicate(state):
+            self.assertTrue(time.time() < deadline, 'Timed out')
+            time.sleep(0.005)
+            state = emulator.read()
+        return state
+
+    def testProcess(self):
+        path = os.path.join(os.path.dirname(__file__), 'resources', 'smile.ch8')
+        emulator = ProcessEmulator(rom_path=path)
+        try:
+            self.assertEquals(Emulator.STOPPED, emulator.get_status())
+            emulator.start()
+            self.wait_for(emulator, lambda s: s['status'] == Emulator.RUNNING and any(s['screen']))
+
+            emulator.kb_input.press(0x5)
+            self.assertRaises(IndexError, emulator.kb_input.press, 0x10)
+
+            emulator.pause()
+            state = self.wait_for(emulator, lambda s: s['status'] == Emulator.PAUSED)
+            emulator.step()
+            self.wait_for(emulator, lambda s: s['cycle'] == state['cycle'] + 1)
+        finally:
+            emulator.join(10)
+        self.assertEquals(Emulator.TERMINATED, emulator.get_status())
+        self.assertEquals(0, emulator.process.exitcode)
@@ -0,0 +1,83 @@
+import json
+import unittest
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+from chip8.emulator.Chip8Utils import Chip8Utils
+from chip8.emulator.Profiler import Profiler
+
+
+class ProfilerTest(unittest.TestCase):
+    """
+    A profiler counts and times executed instructions per opcode family, per
+    address and per stack of subroutines.
+    """
+
+    # 0x200 calls 0x206 twice then loops on 0x204, 0x206 sets V0 and returns
+    PROGRAM = [0x2206, 0x2206, 0x1204, 0x6001, 0x00EE]
+
+    def create(self, engine):
+        chip8 = Chip8Utils.get_engine(engine)()
+        for i, instruction in enumerate(self.PROGRAM):
+            chip8.memory[0x200 + 2 * i] = instruction >> 8
+            chip8.memory[0x200 + 2 * i + 1] = instruction & 0xff
+        profiler = Profiler()
+        chip8.set_profiler(profiler)
+        return chip8, profiler
+
+    def testFamily(self):
+        self.assertEquals('00E0', Profiler.family(0x00E0))
+        self.assertEquals('00EE', Profiler.family(0x00EE))
+        self.assertEquals('0NNN', Profiler.family(0x0123))
+        self.assertEquals('2NNN', Profiler.family(0x2DAE))
+        self.assertEquals('3XNN', Profiler.family(0x3A12))
+        self.assertEquals('8XY4', Profiler.family(0x8124))
+        self.assertEquals('8XYE', Profiler.family(0x812E))
+        self.assertEquals('DXYN', Profiler.family(0xD125))
+        self.assertEquals('EX9E', Profiler.family(0xE19E))
+        self.assertEquals('FX33', Profiler.family(0xF233))
+
+    def testCounts(self):
+        for engine in Chip8Utils.ENGINES:
+            chip8, profiler = self.create(engine)
+            chip8.run(8)
+            chip8.cycle()
+            self.assertEquals(9, profiler.instructions)
+            self.assertEquals({'2NNN': 2, '6XNN': 2, '00EE': 2, '1NNN': 3},
+                              dict((family, stat[0]) for family, stat in profiler.opcodes.items()))
+            self.assertEquals({0x200: 1, 0x202: 1, 0x204: 3, 0x206: 2, 0x208: 2},
+                              dict((pc, stat[0]) for pc, stat in profiler.addresses.items()))
+            self.assertEquals({(0x200,): 5, (0x200, 0x206): 4},
+                              dict((stack, stat[0]) for stack, stat in profiler.stacks.items()))
+            self.assertEquals({(0x200, 0x206): 2}, dict((call, stat[0]) for call, stat in profiler.calls.items()))
+            self.assertTrue(profiler.time >= 0)
+
+    def testDisabled(self):
+        chip8, profiler = self.create(Chip8Utils.INTERPRETER)
+        chip8.set_profiler(None)
+        chip8.run(5)
+        self.assertEquals(0, profiler.instructions)
+        self.assertEquals({}, profiler.opcodes)
+
+    def testJson(self):
+        chip8, profiler = self.create(Chip8Utils.INTERPRETER)
+        chip8.run(9)
+        output = StringIO()
+        profiler.to_json(output)
+        report = json.loads(output.getvalue())
+        self.assertEquals(9, report['instructions'])
+        self.assertEquals(['0x0200', '0x0202', '0x0204', '0x0206', '0x0208'],
+                          sorted(row['address'] for row in report['addresses']))
+        self.assertEquals([{'caller': '0x0200', 'callee': '0x0206', 'count': 2}],
+                          [dict((k, row[k]) for k in ('caller', 'callee', 'count')) for row in report['calls']])
+
+    def testCollapsed(self):
+        chip8, profiler = self.create(Chip8Utils.INTERPRETER)
+        chip8.run(9)
+        output = StringIO()
+        profiler.to_collapsed(output)
+        self.assertEquals('0x0200 5\n0x0200;0x0206 4\n', output.getvalue())
+        self.assertRaises(ValueError, profiler.to_collapsed, output, 'unknown')
@@ -0,0 +1,174 @@
+import os
+import random
+import shutil
+import tempfile
+import time
+import unittest
+from threading import Thread
+
+from chip8.emulator import Emulator
+from chip8.emulator.FrameServer import FrameCodec
+from chip8.emulator.Recorder import Player, Recorder, Recording
+
+
+class FakeClockPlayer(Player):
+    """
+    Player on a fake clock, each sleep lasting exactly as asked
+    """
+
+    now = 0.0
+
+    def timer(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def __init__(self, *args, **kwargs):
+        self.sleeps = []
+        super(FakeClockPlayer, self).__init__(*args, **kwargs)
+
+
+class RecorderTest(unittest.TestCase):
+    """
+    The recorder writes the screen and key of each frame in compressed
+    chunks, played back and seeked without emulating.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'session.c8rc')
+        self.random = random.Random(7)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def create_frames(self, count):
+        screen = bytearray(FrameCodec.SIZE)
+        frames = []
+        for index in range(0, count):
+            if index % 3:
+                screen[self.random.randint(0, FrameCodec.SIZE - 1)] ^= 1
+            frames.append((bytes(screen), None if index % 4 else index % 16))
+        return frames
+
+    def record(self, frames, keyframe_interval=10):
+        recorder = Recorder(self.path, rom_hash=b'\x01' * 20, seed=1234, keyframe_interval=keyframe_interval)
+        for screen, key in frames:
+            recorder.record_frame(screen, key)
+        recorder.close()
+
+    def testPlayback(self):
+        frames = self.create_frames(25)
+        self.record(frames)
+        player = Player(self.path)
+        self.assertEquals(b'\x01' * 20, player.rom_hash)
+        self.assertEquals(1234, player.seed)
+        self.assertEquals(25, player.frame_count)
+        self.assertEquals([(0, 10), (10, 10), (20, 5)], [chunk[:2] for chunk in player.chunks])
+        self.assertEquals([(index, key, bytearray(screen)) for index, (screen, key) in enumerate(frames)],
+                          list(player.frames()))
+
+    def testSeek(self):
+        frames = self.create_frames(25)
+        self.record(frames)
+        player = Player(self.path)
+        self.assertEquals((13, None, bytearray(frames[13][0])), player.seek(13))
+        self.assertEquals((20, 4, bytearray(frames[20][0])), player.seek(20))
+        self.assertEquals([15, 16], [frame for frame, _, _ in player.frames(15)][:2])
+        self.assertRaises(IndexError, player.seek, 25)
+
+    def testCompact(self):
+        frames = self.create_frames(600)
+        self.record(frames, keyframe_interval=60)
+        # far below the 2048 bytes of a raw screen per frame
+        self.assertTrue(os.path.getsize(self.path) < 600 * 20, os.path.getsize(self.path))
+
+    def testPlayFasterThanRealTime(self):
+        self.record(self.create_frames(60))
+        player = FakeClockPlayer(self.path)
+        played = []
+
+        def listener(frame, key, screen):
+            played.append((frame, player.now))
+            # the frames 10 to 19 take twice their time to be shown
+            if 10 <= frame < 20:
+                player.now += 2.0 / 600
+
+        self.assertEquals(60, player.play(listener, speed=10))
+        self.assertEquals(list(range(0, 60)), [frame for frame, _ in played])
+        # frames are shown at their deadline, the ones late because of the slow frames without waiting, until the
+        # delay is caught up by the frame 30
+        for frame, now in played[:11] + played[30:]:
+            self.assertAlmostEqual((frame + 1) / 600.0, now)
+        self.assertTrue(all(now > (frame + 1) / 600.0 for frame, now in played[11:30]))
+        self.assertAlmostEqual(0.1, player.now)
+
+        # as fast as possible
+        player = FakeClockPlayer(self.path)
+        self.assertEquals(60, player.play(lambda frame, key, screen: None, speed=None))
+        self.assertEquals([], player.sleeps)
+
+    def testSeeds(self):
+        # seeds are kept to the 32 bits the machine draws from, and 0 is a seed
+        for seed, expected in ((0, 0), (2 ** 64 + 5, 5), (-1, 0xffffffff), (None, None)):
+            Recorder(self.path, seed=seed).close()
+            self.assertEquals(expected, Player(self.path).seed)
+
+    def testInvalidFile(self):
+        with open(self.path, 'wb') as invalid_file:
+            invalid_file.write(b'\x00' * Recording.HEADER.size)
+        self.assertRaises(ValueError, Player, self.path)
+
+    def wait_frames(self, recorder, count):
+        deadline = time.time() + 5
+        while recorder.frames < count:
+            self.assertTrue(time.time() < deadline, 'Timed out')
+            time.sleep(0.001)
+
+    def testEmulator(self):
+        path = os.path.join(os.path.dirname(__file__), 'resources', 'smile.ch8')
+        recorder = Recorder(self.path, Recording.hash_rom(path))
+        emulator = Emulator(rom_path=path, recorder=recorder)
+        thread = Thread(target=emulator._loop)
+        thread.daemon = True
+        thread.start()
+        emulator.start()
+        self.wait_frames(recorder, 5)
+        emulator.terminate()
+        thread.join(5)
+        player = Player(self.path)
+        self.assertEquals(Recording.hash_rom(path), player.rom_hash)
+        self.assertEquals(None, player.seed)
+        self.assertTrue(player.frame_count > 0)
+        self.assertTrue(any(any(screen) for _, _, screen in player.frames()))
+
+    def testEmulatorCrash(self):
+        path = os.path.join(os.path.dirname(__file__), 'resources', 'E05TimerLoop.ch8')
+        recorder = Recorder(self.path, Recording.hash_rom(path))
+        emulator = Emulator(rom_path=path, recorder=recorder)
+        emulator.start()
+        self.assertRaises(Exception, emulator._loop)
+        # the frames up to the crash are written without terminating
+        self.assertEquals(None, recorder.file)
+        player = Player(self.path)
+        self.assertTrue(player.frame_count > 0)
+        self.assertEquals(recorder.frames, player.frame_count)
+
+    def testEmulatorSeed(self):
+        path = os.path.join(os.path.dirname(__file__), 'resources', 'smile.ch8')
+        recorder = Recorder(self.path, Recording.hash_rom(path), seed=1234)
+        emulator = Emulator(rom_path=path, recorder=recorder, seed=1234)
+        thread = Thread(target=emulator._loop)
+        thread.daemon = True
+        thread.start()
+        emulator.start()
+        self.wait_frames(recorder, 5)
+        emulator.terminate()
+        thread.join(5)
+        self.assertEquals(1234, emulator.chip8.seed)
+        self.assertEquals(1234, Player(self.path).seed)
+
+        # a recording must not claim a seed the machine does not run with
+        self.assertRaises(ValueError, Emulator, rom_path=path, recorder=recorder)
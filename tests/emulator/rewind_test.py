@@ -0,0 +1,87 @@
+import unittest
+
+from chip8.emulator.Chip8 import Chip8
+from chip8.emulator.Chip8Utils import Chip8Utils
+from chip8.emulator.Framebuffer import PackedFramebuffer
+from chip8.emulator.Rewind import RewindBuffer
+
+
+class RewindTest(unittest.TestCase):
+    """
+    The rewind buffer records one state per frame, keeping full snapshots
+    only for keyframes, and restores any of them when stepping back.
+    """
+
+    # I := 0x300, loop: V0 += 1, BCD of V0 at I, draw 5 lines at (V0, V1)
+    PROGRAM = [0xA300, 0x7001, 0xF033, 0xD015, 0x1202]
+
+    def create(self, engine=None, framebuffer=None):
+        chip8 = Chip8Utils.get_engine(engine)(clock=Chip8.CLOCK_VIRTUAL, framebuffer=framebuffer)
+        for i, instruction in enumerate(self.PROGRAM):
+            chip8.memory[0x200 + 2 * i] = instruction >> 8
+            chip8.memory[0x200 + 2 * i + 1] = instruction & 0xff
+        chip8._memory_written(0x200, 2 * len(self.PROGRAM))
+        return chip8
+
+    def record(self, chip8, rewind, frames):
+        snapshots = []
+        for _ in range(0, frames):
+            chip8.run_frames(1)
+            rewind.record(chip8)
+            snapshots.append(chip8.snapshot())
+        return snapshots
+
+    def testWrittenPages(self):
+        chip8 = self.create()
+        chip8.consume_written_pages()
+        chip8.execute(0xA2FF)
+        chip8.execute(0xF033)
+        self.assertEquals((1 << 2) | (1 << 3), chip8.consume_written_pages())
+        self.assertEquals(0, chip8.consume_written_pages())
+
+    def testStepBack(self):
+        for engine in Chip8Utils.ENGINES:
+            for framebuffer in (None, PackedFramebuffer()):
+                chip8 = self.create(engine, framebuffer)
+                rewind = RewindBuffer(keyframe_interval=4)
+                snapshots = self.record(chip8, rewind, 10)
+                self.assertEquals(10, rewind.frames)
+                self.assertEquals(1, rewind.step_back(chip8))
+                self.assertEquals(snapshots[8], chip8.snapshot())
+                self.assertEquals(3, rewind.step_back(chip8, 3))
+                self.assertEquals(snapshots[5], chip8.snapshot())
+
+                # the history goes on from the restored frame
+                snapshots = snapshots[:6] + self.record(chip8, rewind, 3)
+                self.assertEquals(9, rewind.frames)
+                for frame in (7, 6, 5, 4, 3, 2, 1, 0):
+                    self.assertEquals(1, rewind.step_back(chip8))
+                    self.assertEquals(snapshots[frame], chip8.snapshot())
+                self.assertEquals(0, rewind.step_back(chip8))
+                self.assertEquals(snapshots[0], chip8.snapshot())
+
+    def testFramesOnlyKeepChanges(self):
+        chip8 = self.create()
+        rewind = RewindBuffer(keyframe_interval=60)
+        self.record(chip8, rewind, 3)
+        keyframe, frames = rewind.groups[0]
+        self.assertEquals(len(chip8.snapshot()), frames[0][0])
+        # header, the page at 0x300 and the line of the units digit (the only non-zero line of the sprite)
+        self.assertEquals(Chip8.SNAPSHOT_HEADER.size + Chip8.PAGE_SIZE + 64, frames[2][0])
+        self.assertEquals([3], [page for page, _ in frames[2][2]])
+
+    def testBudget(self):
+        chip8 = self.create()
+        rewind = RewindBuffer(seconds=1, frame_rate=10, keyframe_interval=4)
+        self.record(chip8, rewind, 25)
+        self.assertTrue(rewind.frames <= 10)
+        self.assertTrue(rewind.frames > 10 - 4)
+
+        rewind = RewindBuffer(keyframe_interval=4, max_bytes=3 * len(chip8.snapshot()))
+        self.record(chip8, rewind, 25)
+        self.assertTrue(rewind.size <= 3 * len(chip8.snapshot()))
+        self.assertEquals(rewind.size, sum(frame[0] for _, frames in rewind.groups for frame in frames))
+
+        rewind.clear()
+        self.assertEquals(0, rewind.frames)
+        self.assertEquals(0, rewind.step_back(chip8))
@@ -0,0 +1,110 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+from chip8.emulator.Chip8 import Chip8
+from chip8.emulator.Chip8Utils import Chip8Utils, RomCache
+
+
+class RomLoadingTest(unittest.TestCase):
+    """
+    ROMs are loaded from files, file objects, memory or zip archives, their
+    memory images being cached by content.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(os.path.dirname(__file__), 'resources', 'smile.ch8')
+        with open(self.path, 'rb') as rom_file:
+            self.rom = rom_file.read()
+        self.archive = os.path.join(self.directory, 'roms.zip')
+        with zipfile.ZipFile(self.archive, 'w') as archive:
+            archive.writestr('smile.ch8', self.rom)
+            archive.writestr('other.ch8', b'\x12\x00')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def assertLoaded(self, chip8):
+        memory = chip8.get_memory()
+        self.assertEquals(bytearray(self.rom), memory[0x200:0x200 + len(self.rom)])
+        self.assertEquals(bytearray(Chip8.FONTS), memory[0:len(Chip8.FONTS)])
+        self.assertEquals(Chip8.MEMORY_SIZE, len(memory))
+
+    def testSources(self):
+        self.assertLoaded(Chip8Utils.create_from_rom(self.path))
+        self.assertLoaded(Chip8Utils.create_from_rom(bytearray(self.rom)))
+        self.assertLoaded(Chip8Utils.create_from_rom(memoryview(bytearray(self.rom))))
+        self.assertLoaded(Chip8Utils.create_from_rom(io.BytesIO(self.rom)))
+        self.assertLoaded(Chip8Utils.create_from_rom(self.archive, member='smile.ch8'))
+        with open(self.archive, 'rb') as archive_file:
+            self.assertLoaded(Chip8Utils.create_from_rom(archive_file, member='smile.ch8'))
+        self.assertRaises(RuntimeError, Chip8Utils.create_from_rom, os.path.join(self.directory, 'missing.ch8'))
+
+    def testArchive(self):
+        self.assertEquals([('smile.ch8', self.rom), ('other.ch8', b'\x12\x00')],
+                          list(Chip8Utils.read_archive(self.archive)))
+        # the name is required when the archive holds several ROMs
+        self.assertRaises(ValueError, Chip8Utils.read_rom, self.archive)
+        self.assertRaises(KeyError, Chip8Utils.read_rom, self.archive, 'missing.ch8')
+
+        single = os.path.join(self.directory, 'single.zip')
+        with zipfile.ZipFile(single, 'w') as archive:
+            archive.writestr('smile.ch8', self.rom)
+        self.assertEquals(self.rom, Chip8Utils.read_rom(single))
+
+    def testArchiveInMemory(self):
+        with open(self.archive, 'rb') as archive_file:
+            content = archive_file.read()
+        single = io.BytesIO()
+        with zipfile.ZipFile(single, 'w') as archive:
+            archive.writestr('smile.ch8', self.rom)
+
+        # archives are detected in memory and in file objects too, never loaded as a ROM
+        self.assertEquals(self.rom, Chip8Utils.read_rom(bytearray(single.getvalue())))
+        self.assertEquals(self.rom, Chip8Utils.read_rom(io.BytesIO(single.getvalue())))
+        self.assertEquals(self.rom, Chip8Utils.read_rom(bytearray(content), 'smile.ch8'))
+        self.assertEquals(b'\x12\x00', Chip8Utils.read_rom(io.BytesIO(content), 'other.ch8'))
+        self.assertRaises(ValueError, Chip8Utils.read_rom, bytearray(content))
+        self.assertRaises(ValueError, Chip8Utils.read_rom, io.BytesIO(content))
+        self.assertLoaded(Chip8Utils.create_from_rom(io.BytesIO(single.getvalue())))
+
+        # a ROM in a file object is read from its current position
+        rom_file = io.BytesIO(b'\x00\x00' + self.rom)
+        rom_file.seek(2)
+        self.assertEquals(self.rom, Chip8Utils.read_rom(rom_file))
+
+    def testTooLarge(self):
+        largest = bytearray([0xAA]) * Chip8Utils.MAX_ROM_SIZE
+        chip8 = Chip8Utils.create_from_rom(largest, cache=False)
+        self.assertEquals(0xAA, chip8.get_memory()[Chip8.MEMORY_SIZE - 1])
+        self.assertRaises(ValueError, Chip8Utils.create_from_rom, largest + bytearray(1), cache=False)
+
+    def testMachinesDoNotShareMemory(self):
+        cache = RomCache()
+        first = Chip8Utils.create_from_rom(self.path, cache=cache)
+        first.execute(0x6000)
+        first.execute(0xA200)
+        first.execute(0xF033)
+        second = Chip8Utils.create_from_rom(self.path, cache=cache)
+        self.assertEquals(1, cache.hits)
+        self.assertEquals(0, first.get_memory()[0x200])
+        self.assertLoaded(second)
+
+    def testCache(self):
+        cache = RomCache(size=2)
+        roms = [bytearray([0x12, 0x00, index]) for index in range(0, 3)]
+        cache.get_image(roms[0])
+        cache.get_image(roms[1])
+        cache.get_image(roms[0])
+        self.assertEquals((1, 2), (cache.hits, cache.misses))
+        # the least recently used one is evicted
+        cache.get_image(roms[2])
+        self.assertEquals(2, len(cache))
+        self.assertTrue(roms[0] in cache)
+        self.assertFalse(roms[1] in cache)
+        self.assertTrue(roms[2] in cache)
+        self.assertRaises(ValueError, RomCache, 0)
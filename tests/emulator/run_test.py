@@ -0,0 +1,58 @@
+import os
+import unittest
+
+from chip8.emulator.Chip8 import Chip8
+from chip8.emulator.Chip8Utils import Chip8Utils
+
+
+class RunTest(unittest.TestCase):
+    """
+    Instead of calling cycle() once per instruction, a program can be run for
+    a number of instructions or frames, or until a condition is met.
+    """
+
+    @staticmethod
+    def create(rom, engine=None):
+        path = os.path.join(os.path.dirname(__file__), 'resources', rom)
+        return Chip8Utils.create_from_rom(path, engine=engine)
+
+    def testRun(self):
+        for engine in Chip8Utils.ENGINES:
+            chip8 = self.create('E03TestRom.ch8', engine=engine)
+            self.assertEquals((3, Chip8.STOP_CYCLES), chip8.run(3))
+            self.assertEquals(0x15, chip8.get_v0())
+            self.assertEquals(0x20, chip8.get_v1())
+            self.assertEquals(0x25, chip8.get_v2())
+            self.assertEquals(0x0, chip8.get_v3())
+            self.assertEquals(0x206, chip8.get_pc())
+            self.assertEquals(3, chip8.get_cycle_counter())
+
+            self.assertRaises(NotImplementedError, chip8.run, 2)
+            self.assertEquals(0x30, chip8.get_v3())
+            self.assertEquals(0x20A, chip8.get_pc())
+            self.assertEquals(5, chip8.get_cycle_counter())
+
+    def testRunUntilPc(self):
+        for engine in Chip8Utils.ENGINES:
+            chip8 = self.create('E03TestRom.ch8', engine=engine)
+            self.assertEquals((2, Chip8.STOP_PC), chip8.run_until(pc=0x204))
+            self.assertEquals(0x0, chip8.get_v2())
+            self.assertEquals((0, Chip8.STOP_PC), chip8.run_until(pc=0x204))
+            self.assertEquals((1, Chip8.STOP_CYCLES), chip8.run_until(pc=0x208, max_cycles=1))
+
+    def testRunUntilPredicate(self):
+        for engine in Chip8Utils.ENGINES:
+            chip8 = self.create('E05TimerLoop.ch8', engine=engine)
+            cycles, reason = chip8.run_until(predicate=lambda c: c.get_v5() == 255)
+            self.assertEquals(Chip8.STOP_PREDICATE, reason)
+            self.assertEquals(0x0, chip8.get_v0())
+            self.assertEquals(cycles, chip8.get_cycle_counter())
+
+    def testRunFrames(self):
+        for engine in Chip8Utils.ENGINES:
+            chip8 = self.create('E05TimerLoop.ch8', engine=engine)
+            chip8.run(2)  # Set the delay timer to 0x15
+            self.assertEquals(0x15, chip8.delay_timer)
+            cycles, reason = chip8.run_frames(3)
+            self.assertEquals(Chip8.STOP_FRAMES, reason)
+            self.assertEquals(0x12, chip8.delay_timer)
@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from chip8.emulator.Chip8 import Chip8
+from chip8.emulator.Chip8Utils import Chip8Utils
+from chip8.emulator.Framebuffer import PackedFramebuffer
+
+
+class SnapshotTest(unittest.TestCase):
+    """
+    A snapshot captures the whole state of a machine in one buffer, which
+    can be restored into any machine or saved to a file.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    @staticmethod
+    def create(rom, engine=None, **kwargs):
+        path = os.path.join(os.path.dirname(__file__), 'resources', rom)
+        return Chip8Utils.create_from_rom(path, engine=engine, clock=Chip8.CLOCK_VIRTUAL, **kwargs)
+
+    def assertSameState(self, expected, actual):
+        self.assertEquals(list(expected.registers), list(actual.registers))
+        self.assertEquals(expected.get_pc(), actual.get_pc())
+        self.assertEquals(expected.get_i_register(), actual.get_i_register())
+        self.assertEquals(expected.sp, actual.sp)
+        self.assertEquals(list(expected.stack), list(actual.stack))
+        self.assertEquals(expected.delay_timer, actual.delay_timer)
+        self.assertEquals(expected.sound_timer, actual.sound_timer)
+        self.assertEquals(expected.get_cycle_counter(), actual.get_cycle_counter())
+        self.assertEquals(expected.next_timer, actual.next_timer)
+        self.assertEquals(expected.clock, actual.clock)
+        self.assertEquals(expected.get_memory(), actual.get_memory())
+        self.assertEquals(expected.get_screen(), actual.get_screen())
+
+    def testRestore(self):
+        for engine in Chip8Utils.ENGINES:
+            chip8 = self.create('E05TimerLoop.ch8', engine=engine)
+            chip8.stack[0] = 0x0222
+            chip8.sp = 1
+            chip8.sound_timer = 0x12
+            chip8.run(40)
+            chip8.execute(0xD00F)
+            snap = chip8.snapshot()
+
+            other = self.create('E03TestRom.ch8', engine=engine)
+            other.restore(snap)
+            self.assertSameState(chip8, other)
+            self.assertEquals(snap, other.snapshot())
+
+            chip8.run(50)
+            other.run(50)
+            self.assertSameState(chip8, other)
+
+            chip8.restore(snap)
+            self.assertEquals(snap, chip8.snapshot())
+
+    def testRestoreIntoPackedFramebuffer(self):
+        chip8 = self.create('E03TestRom.ch8')
+        chip8.execute(0xD00F)
+        packed = self.create('E03TestRom.ch8', framebuffer=PackedFramebuffer())
+        packed.consume_dirty()
+        packed.restore(chip8.snapshot())
+        self.assertEquals(chip8.get_screen(), packed.get_screen())
+        self.assertEquals(list(range(0, 32)), packed.consume_dirty()[0])
+        self.assertEquals(chip8.snapshot(), packed.snapshot())
+
+    def testRestoreEvictsTranslatedBlocks(self):
+        chip8 = self.create('E03TestRom.ch8', engine=Chip8Utils.TRANSLATING)
+        snap = chip8.snapshot()
+        chip8.run(3)
+        self.assertTrue(chip8._blocks)
+        other = self.create('E05TimerLoop.ch8', engine=Chip8Utils.TRANSLATING)
+        chip8.restore(other.snapshot())
+        self.assertEquals({}, chip8._blocks)
+        chip8.run(20)
+        other.run(20)
+        self.assertSameState(other, chip8)
+        chip8.restore(snap)
+        self.assertEquals((3, Chip8.STOP_CYCLES), chip8.run(3))
+        self.assertEquals(0x25, chip8.get_v2())
+
+    def testSaveAndLoad(self):
+        path = os.path.join(self.directory, 'state.c8s')
+        chip8 = self.create('E05TimerLoop.ch8')
+        chip8.run(30)
+        chip8.save_snapshot(path)
+        other = Chip8()
+        other.load_snapshot(path)
+        self.assertSameState(chip8, other)
+
+    def testInvalidSnapshots(self):
+        chip8 = Chip8()
+        snap = chip8.snapshot()
+        self.assertRaises(ValueError, chip8.restore, snap[:-1])
+        self.assertRaises(ValueError, chip8.restore, b'XXXX' + snap[4:])
+        snap[4] = Chip8.SNAPSHOT_VERSION + 1
+        self.assertRaises(ValueError, chip8.restore, snap)
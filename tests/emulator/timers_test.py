@@ -1,6 +1,7 @@
 import os
 import unittest
 
+from chip8.emulator.Chip8 import Chip8
 from chip8.emulator.Chip8Utils import Chip8Utils
 
 
@@ -56,3 +57,49 @@ class TimersTest(unittest.TestCase):
         chip8 = Chip8Utils.create_from_rom(path)
         while chip8.get_v5() != 255:
             chip8.cycle()
+
+    def testVirtualClock(self):
+        """
+        With the virtual clock, timers tick every instructions_per_frame
+        executed instructions instead of following the wall clock.
+        """
+        path = os.path.join(os.path.dirname(__file__), 'resources', 'E05TimerLoop.ch8')
+        chip8 = Chip8Utils.create_from_rom(path, clock=Chip8.CLOCK_VIRTUAL, instructions_per_frame=4)
+        chip8.cycle()  # Timers tick before the first instruction
+        chip8.cycle()  # Set timer to 0x15
+        self.assertEquals(0x15, chip8.delay_timer)
+        chip8.cycle()
+        chip8.cycle()
+        self.assertEquals(0x15, chip8.delay_timer)
+        chip8.cycle()  # Timers tick before the fifth instruction
+        self.assertEquals(0x14, chip8.delay_timer)
+
+    def testVirtualClockDelayTimerCountdown(self):
+        for engine in Chip8Utils.ENGINES:
+            path = os.path.join(os.path.dirname(__file__), 'resources', 'E05TimerLoop.ch8')
+            chip8 = Chip8Utils.create_from_rom(path, engine=engine, clock=Chip8.CLOCK_VIRTUAL)
+            cycles, reason = chip8.run_until(predicate=lambda c: c.get_v5() == 255)
+            self.assertEquals(Chip8.STOP_PREDICATE, reason)
+            # the 0x15th tick after setting the timer happens before the 211th instruction
+            self.assertEquals(215, chip8.get_cycle_counter())
+
+    def testVirtualClockFrames(self):
+        for engine in Chip8Utils.ENGINES:
+            path = os.path.join(os.path.dirname(__file__), 'resources', 'E05TimerLoop.ch8')
+            chip8 = Chip8Utils.create_from_rom(path, engine=engine, clock=Chip8.CLOCK_VIRTUAL,
+                                               instructions_per_frame=7)
+            self.assertEquals((21, Chip8.STOP_FRAMES), chip8.run_frames(3))
+            self.assertEquals(0x13, chip8.delay_timer)
+            while chip8.get_cycle_counter() < 42:
+                chip8.cycle()
+            self.assertEquals(42, chip8.get_cycle_counter())
+            self.assertEquals(0x10, chip8.delay_timer)
+
+    def testSoundTimerCountdown(self):
+        memory = bytearray(Chip8.MEMORY_SIZE)
+        memory[0x200] = 0x12  # Jump to 0x200
+        chip8 = Chip8(memory=memory, clock=Chip8.CLOCK_VIRTUAL, instructions_per_frame=1)
+        chip8.execute(0x6002)
+        chip8.execute(0xF018)  # Set sound timer to 0x02
+        chip8.run(2)
+        self.assertEquals(0x0, chip8.sound_timer)
@@ -0,0 +1,157 @@
+import os
+import shutil
+import tempfile
+import unittest
+from io import BytesIO
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+from chip8.emulator import Emulator
+from chip8.emulator.Chip8 import Chip8
+from chip8.emulator.Chip8Utils import Chip8Utils
+from chip8.emulator.Tracer import Tracer, TraceWriter, TraceDecoder
+
+
+NO_REGISTER = Tracer.NO_REGISTER
+NO_FLAG = Tracer.NO_FLAG
+
+
+class TracerTest(unittest.TestCase):
+    """
+    A tracer records each executed instruction as a binary record in a ring
+    buffer, optionally streamed to a trace file.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    @staticmethod
+    def create(rom, engine=None):
+        path = os.path.join(os.path.dirname(__file__), 'resources', rom)
+        return Chip8Utils.create_from_rom(path, engine=engine)
+
+    def testRecordsFromCycle(self):
+        for engine in Chip8Utils.ENGINES:
+            chip8 = self.create('E03TestRom.ch8', engine=engine)
+            tracer = Tracer()
+            chip8.set_tracer(tracer)
+            chip8.cycle()
+            chip8.cycle()
+            self.assertEquals([(1, 0x200, 0x6015, 0x0, 0x0, 0x15, NO_FLAG), (2, 0x202, 0x6120, 0x0, 0x1, 0x20, NO_FLAG)],
+                              list(TraceDecoder.unpack(tracer.get_records())))
+
+    def testRecordsFromRun(self):
+        for engine in Chip8Utils.ENGINES:
+            chip8 = self.create('E03TestRom.ch8', engine=engine)
+            tracer = Tracer()
+            chip8.set_tracer(tracer)
+            chip8.run(3)
+            records = list(TraceDecoder.unpack(tracer.get_records()))
+            self.assertEquals([1, 2, 3], [r[0] for r in records])
+            self.assertEquals([0x200, 0x202, 0x204], [r[1] for r in records])
+            self.assertEquals((3, 0x204, 0x6225, 0x0, 0x2, 0x25, NO_FLAG), records[2])
+
+    def testRecordsUnsupportedInstruction(self):
+        chip8 = Chip8()
+        tracer = Tracer()
+        chip8.set_tracer(tracer)
+        chip8.memory[0x200:0x202] = bytearray([0xF1, 0x55])
+        self.assertRaises(NotImplementedError, chip8.cycle)
+        self.assertEquals([(1, 0x200, 0xF155, 0x0, NO_REGISTER, 0x0, NO_FLAG)], list(TraceDecoder.unpack(tracer.get_records())))
+
+    def testRecordsWrittenRegisters(self):
+        for engine in Chip8Utils.ENGINES:
+            chip8 = Chip8Utils.get_engine(engine)()
+            tracer = Tracer()
+            chip8.set_tracer(tracer)
+            chip8.memory[0x200:0x20a] = bytearray([0xA3, 0x45, 0x64, 0xF0, 0x65, 0x20, 0x84, 0x54, 0x12, 0x00])
+            chip8.run(5)
+            self.assertEquals([(1, 0x200, 0xA345, 0x345, NO_REGISTER, 0x0, NO_FLAG),
+                               (2, 0x202, 0x64F0, 0x345, 0x4, 0xF0, NO_FLAG),
+                               (3, 0x204, 0x6520, 0x345, 0x5, 0x20, NO_FLAG),
+                               # V4 + V5 overflows, VF being the carry
+                               (4, 0x206, 0x8454, 0x345, 0x4, 0x10, 0x1),
+                               (5, 0x208, 0x1200, 0x345, NO_REGISTER, 0x0, NO_FLAG)],
+                              list(TraceDecoder.unpack(tracer.get_records())))
+
+    def testDisabled(self):
+        chip8 = self.create('E03TestRom.ch8')
+        tracer = Tracer()
+        chip8.set_tracer(tracer)
+        chip8.set_tracer(None)
+        chip8.run(3)
+        self.assertEquals(b'', tracer.get_records())
+
+    def testRingKeepsLastRecords(self):
+        tracer = Tracer(capacity=3)
+        for cycle in range(1, 6):
+            tracer.record(cycle, 0x200 + 2 * cycle, 0x6000, 0x0, 0x0, cycle)
+        self.assertEquals([3, 4, 5], [r[0] for r in TraceDecoder.unpack(tracer.get_records())])
+        self.assertRaises(ValueError, Tracer, 0)
+
+    def testWriter(self):
+        path = os.path.join(self.directory, 'trace.c8t')
+        writer = TraceWriter(path)
+        tracer = Tracer(capacity=4, writer=writer)
+        chip8 = self.create('E05TimerLoop.ch8')
+        chip8.set_tracer(tracer)
+        chip8.run(10)
+        tracer.flush()
+        writer.close()
+        with open(path, 'rb') as trace_file:
+            records = list(TraceDecoder.read(trace_file))
+        self.assertEquals(list(range(1, 11)), [r[0] for r in records])
+
+    def testCrashWritesTrace(self):
+        path = os.path.join(self.directory, 'trace.c8t')
+        tracer = Tracer(capacity=64, writer=TraceWriter(path))
+        rom_path = os.path.join(os.path.dirname(__file__), 'resources', 'E05TimerLoop.ch8')
+        emulator = Emulator(rom_path=rom_path, tracer=tracer)
+        emulator.start()
+        self.assertRaises(Exception, emulator._loop)
+        self.assertTrue(tracer.writer.closed)
+        with open(path, 'rb') as trace_file:
+            records = list(TraceDecoder.read(trace_file))
+        # every instruction up to the one crashing
+        self.assertEquals(list(range(1, emulator.chip8.get_cycle_counter() + 1)), [r[0] for r in records])
+
+    def testSave(self):
+        path = os.path.join(self.directory, 'trace.c8t')
+        tracer = Tracer()
+        chip8 = self.create('E03TestRom.ch8')
+        chip8.set_tracer(tracer)
+        chip8.run(2)
+        tracer.save(path)
+        with open(path, 'rb') as trace_file:
+            self.assertEquals(list(TraceDecoder.unpack(tracer.get_records())), list(TraceDecoder.read(trace_file)))
+        self.assertRaises(ValueError, lambda: list(TraceDecoder.read(BytesIO(b'XXXX\x01\x0c'))))
+
+    def testDump(self):
+        output = StringIO()
+        TraceDecoder.dump([(7, 0x20A, 0x6A42, 0x2F0, 0xA, 0x42, Tracer.NO_FLAG),
+                           (8, 0x20C, 0xA2F0, 0x2F0, Tracer.NO_REGISTER, 0x0, Tracer.NO_FLAG),
+                           (9, 0x20E, 0x8A44, 0x2F0, 0xA, 0x84, 0x0)], file=output)
+        self.assertEquals('===== Chip8 trace =====\n'
+                          'cycle: 7\n'
+                          'pc: 0x020A\n'
+                          'opcode: 0x6A42\n'
+                          'i:  0x02F0\n'
+                          'vA: 0x42\n'
+                          '===== Chip8 trace =====\n'
+                          'cycle: 8\n'
+                          'pc: 0x020C\n'
+                          'opcode: 0xA2F0\n'
+                          'i:  0x02F0\n'
+                          '===== Chip8 trace =====\n'
+                          'cycle: 9\n'
+                          'pc: 0x020E\n'
+                          'opcode: 0x8A44\n'
+                          'i:  0x02F0\n'
+                          'vA: 0x84\n'
+                          'vF: 0x00\n', output.getvalue())
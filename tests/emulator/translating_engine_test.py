@@ -0,0 +1,98 @@
+import os
+import unittest
+
+from chip8.emulator.Chip8 import Chip8
+from chip8.emulator.Chip8Utils import Chip8Utils
+from chip8.emulator.TranslatingChip8 import TranslatingChip8
+
+
+class TranslatingEngineTest(unittest.TestCase):
+    """
+    The translating engine compiles straight-line runs of instructions into
+    Python functions, one cycle executes a whole block.
+    """
+
+    LOOP = [
+        0x6000,  # 0x200 V0 = 0
+        0x6101,  # 0x202 V1 = 1
+        0x6300,  # 0x204 V3 = 0
+        0x8014,  # 0x206 V0 += V1
+        0x8106,  # 0x208 V1 >>= 1
+        0x710B,  # 0x20A V1 += 0x0B
+        0x8215,  # 0x20C V2 -= V1
+        0x820E,  # 0x20E V2 <<= 1
+        0x7301,  # 0x210 V3 += 1
+        0x4364,  # 0x212 Skip if V3 != 100
+        0x1218,  # 0x214 Jump to 0x218
+        0x1206,  # 0x216 Jump to 0x206
+        0x1218,  # 0x218 Loop forever
+    ]
+
+    SELF_MODIFYING = [
+        0x600C,  # 0x200 V0 = 12
+        0x220A,  # 0x202 Call 0x20A
+        0xA20A,  # 0x204 I = 0x20A
+        0xF033,  # 0x206 Store BCD of V0 at 0x20A: the first instruction of the subroutine becomes 0x0001
+        0x220A,  # 0x208 Call 0x20A
+        0x6105,  # 0x20A V1 = 5
+        0x00EE,  # 0x20C Return
+    ]
+
+    @staticmethod
+    def load(chip8_class, program):
+        memory = bytearray(Chip8.MEMORY_SIZE)
+        for index, instruction in enumerate(program):
+            memory[0x200 + 2 * index] = instruction >> 8
+            memory[0x201 + 2 * index] = instruction & 0xff
+        return chip8_class(memory=memory)
+
+    def testLoopMatchesInterpreter(self):
+        interpreter = self.load(Chip8, self.LOOP)
+        translating = self.load(TranslatingChip8, self.LOOP)
+        for chip8 in (interpreter, translating):
+            while chip8.get_pc() != 0x218:
+                chip8.cycle()
+        self.assertEquals(interpreter.registers, translating.registers)
+        self.assertEquals(interpreter.get_cycle_counter(), translating.get_cycle_counter())
+        self.assertEquals(100, translating.get_v3())
+
+    def testBlocksAreCached(self):
+        chip8 = self.load(TranslatingChip8, self.LOOP)
+        chip8.cycle()
+        self.assertEquals(0x216, chip8.get_pc())  # 0x200 to 0x212 is a single block ending with 4XNN
+        self.assertEquals(10, chip8.get_cycle_counter())
+        block = chip8._blocks[0x200][0]
+        chip8.cycle()
+        self.assertTrue(block is chip8._blocks[0x200][0])
+
+    def testStopsOnUnsupportedInstruction(self):
+        path = os.path.join(os.path.dirname(__file__), 'resources', 'E03TestRom.ch8')
+        chip8 = Chip8Utils.create_from_rom(path, engine=Chip8Utils.TRANSLATING)
+        self.assertRaises(NotImplementedError, chip8.cycle)
+        self.assertEquals(0x15, chip8.get_v0())
+        self.assertEquals(0x20, chip8.get_v1())
+        self.assertEquals(0x25, chip8.get_v2())
+        self.assertEquals(0x30, chip8.get_v3())
+        self.assertEquals(0x20A, chip8.get_pc())
+        self.assertEquals(5, chip8.get_cycle_counter())
+
+    def testMemoryWritesInvalidateBlocks(self):
+        chip8 = self.load(TranslatingChip8, self.SELF_MODIFYING)
+        chip8.cycle()  # 0x200 - 0x202, calls 0x20A
+        chip8.cycle()  # 0x20A - 0x20C, returns
+        self.assertEquals(5, chip8.get_v1())
+        self.assertTrue(0x20A in chip8._blocks)
+        chip8.cycle()  # 0x204 - 0x206, stores BCD
+        self.assertFalse(0x20A in chip8._blocks)
+        chip8.cycle()  # 0x208, calls 0x20A
+        self.assertRaises(NotImplementedError, chip8.cycle)
+
+    def testWaitsForKeyboardInput(self):
+        path = os.path.join(os.path.dirname(__file__), 'resources', 'E06KeypadLoop.ch8')
+        chip8 = Chip8Utils.create_from_rom(path, engine=Chip8Utils.TRANSLATING)
+        chip8.cycle()
+        chip8.cycle()
+        self.assertEquals(0x200, chip8.get_pc())
+        chip8.input.press(0xA)
+        chip8.cycle()
+        self.assertEquals(0xA, chip8.get_v6())
@@ -0,0 +1,100 @@
+import os
+import unittest
+
+from chip8.emulator.Chip8 import Chip8
+from chip8.emulator.VectorChip8 import VectorChip8, numpy
+
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class VectorEngineTest(unittest.TestCase):
+    """
+    The vector engine runs many machines in lockstep on NumPy arrays. Each of
+    its machines must behave exactly like the interpreter on the virtual clock.
+    """
+
+    # ROMs without CXNN
+    ROMS = ['E03TestRom.ch8', 'E05TimerLoop.ch8', 'E05SoundLoop.ch8', 'E06KeypadLoop.ch8', 'E07GraphicsRom.ch8']
+
+    # Every supported opcode family except CXNN, looping on 0x200
+    PROGRAM = [
+        0x6064, 0x6127, 0x6212, 0x63AE, 0x64FF, 0x65B4, 0x6F25, 0x8010, 0x8011, 0x8012, 0x8013, 0x8014,
+        0x8344, 0x8015, 0x8105, 0x8016, 0x8306, 0x8017, 0x8107, 0x801E, 0x844E, 0x8F14, 0x8F15, 0x8F1E,
+        0x3064, 0x3164, 0x4064, 0x4164, 0x5070, 0x5170, 0x9070, 0x9170, 0x7AFF, 0x7101, 0xA300, 0xF433,
+        0xF11E, 0xF029, 0xD125, 0xD125, 0xD01F, 0xE09E, 0xE0A1, 0xF007, 0xF015, 0xF018, 0xF10A, 0x2280,
+        0x00E0, 0x1200,
+    ]
+    # at 0x280, BNNN jumps to the 00EE at 0x284 + V0
+    SUBROUTINE = [0x6AFE, 0x6002, 0xB284, 0x00EE]
+
+    def assertSameMachine(self, chip8, vector, machine):
+        self.assertEquals(list(chip8.registers), list(vector.registers[machine]))
+        self.assertEquals(chip8.get_pc(), vector.pc[machine])
+        self.assertEquals(chip8.get_i_register(), vector.i_register[machine])
+        self.assertEquals(chip8.sp, vector.sp[machine])
+        self.assertEquals(list(chip8.stack), list(vector.stack[machine]))
+        self.assertEquals(chip8.delay_timer, vector.delay_timer[machine])
+        self.assertEquals(chip8.sound_timer, vector.sound_timer[machine])
+        self.assertEquals(chip8.get_memory(), bytearray(vector.memory[machine].tobytes()))
+        self.assertEquals(chip8.get_screen(), vector.get_screen(machine))
+
+    def assertRunsLikeInterpreter(self, machines, vector, cycles):
+        crashed = [False] * len(machines)
+        for cycle in range(0, cycles):
+            vector.step()
+            for machine, chip8 in enumerate(machines):
+                if crashed[machine]:
+                    continue
+                try:
+                    chip8.cycle()
+                except Exception:
+                    crashed[machine] = True
+                    self.assertTrue(vector.halted[machine])
+                    continue
+                self.assertFalse(vector.halted[machine])
+                self.assertSameMachine(chip8, vector, machine)
+
+    def testRomsMatchInterpreter(self):
+        roms = []
+        for rom in self.ROMS:
+            with open(os.path.join(os.path.dirname(__file__), 'resources', rom), 'rb') as rom_file:
+                roms.append(rom_file.read())
+        machines = []
+        for rom in roms:
+            memory = bytearray(Chip8.MEMORY_SIZE)
+            memory[0x200:0x200 + len(rom)] = rom
+            machines.append(Chip8(memory=memory, clock=Chip8.CLOCK_VIRTUAL))
+        vector = VectorChip8.from_roms(roms)
+        self.assertRunsLikeInterpreter(machines, vector, 300)
+
+    def testProgramMatchesInterpreter(self):
+        memory = bytearray(Chip8.MEMORY_SIZE)
+        for address, program in ((0x200, self.PROGRAM), (0x280, self.SUBROUTINE)):
+            for i, instruction in enumerate(program):
+                memory[address + 2 * i] = instruction >> 8
+                memory[address + 2 * i + 1] = instruction & 0xff
+        machines = [Chip8(memory=bytearray(memory), clock=Chip8.CLOCK_VIRTUAL) for _ in range(0, 3)]
+        vector = VectorChip8(3, memory=memory)
+        # machine 1 has 0x5 pressed, machine 2 has 0x0 pressed
+        for machine, key in ((1, 0x5), (2, 0x0)):
+            machines[machine].input.press(key)
+            vector.press(machine, key)
+        self.assertRunsLikeInterpreter(machines, vector, 400)
+
+    def testFaults(self):
+        memory = bytearray(Chip8.MEMORY_SIZE)
+        memory[0x200:0x204] = bytearray([0x12, 0x00, 0xF1, 0x55])
+        vector = VectorChip8(2, memory=[memory, bytearray(memory[:0x200] + memory[0x202:])])
+        self.assertEquals(1, vector.run(5))
+        self.assertEquals([False, True], list(vector.halted))
+        self.assertEquals(0xF155, vector.faults[1])
+        self.assertEquals(0x202, vector.pc[1])
+
+    def testRandom(self):
+        memory = bytearray(Chip8.MEMORY_SIZE)
+        memory[0x200:0x202] = bytearray([0xC0, 0x0F])
+        first = VectorChip8(100, memory=memory, seed=1)
+        second = VectorChip8(100, memory=memory, seed=1)
+        first.step()
+        second.step()
+        self.assertTrue((first.registers[:, 0] <= 0x0F).all())
+        self.assertEquals(list(first.registers[:, 0]), list(second.registers[:, 0]))
@@ -0,0 +1,51 @@
+import unittest
+
+from chip8.emulator.Chip8 import Chip8
+from chip8.emulator.Framebuffer import PackedFramebuffer
+
+
+class ViewsTest(unittest.TestCase):
+    """
+    Without a copy, the memory and the screen are returned as read-only views
+    following the changes of the machine.
+    """
+
+    def testMemoryView(self):
+        chip8 = Chip8()
+        view = chip8.get_memory(copy=False)
+        self.assertTrue(view is chip8.get_memory(copy=False))
+        self.assertEquals(chip8.get_memory(), view)
+        self.assertTrue(view.readonly)
+
+        chip8.execute(0xA300)
+        chip8.execute(0x60FF)
+        chip8.execute(0xF033)
+        self.assertEquals([2, 5, 5], view[0x300:0x303].tolist())
+        self.assertRaises(TypeError, view.__setitem__, 0x300, b'\x00')
+
+        chip8.restore(Chip8().snapshot())
+        self.assertEquals([0, 0, 0], view[0x300:0x303].tolist())
+
+    def testMemoryCopy(self):
+        chip8 = Chip8()
+        memory = chip8.get_memory()
+        memory[0x300] = 0x12
+        self.assertEquals(0x0, chip8.get_memory()[0x300])
+
+    def testScreenView(self):
+        chip8 = Chip8()
+        view = chip8.get_screen(copy=False)
+        self.assertTrue(view is chip8.get_screen(copy=False))
+        self.assertTrue(view.readonly)
+        chip8.execute(0xD005)
+        self.assertEquals(chip8.get_screen(), view)
+        self.assertEquals([1, 1, 1, 1, 0, 0, 0, 0], view[0:8].tolist())
+        chip8.execute(0x00E0)
+        self.assertEquals([0] * 8, view[0:8].tolist())
+
+    def testPackedScreenView(self):
+        chip8 = Chip8(framebuffer=PackedFramebuffer())
+        chip8.execute(0xD005)
+        view = chip8.get_screen(copy=False)
+        self.assertTrue(view.readonly)
+        self.assertEquals(chip8.get_screen(), view)